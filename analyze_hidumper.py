@@ -8,101 +8,143 @@ import re
 import os
 from pathlib import Path
 
+from aw.ArtifactStore import ArtifactStore, open_artifact
+
 try:
     import pandas as pd
     from openpyxl.chart import PieChart, Reference
     from openpyxl.chart.label import DataLabelList
     HAS_DEPENDENCIES = True
+    DEPENDENCY_ERROR = None
 except ImportError as e:
-    print(f"错误: 缺少必要的依赖包: {e}")
-    print("请运行以下命令安装依赖:")
-    print("  pip install pandas openpyxl")
-    print("或者:")
-    print("  pip install -r requirements_analyze.txt")
+    # 解析函数不依赖这些包（测试用例中也会导入本模块），只在生成Excel时提示安装
     HAS_DEPENDENCIES = False
+    DEPENDENCY_ERROR = e
 
 
 def parse_hidumper_file(file_path):
     """
-    解析 hidumper.txt 文件，提取 PSS 数据
+    解析 hidumper.txt 文件（可以是产物存储中gzip压缩的文件，流式解压），提取 PSS 数据
     
     Returns:
         dict: {内存类型: PSS值(kB)}
         int: 总 PSS 值(kB)
     """
-    pss_data = {}
-    total_pss = 0
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # 找到数据开始的行（跳过表头和分隔线）
-    # 分隔线特征是只包含 '-' 和空格，长度很长
-    data_start = False
-    for i, line in enumerate(lines):
-        # 检查是否是真正的分隔线
-        # 真正的分隔线只包含 '-' 和空格，长度超过 100
-        stripped = line.strip()
-        is_separator = (stripped.replace('-', '').replace(' ', '') == '' and 
-                       len(stripped) > 100)
-        
-        if is_separator:
-            if not data_start:
-                # 找到第一个分隔线，数据在下一行开始
-                data_start = True
-                continue
-            else:
-                # 遇到第二个分隔线，说明数据部分结束
+    with open_artifact(file_path) as f:
+        return parse_hidumper_lines(f)
+
+
+def _parse_pss_row(line):
+    """
+    解析表格中的一行数据，返回 (内存类型, PSS值) ，不是有效数据行时返回 None
+    """
+    # 格式示例: "            GL         226833              0              0..."
+    # 使用正则表达式匹配：开头的空格+内存类型（可能包含多个单词）+空格+数字（PSS值）
+    # 内存类型可能包含空格，所以需要找到第一个数字列
+    parts = line.split()
+    if len(parts) < 2:
+        return None
+    # 找到第一个数字的位置（PSS Total列）
+    pss_index = -1
+    for j in range(len(parts)):
+        try:
+            int(parts[j])
+            pss_index = j
+            break
+        except ValueError:
+            continue
+    
+    if pss_index > 0:
+        # 内存类型是第一个数字之前的所有部分
+        mem_type = ' '.join(parts[:pss_index])
+        try:
+            pss_value = int(parts[pss_index])
+            
+            # 跳过 Total 行和空行
+            if mem_type.lower() != 'total' and mem_type.strip():
+                return mem_type, pss_value
+        except (ValueError, IndexError):
+            return None
+    return None
+
+
+def _parse_total_line(line):
+    """
+    解析 Total 行，返回总 PSS 值，不是 Total 行时返回 None
+    """
+    if 'Total' in line and len(line.split()) >= 2:
+        parts = line.split()
+        # 找到 Total 关键字的位置
+        total_index = -1
+        for i, part in enumerate(parts):
+            if part.lower() == 'total':
+                total_index = i
                 break
         
-        if data_start and line.strip():
-            # 解析数据行
-            # 格式示例: "            GL         226833              0              0..."
-            # 使用正则表达式匹配：开头的空格+内存类型（可能包含多个单词）+空格+数字（PSS值）
-            # 内存类型可能包含空格，所以需要找到第一个数字列
-            parts = line.split()
-            if len(parts) >= 2:
-                # 找到第一个数字的位置（PSS Total列）
-                pss_index = -1
-                for j in range(len(parts)):
-                    try:
-                        int(parts[j])
-                        pss_index = j
-                        break
-                    except ValueError:
-                        continue
-                
-                if pss_index > 0:
-                    # 内存类型是第一个数字之前的所有部分
-                    mem_type = ' '.join(parts[:pss_index])
-                    try:
-                        pss_value = int(parts[pss_index])
-                        
-                        # 跳过 Total 行和空行
-                        if mem_type.lower() != 'total' and mem_type.strip():
-                            pss_data[mem_type] = pss_value
-                    except (ValueError, IndexError):
-                        continue
-    
-    # 从文件中查找 Total 行
+        if total_index >= 0 and total_index + 1 < len(parts):
+            try:
+                return int(parts[total_index + 1])
+            except (ValueError, IndexError):
+                return None
+    return None
+
+
+class HidumperStreamParser:
+    """
+    hidumper --mem 输出的增量解析器：逐行输入，不保留原始文本
+    
+    分隔线特征是只包含 '-' 和空格，长度超过 100：第一个分隔线之后是数据行，第二个分隔线之后数据部分结束；
+    总 PSS 取第一个能解析出数值的 Total 行
+    """
+    
+    def __init__(self):
+        self.pss_data = {}
+        self.total_pss = 0
+        self._data_start = False
+        self._data_end = False
+        self._total_found = False
+    
+    def feed(self, line):
+        if not self._data_end:
+            stripped = line.strip()
+            # 检查是否是真正的分隔线
+            is_separator = (stripped.replace('-', '').replace(' ', '') == '' and
+                            len(stripped) > 100)
+            if is_separator:
+                if not self._data_start:
+                    # 找到第一个分隔线，数据在下一行开始
+                    self._data_start = True
+                else:
+                    # 遇到第二个分隔线，说明数据部分结束
+                    self._data_end = True
+            elif self._data_start and stripped:
+                row = _parse_pss_row(line)
+                if row is not None:
+                    self.pss_data[row[0]] = row[1]
+        
+        # 查找 Total 行
+        if not self._total_found:
+            total = _parse_total_line(line)
+            if total is not None:
+                self.total_pss = total
+                self._total_found = True
+
+
+def parse_hidumper_lines(lines):
+    """
+    解析 hidumper --mem 输出的文本行，提取 PSS 数据
+    
+    Args:
+        lines: list, hidumper 输出按行拆分后的列表
+    
+    Returns:
+        dict: {内存类型: PSS值(kB)}
+        int: 总 PSS 值(kB)
+    """
+    parser = HidumperStreamParser()
     for line in lines:
-        if 'Total' in line and len(line.split()) >= 2:
-            parts = line.split()
-            # 找到 Total 关键字的位置
-            total_index = -1
-            for i, part in enumerate(parts):
-                if part.lower() == 'total':
-                    total_index = i
-                    break
-            
-            if total_index >= 0 and total_index + 1 < len(parts):
-                try:
-                    total_pss = int(parts[total_index + 1])
-                    break
-                except (ValueError, IndexError):
-                    continue
-    
-    return pss_data, total_pss
+        parser.feed(line)
+    return parser.pss_data, parser.total_pss
 
 
 
@@ -256,12 +298,13 @@ def save_to_excel(pss_data, total_pss, output_excel_path):
     print(f"Excel 文件已保存: {output_excel_path}")
 
 
-def process_hidumper_file(hidumper_file_path):
+def process_hidumper_file(hidumper_file_path, output_base=None):
     """
     处理单个 hidumper.txt 文件
     
     Args:
         hidumper_file_path: str, hidumper.txt 文件路径
+        output_base: str, 输出文件路径前缀（不含 _analysis.xlsx），默认与输入文件同目录同名
     """
     print(f"正在处理: {hidumper_file_path}")
     
@@ -276,12 +319,12 @@ def process_hidumper_file(hidumper_file_path):
     print(f"找到 {len(pss_data)} 个内存类型")
     
     # 生成输出路径
-    file_path = Path(hidumper_file_path)
-    base_name = file_path.stem  # 不包含扩展名
-    output_dir = file_path.parent
+    if output_base is None:
+        file_path = Path(hidumper_file_path)
+        output_base = file_path.parent / file_path.stem  # 不包含扩展名
     
     # 保存到 Excel（包含可编辑的图表）
-    excel_path = output_dir / f"{base_name}_analysis.xlsx"
+    excel_path = Path(f"{output_base}_analysis.xlsx")
     save_to_excel(pss_data, total_pss, str(excel_path))
     
     print(f"分析完成: {excel_path}\n")
@@ -290,29 +333,35 @@ def process_hidumper_file(hidumper_file_path):
 def main():
     """主函数"""
     if not HAS_DEPENDENCIES:
+        print(f"错误: 缺少必要的依赖包: {DEPENDENCY_ERROR}")
+        print("请运行以下命令安装依赖:")
+        print("  pip install pandas openpyxl")
+        print("或者:")
+        print("  pip install -r requirements_analyze.txt")
         return
     
-    # 获取 hiperf_output 目录
+    # 产物存储中的 hidumper 产物（压缩存放，结果输出到对应运行目录），以及旧版 hiperf_output 目录下的文件
     current_dir = Path(__file__).parent
     hiperf_dir = current_dir / "hiperf_output"
+    store = ArtifactStore()
     
-    if not hiperf_dir.exists():
-        print(f"错误: 目录不存在 {hiperf_dir}")
-        return
-    
-    # 查找所有 hidumper.txt 文件
-    hidumper_files = list(hiperf_dir.glob("*hidumper.txt"))
+    targets = []
+    for run_id, entry in store.find(name_suffix="hidumper.txt"):
+        output_base = store.run_dir(run_id) / Path(entry["name"]).stem
+        targets.append((str(store.entry_path(entry)), output_base))
+    if hiperf_dir.exists():
+        targets.extend((str(path), None) for path in hiperf_dir.glob("*hidumper.txt"))
     
-    if not hidumper_files:
-        print(f"未找到 hidumper.txt 文件在 {hiperf_dir}")
+    if not targets:
+        print(f"未找到 hidumper.txt 文件在 {store.runs_dir} 或 {hiperf_dir}")
         return
     
-    print(f"找到 {len(hidumper_files)} 个 hidumper.txt 文件\n")
+    print(f"找到 {len(targets)} 个 hidumper.txt 文件\n")
     
     # 处理每个文件
-    for hidumper_file in hidumper_files:
+    for hidumper_file, output_base in targets:
         try:
-            process_hidumper_file(str(hidumper_file))
+            process_hidumper_file(hidumper_file, output_base)
         except Exception as e:
             print(f"处理 {hidumper_file} 时出错: {e}\n")
             import traceback
@@ -0,0 +1,93 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ActionPacer.py
+#文件说明：                 固定频率操作节拍器：按单调时钟的绝对截止时间调度操作，统计实际频率
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import math
+import time
+
+
+class ActionPacer:
+    """按固定周期调度操作
+
+    每次操作的截止时间为 起始时间 + i * period（绝对时间，单调时钟），
+    操作本身的耗时（如slide的驱动延迟）自动从等待时间中扣除，不会累积漂移。
+    某次操作晚于截止时间超过一个周期时，记为错过截止时间并以当前时间重新对齐，
+    避免为了追赶进度而连续突发执行。
+    """
+
+    def __init__(self, period, name="", tolerance=None):
+        self.period = period
+        self.name = name
+        # 晚于截止时间多少秒算作错过，默认周期的10%
+        self.tolerance = period * 0.1 if tolerance is None else tolerance
+        self.missed = 0
+        self._starts = []
+        self._lateness = []
+        self._durations = []
+
+    def ticks(self, count):
+        """生成count个节拍，在每个节拍的截止时间到达后yield操作序号"""
+        deadline = time.monotonic()
+        for i in range(count):
+            now = time.monotonic()
+            if now < deadline:
+                time.sleep(deadline - now)
+                now = time.monotonic()
+            lateness = now - deadline
+            self._starts.append(now)
+            self._lateness.append(lateness)
+            if lateness > self.tolerance:
+                self.missed += 1
+                if lateness > self.period:
+                    # 落后超过一个周期，重新对齐，不补发
+                    deadline = now
+            yield i
+            self._durations.append(time.monotonic() - now)
+            deadline += self.period
+
+    def report(self):
+        """返回本轮节拍统计：目标/实际频率、间隔抖动、截止时间偏差、错过次数、操作耗时"""
+        count = len(self._starts)
+        report = {
+            "name": self.name,
+            "actions": count,
+            "target_rate": 1.0 / self.period if self.period > 0 else 0.0,
+            "achieved_rate": 0.0,
+            "jitter_ms": 0.0,
+            "mean_lateness_ms": 0.0,
+            "max_lateness_ms": 0.0,
+            "missed": self.missed,
+            "mean_action_ms": 0.0,
+        }
+        if count == 0:
+            return report
+        if count > 1:
+            span = self._starts[-1] - self._starts[0]
+            if span > 0:
+                report["achieved_rate"] = (count - 1) / span
+            intervals = [b - a for a, b in zip(self._starts, self._starts[1:])]
+            mean_interval = sum(intervals) / len(intervals)
+            variance = sum((v - mean_interval) ** 2 for v in intervals) / len(intervals)
+            report["jitter_ms"] = math.sqrt(variance) * 1000
+        report["mean_lateness_ms"] = sum(self._lateness) / count * 1000
+        report["max_lateness_ms"] = max(self._lateness) * 1000
+        if self._durations:
+            report["mean_action_ms"] = sum(self._durations) / len(self._durations) * 1000
+        return report
+
+    def format_report(self):
+        """格式化统计结果用于打印"""
+        r = self.report()
+        return (f"[Pacer] {r['name']}: {r['actions']}次操作, 目标 {r['target_rate']:.2f}次/秒, "
+                f"实际 {r['achieved_rate']:.2f}次/秒, 间隔抖动 {r['jitter_ms']:.1f}ms, "
+                f"平均延迟 {r['mean_lateness_ms']:.1f}ms, 最大延迟 {r['max_lateness_ms']:.1f}ms, "
+                f"错过截止时间 {r['missed']}次, 平均操作耗时 {r['mean_action_ms']:.1f}ms")
@@ -0,0 +1,182 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ArtifactStore.py
+#文件说明：                 运行产物存储：原子分配运行目录，gzip压缩、按内容哈希去重，每次运行一个产物索引
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from aw.ResultsStore import new_run_id
+
+DEFAULT_ARTIFACT_ROOT = Path(__file__).parent.parent / "artifacts"
+INDEX_FILE = "index.json"
+GZIP_MAGIC = b"\x1f\x8b"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def open_artifact(path, mode="rt", encoding="utf-8"):
+    """打开产物文件：gzip压缩的文件（按文件头判断，与扩展名无关）按流解压，未压缩的文件直接打开"""
+    with open(path, "rb") as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    text = "b" not in mode
+    if compressed:
+        # gzip.open的'r'是二进制模式，文本模式需要显式加't'
+        return gzip.open(path, mode + "t" if text and "t" not in mode else mode,
+                         encoding=encoding if text else None)
+    return open(path, mode, encoding=encoding if text else None)
+
+
+class ArtifactStore:
+    """运行产物存储
+
+    目录结构：
+      objects/<sha256前2位>/<sha256>.gz   按原始内容sha256寻址的gzip压缩文件，内容相同的产物只存一份
+      runs/<run_id>/                      每次运行一个目录，用mkdir原子创建，并行运行不会分到同一个目录
+      runs/<run_id>/index.json            本次运行的产物索引：名称、类型、哈希、原始大小、压缩后大小
+    下载/写入中的原始文件先放在运行目录下（staging_path），put_file后压缩入库并删除原始文件。
+    """
+
+    def __init__(self, root=DEFAULT_ARTIFACT_ROOT, compresslevel=6):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.runs_dir = self.root / "runs"
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+
+    def create_run(self, run_id=None):
+        """原子创建运行目录并返回run_id；指定的run_id已存在时改用新生成的run_id"""
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            run_id = run_id or new_run_id()
+            try:
+                (self.runs_dir / run_id).mkdir()
+                return run_id
+            except FileExistsError:
+                run_id = None
+
+    def run_dir(self, run_id):
+        return self.runs_dir / run_id
+
+    def staging_path(self, run_id, name):
+        """原始产物在运行目录下的临时路径，文件名在一次运行内唯一，不需要探测已有文件"""
+        return str(self.run_dir(run_id) / name)
+
+    def object_path(self, sha256):
+        return self.objects_dir / sha256[:2] / f"{sha256}.gz"
+
+    def put_file(self, run_id, kind, path, name=None, keep_source=False):
+        """把文件压缩入库并登记到运行索引，返回索引条目
+        边读边计算哈希和压缩（不把整个文件读入内存），对象已存在时丢弃本次压缩结果
+        """
+        name = name or os.path.basename(path)
+        tmp_dir = self.objects_dir / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".gz")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(path, "rb") as src, os.fdopen(fd, "wb") as raw:
+                # 不写入文件名和修改时间，相同内容压缩结果一致
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw,
+                                   compresslevel=self.compresslevel, mtime=0) as dst:
+                    for chunk in iter(lambda: src.read(_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        size += len(chunk)
+                        dst.write(chunk)
+            sha256 = digest.hexdigest()
+            target = self.object_path(sha256)
+            deduplicated = target.exists()
+            if deduplicated:
+                os.remove(tmp_path)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if not keep_source:
+            os.remove(path)
+        entry = {
+            "name": name,
+            "kind": kind,
+            "sha256": sha256,
+            "size": size,
+            "stored_size": target.stat().st_size,
+            "object": str(target.relative_to(self.root)),
+            "deduplicated": deduplicated,
+            "created": int(time.time() * 1000000),
+        }
+        self._append_index(run_id, entry)
+        return entry
+
+    def put_bytes(self, run_id, kind, name, data):
+        """把内存中的内容入库（先写到运行目录下再压缩），返回索引条目"""
+        path = self.staging_path(run_id, name)
+        with open(path, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        return self.put_file(run_id, kind, path, name)
+
+    def _append_index(self, run_id, entry):
+        with self._lock:
+            entries = self.index(run_id)
+            entries = [e for e in entries if e["name"] != entry["name"]] + [entry]
+            index_path = self.run_dir(run_id) / INDEX_FILE
+            tmp_path = index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, index_path)
+
+    def index(self, run_id):
+        """返回运行的产物索引：[{name, kind, sha256, size, stored_size, object, ...}, ...]"""
+        try:
+            with open(self.run_dir(run_id) / INDEX_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def runs(self):
+        if not self.runs_dir.exists():
+            return []
+        return sorted(p.name for p in self.runs_dir.iterdir() if p.is_dir())
+
+    def find(self, kind=None, name_suffix=None):
+        """遍历所有运行的产物，产出(run_id, 索引条目)"""
+        for run_id in self.runs():
+            for entry in self.index(run_id):
+                if kind is not None and entry["kind"] != kind:
+                    continue
+                if name_suffix is not None and not entry["name"].endswith(name_suffix):
+                    continue
+                yield run_id, entry
+
+    def entry_path(self, entry):
+        return self.root / entry["object"]
+
+    def open(self, run_id, name, mode="rt", encoding="utf-8"):
+        """按名称打开运行的产物，返回解压后的流"""
+        for entry in self.index(run_id):
+            if entry["name"] == name:
+                return open_artifact(self.entry_path(entry), mode, encoding)
+        raise FileNotFoundError(f"运行 {run_id} 中没有产物 {name}")
+
+    def extract(self, run_id, name, dest_path):
+        """把产物解压到指定路径（供只能读取普通文件的外部工具使用，如trace查看器）"""
+        with self.open(run_id, name, "rb") as src, open(dest_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+        return dest_path
@@ -0,0 +1,111 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 BaselineGate.py
+#文件说明：                 按应用版本的内存指标基线门禁：与上一版本的滚动基线做统计比较，给出通过/不通过结论
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import math
+
+# 参与门禁的指标及其绝对容差（指标值越大越差）
+GATED_METRICS = {
+    # anon:Kotlin物理内存峰值（kB）
+    "pmap_peak_physical_kb": 2048,
+    # hidumper总PSS（kB）
+    "hidumper_total_pss_kb": 4096,
+    # anon:Kotlin物理内存增长斜率（kB/分钟）
+    "pmap_growth_kb_per_min": 256,
+}
+
+
+def _mean_std(values):
+    n = len(values)
+    mean = sum(values) / n
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1)) if n > 1 else 0.0
+    return mean, std
+
+
+class BaselineGate:
+    """基线门禁
+
+    - 基线：每个(用例, versionCode, 冷/热启动, 指标)取该版本该启动类型最近window次运行的均值和标准差，
+      保存在结果库baselines表中，每次运行结束后滚动更新；冷启动和热启动的内存、启动数据分布不同，只与同类型比较
+    - 判定：当前版本（本次运行及该版本最近的运行）与上一版本基线比较，
+      统计量 = (当前均值 - 基线均值) / 标准误，当前只有一次运行时退化为z分数；
+      统计量超过threshold且差值超过容差 max(rel_tolerance * 基线均值, 指标绝对容差) 时判定该指标不通过
+    - 上一版本基线不足min_baseline_runs次运行时该指标不参与判定
+    """
+
+    def __init__(self, store, window=20, threshold=3.0, rel_tolerance=0.05, min_baseline_runs=5):
+        self.store = store
+        self.window = window
+        self.threshold = threshold
+        self.rel_tolerance = rel_tolerance
+        self.min_baseline_runs = min_baseline_runs
+
+    def _version_values(self, testcase, metric, version_code, start_type):
+        return [row[3] for row in self.store.query_metric(testcase, metric, version_code, limit=self.window,
+                                                          start_type=start_type)
+                if row[3] is not None]
+
+    def evaluate(self, testcase, version_code, metrics, start_type="cold"):
+        """用本次运行的指标（尚未写入结果库）与上一版本同一启动类型（cold/warm）的基线比较
+
+        Returns:
+            dict: {"passed": bool, "start_type": 启动类型, "metrics": {指标名: 判定详情}}
+        """
+        results = {}
+        for metric, abs_tolerance in GATED_METRICS.items():
+            if metrics.get(metric) is None:
+                continue
+            baseline = self.store.get_previous_baseline(testcase, metric, version_code, self.min_baseline_runs,
+                                                        start_type)
+            if baseline is None:
+                continue
+            current = [metrics[metric]] + self._version_values(testcase, metric, version_code,
+                                                               start_type)[:self.window - 1]
+            current_mean, current_std = _mean_std(current)
+            if len(current) > 1:
+                stderr = math.sqrt(baseline["std"] ** 2 / baseline["n"] + current_std ** 2 / len(current))
+            else:
+                stderr = baseline["std"]
+            diff = current_mean - baseline["mean"]
+            tolerance = max(self.rel_tolerance * abs(baseline["mean"]), abs_tolerance)
+            statistic = diff / stderr if stderr > 0 else (math.inf if diff > 0 else 0.0)
+            results[metric] = {
+                "baseline_version": baseline["version_code"],
+                "baseline_mean": baseline["mean"],
+                "baseline_std": baseline["std"],
+                "baseline_n": baseline["n"],
+                "current_mean": current_mean,
+                "current_n": len(current),
+                "statistic": statistic,
+                "tolerance": tolerance,
+                "passed": not (statistic > self.threshold and diff > tolerance),
+            }
+        return {"passed": all(r["passed"] for r in results.values()), "start_type": start_type, "metrics": results}
+
+    def update_baselines(self, testcase, version_code, start_type="cold"):
+        """本次运行写入结果库后，滚动更新当前版本该启动类型的基线"""
+        for metric in GATED_METRICS:
+            values = self._version_values(testcase, metric, version_code, start_type)
+            if values:
+                mean, std = _mean_std(values)
+                self.store.upsert_baseline(testcase, version_code, metric, len(values), mean, std, start_type)
+
+    @staticmethod
+    def format_verdict(verdict):
+        lines = [f"[Baseline Gate] 结论（{verdict['start_type']}）: {'通过' if verdict['passed'] else '不通过'}"]
+        if not verdict["metrics"]:
+            lines.append(f"[Baseline Gate] 没有可比较的上一版本{verdict['start_type']}基线")
+        for metric, r in verdict["metrics"].items():
+            lines.append(f"[Baseline Gate] {metric}: 当前 {r['current_mean']:.1f} (n={r['current_n']}) vs "
+                         f"版本{r['baseline_version']}基线 {r['baseline_mean']:.1f}±{r['baseline_std']:.1f} (n={r['baseline_n']}), "
+                         f"统计量 {r['statistic']:.2f}, 容差 {r['tolerance']:.1f} -> {'通过' if r['passed'] else '不通过'}")
+        return "\n".join(lines)
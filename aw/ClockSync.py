@@ -0,0 +1,154 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ClockSync.py
+#文件说明：                 主机/设备时钟同步：运行开始和结束时各做一组往返探测，估计时钟偏差和漂移，统一到主机时间轴
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import statistics
+import time
+
+from aw.Hdc import run_hdc_shell
+
+# 设备端依次输出realtime（纳秒）和/proc/uptime（boottime秒，精度10毫秒）
+PROBE_COMMAND = "date +%s%N; cat /proc/uptime"
+# /proc/uptime只保留两位小数
+UPTIME_RESOLUTION_US = 10000
+
+
+def parse_probe_output(output):
+    """解析探测输出，返回(设备realtime微秒, 设备boottime微秒)，格式不对时返回None"""
+    lines = output.split()
+    try:
+        return int(lines[0]) / 1000.0, float(lines[1]) * 1000000
+    except (ValueError, IndexError):
+        return None
+
+
+class ClockSync:
+    """主机/设备时钟同步（NTP式往返探测）
+
+    每组探测连续执行probes次，记录主机发出/收到的时间h0/h1和设备realtime d：
+      往返时延 rtt = h1 - h0，偏差 offset = d - (h0 + h1) / 2
+    hdc的往返时延包含主机进程启动和传输，抖动很大，只保留往返时延最小的一次，误差不超过其rtt/2。
+    开始和结束各一组：两组偏差之差除以时间间隔即为设备时钟相对主机的漂移，中间按线性插值，
+    两端误差都不超过各自rtt/2时，插值结果的误差也不超过其中较大者（运行越长，漂移估计越准）。
+
+    设备boottime（/proc/uptime、帧时间戳、htrace使用的时钟）通过同一次探测中realtime与uptime的差值换算，
+    取全部探测的中位数，受/proc/uptime精度限制，额外误差约±5毫秒。
+    所有时间单位为微秒，主机时间为time.time()。
+    """
+
+    def __init__(self, command_runner=run_hdc_shell, probes=8):
+        self.command_runner = command_runner
+        self.probes = probes
+        # 每组探测的结果：[{label, host_us, offset_us, rtt_us, probes}, ...]
+        self.bursts = []
+        # 全部探测的 设备realtime - boottime（即设备开机时刻的realtime，微秒）
+        self._boot_realtimes = []
+
+    def measure(self, label=""):
+        """执行一组探测，返回本组结果，全部探测失败时返回None"""
+        samples = []
+        for _ in range(self.probes):
+            host_send = time.time_ns() / 1000.0
+            try:
+                output = self.command_runner(PROBE_COMMAND)
+            except Exception as e:
+                print(f"[Clock Sync] 探测失败: {e}")
+                continue
+            host_recv = time.time_ns() / 1000.0
+            parsed = parse_probe_output(output)
+            if parsed is None:
+                continue
+            realtime_us, boottime_us = parsed
+            samples.append((host_recv - host_send, (host_send + host_recv) / 2, realtime_us))
+            self._boot_realtimes.append(realtime_us - boottime_us)
+        if not samples:
+            print(f"[Clock Sync] {label} 探测无有效结果")
+            return None
+        rtt, host_mid, realtime_us = min(samples)
+        burst = {"label": label, "host_us": host_mid, "offset_us": realtime_us - host_mid,
+                 "rtt_us": rtt, "probes": len(samples)}
+        self.bursts.append(burst)
+        return burst
+
+    @property
+    def drift(self):
+        """设备realtime相对主机时间的漂移率（无量纲，1e-6即1ppm），只有一组探测时为None"""
+        if len(self.bursts) < 2:
+            return None
+        first, last = self.bursts[0], self.bursts[-1]
+        span = last["host_us"] - first["host_us"]
+        if span <= 0:
+            return None
+        return (last["offset_us"] - first["offset_us"]) / span
+
+    @property
+    def drift_uncertainty(self):
+        """漂移估计的不确定度：两组偏差误差之和除以时间间隔，运行时间短时漂移估计不可靠"""
+        if self.drift is None:
+            return None
+        first, last = self.bursts[0], self.bursts[-1]
+        return (first["rtt_us"] + last["rtt_us"]) / 2 / (last["host_us"] - first["host_us"])
+
+    def device_to_host_us(self, realtime_us):
+        """设备realtime（微秒）换算为主机时间（微秒）"""
+        first = self.bursts[0]
+        # device = host + offset0 + drift * (host - t0)，解出host
+        return first["host_us"] + (realtime_us - first["offset_us"] - first["host_us"]) / (1.0 + (self.drift or 0.0))
+
+    def boottime_to_host_us(self, boottime_us):
+        """设备boottime/单调时钟（微秒）换算为主机时间（微秒）"""
+        return self.device_to_host_us(self.boot_realtime_us + boottime_us)
+
+    @property
+    def boot_realtime_us(self):
+        # uptime截断到10毫秒，期望偏小5毫秒，中位数减去半个精度补偿
+        return statistics.median(self._boot_realtimes) - UPTIME_RESOLUTION_US / 2
+
+    def alignment_error_us(self, boottime=False):
+        """换算到主机时间轴的误差上界（微秒）：各组最小往返时延的一半，boottime再加上uptime精度误差"""
+        if not self.bursts:
+            return None
+        error = max(burst["rtt_us"] for burst in self.bursts) / 2
+        if boottime:
+            error += UPTIME_RESOLUTION_US / 2
+        return error
+
+    def summary(self):
+        """返回同步结果dict，可以保存为产物供离线对齐htrace等设备端数据"""
+        if not self.bursts:
+            return {}
+        drift = self.drift
+        return {
+            "bursts": self.bursts,
+            "offset_us": self.bursts[0]["offset_us"],
+            "reference_host_us": self.bursts[0]["host_us"],
+            "drift_ppm": drift * 1e6 if drift is not None else None,
+            "drift_uncertainty_ppm": self.drift_uncertainty * 1e6 if drift is not None else None,
+            "boot_realtime_us": self.boot_realtime_us,
+            "realtime_error_us": self.alignment_error_us(),
+            "boottime_error_us": self.alignment_error_us(boottime=True),
+            # 换算公式：host_us = reference_host_us + (realtime_us - offset_us - reference_host_us) / (1 + drift)
+            #          realtime_us = boot_realtime_us + boottime_us
+        }
+
+    def format_report(self):
+        if not self.bursts:
+            return "[Clock Sync] 未完成时钟同步，采样使用主机发起命令时的时间戳"
+        lines = [f"[Clock Sync] {b['label']}: 偏差 {b['offset_us'] / 1000:+.3f}ms, 最小往返 {b['rtt_us'] / 1000:.1f}ms "
+                 f"({b['probes']}次探测)" for b in self.bursts]
+        drift = self.drift
+        drift_text = ("未知（只有一组探测）" if drift is None
+                      else f"{drift * 1e6:+.1f}±{self.drift_uncertainty * 1e6:.1f}ppm")
+        lines.append(f"[Clock Sync] 漂移 {drift_text}，"
+                     f"对齐误差 realtime ±{self.alignment_error_us() / 1000:.1f}ms，"
+                     f"boottime ±{self.alignment_error_us(boottime=True) / 1000:.1f}ms")
+        return "\n".join(lines)
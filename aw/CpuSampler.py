@@ -0,0 +1,204 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 CpuSampler.py
+#文件说明：                 进程/线程CPU占用采样：每次一个设备端调用读取所有线程stat，主机端计算差值
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from aw.Hdc import pid_lookup_script, run_hdc_shell
+
+# /proc/<pid>/stat中utime/stime的单位（USER_HZ），ARM Linux固定为100
+CLOCK_TICKS_PER_SECOND = 100
+
+
+def parse_stat_line(line):
+    """解析/proc/<pid>/stat或/proc/<pid>/task/<tid>/stat的一行
+
+    Returns:
+        (tid, 线程名, utime+stime ticks)，解析失败返回None
+    """
+    left = line.find("(")
+    right = line.rfind(")")
+    if left < 0 or right < left:
+        return None
+    try:
+        tid = int(line[:left].strip())
+        fields = line[right + 2:].split()
+        # ')'之后的第12、13个字段是utime、stime
+        return tid, line[left + 1:right], int(fields[11]) + int(fields[12])
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_cpu_output(text):
+    """解析一次采样的输出：第一行/proc/uptime，第二行进程stat，之后为各线程stat
+
+    Returns:
+        (设备uptime秒, 进程ticks, {tid: (线程名, ticks)}, (pid, 进程starttime))，输出无效时返回None
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < 2:
+        return None
+    try:
+        uptime = float(lines[0].split()[0])
+    except (ValueError, IndexError):
+        return None
+    process = parse_stat_line(lines[1])
+    if process is None:
+        return None
+    # ')'之后的第20个字段是进程启动时间，与pid一起标识进程实例（pid可能被复用）
+    try:
+        starttime = int(lines[1][lines[1].rfind(")") + 2:].split()[19])
+    except (ValueError, IndexError):
+        starttime = 0
+    threads = {}
+    for line in lines[2:]:
+        parsed = parse_stat_line(line)
+        if parsed is not None:
+            threads[parsed[0]] = (parsed[1], parsed[2])
+    return uptime, process[2], threads, (process[0], starttime)
+
+
+class CpuSampleBuffer:
+    """列式存储的CPU采样数据
+
+    每个tick一行：tick_timestamps（微秒）、tick_uptimes（设备boottime秒，用于时钟对齐）、process_pct（进程总CPU%）；
+    线程数据按行展开：thread_tick（所属tick下标）、thread_tid、thread_pct，线程名单独存一份
+    """
+
+    def __init__(self):
+        self.tick_timestamps = array('q')
+        self.tick_uptimes = array('d')
+        self.process_pct = array('f')
+        self.thread_tick = array('I')
+        self.thread_tid = array('i')
+        self.thread_pct = array('f')
+        self.thread_names = {}
+
+    def __len__(self):
+        return len(self.tick_timestamps)
+
+    def append_tick(self, timestamp_us, process_pct, thread_rows, uptime=0.0):
+        """追加一个tick，thread_rows为[(tid, 线程名, cpu%), ...]"""
+        tick = len(self.tick_timestamps)
+        self.tick_timestamps.append(timestamp_us)
+        self.tick_uptimes.append(uptime)
+        self.process_pct.append(process_pct)
+        for tid, name, pct in thread_rows:
+            self.thread_tick.append(tick)
+            self.thread_tid.append(tid)
+            self.thread_pct.append(pct)
+            self.thread_names[tid] = name
+
+    def top_threads(self, start_us, end_us, top_n=5):
+        """统计时间段内平均CPU%最高的线程，返回[(线程名, tid, 平均CPU%), ...]"""
+        # tick时间戳和thread_tick都是递增的，二分查找定位区间
+        first = bisect_left(self.tick_timestamps, start_us)
+        last = bisect_left(self.tick_timestamps, end_us)
+        if first >= last:
+            return []
+        totals = {}
+        for row in range(bisect_left(self.thread_tick, first), bisect_left(self.thread_tick, last)):
+            tid = self.thread_tid[row]
+            totals[tid] = totals.get(tid, 0.0) + self.thread_pct[row]
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        return [(self.thread_names.get(tid, ""), tid, total / (last - first)) for tid, total in ranked]
+
+
+class CpuSampler:
+    """后台线程定期采集应用进程和所有线程的CPU时间，计算相邻两次采样间的CPU占用百分比"""
+
+    def __init__(self, package_name, interval=1.0, command_runner=run_hdc_shell):
+        self.package_name = package_name
+        self.interval = interval
+        self.command_runner = command_runner
+        self.buffer = CpuSampleBuffer()
+        self.step_report = {}
+        self._previous = None
+        self._running = False
+        self._thread = None
+
+    def _command(self):
+        return (f'{pid_lookup_script(self.package_name)}; '
+                f'if [ -n "$pid" ]; then cat /proc/uptime /proc/$pid/stat /proc/$pid/task/*/stat 2>/dev/null; fi')
+
+    def sample_once(self):
+        """采集一次，与上次采样做差值后写入buffer"""
+        timestamp = int(time.time() * 1000000)
+        parsed = parse_cpu_output(self.command_runner(self._command()))
+        if parsed is None:
+            # 进程不存在，差值基准失效
+            self._previous = None
+            return
+        uptime, process_ticks, threads, process_key = parsed
+        previous = self._previous
+        self._previous = parsed
+        if previous is None:
+            return
+        elapsed = uptime - previous[0]
+        if elapsed <= 0:
+            return
+        scale = 100.0 / (CLOCK_TICKS_PER_SECOND * elapsed)
+        if process_key != previous[3] or process_ticks < previous[1]:
+            # 进程重启（pid或启动时间变化），以本次采样重新建立基准
+            return
+        rows = []
+        previous_threads = previous[2]
+        for tid, (name, ticks) in threads.items():
+            before = previous_threads.get(tid)
+            if before is None:
+                # 新线程的累计CPU时间包含上次采样之前的部分，本次只作为基准，下次采样开始计算
+                continue
+            delta = ticks - before[1]
+            if delta > 0:
+                rows.append((tid, name, delta * scale))
+        self.buffer.append_tick(timestamp, (process_ticks - previous[1]) * scale, rows, uptime)
+
+    def _run(self):
+        while self._running:
+            loop_start = time.monotonic()
+            try:
+                self.sample_once()
+            except Exception as e:
+                print(f"[CPU Monitor] 采集CPU数据失败: {e}")
+            sleep_time = self.interval - (time.monotonic() - loop_start)
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+    def start(self):
+        self._running = True
+        self.buffer = CpuSampleBuffer()
+        self._previous = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"[CPU Monitor] 已启动，采样间隔: {self.interval}秒")
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        print(f"[CPU Monitor] 已停止，共采集 {len(self.buffer)} 个数据点")
+
+    def report_by_step(self, run_events, top_n=5):
+        """按测试步骤统计CPU占用最高的线程，返回{步骤名: [(线程名, tid, 平均CPU%), ...]}"""
+        steps = [(event[0], event[2]) for event in run_events if event[1] == "step"]
+        self.step_report = {}
+        for i, (start, name) in enumerate(steps):
+            end = steps[i + 1][0] if i + 1 < len(steps) else 2 ** 62
+            top = self.buffer.top_threads(start, end, top_n)
+            if top:
+                self.step_report[name] = top
+                threads = ", ".join(f"{thread}({tid}) {pct:.1f}%" for thread, tid, pct in top)
+                print(f"[CPU Monitor] {name}: {threads}")
+        return self.step_report
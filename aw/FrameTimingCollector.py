@@ -0,0 +1,220 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 FrameTimingCollector.py
+#文件说明：                 滑动流畅度采集：定期读取RenderService帧时间戳，按滑动窗口统计FPS、卡顿和帧耗时分位数
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import threading
+import time
+
+from aw.Hdc import run_hdc_shell
+
+# 设备端帧时间戳为纳秒，小于该值的数字行是刷新率等非时间戳数据
+_MIN_TIMESTAMP_NS = 1000000000
+# 没有滑动窗口时，相邻帧间隔超过该刷新周期数视为界面静止，不计入整体统计
+IDLE_GAP_FRAMES = 60
+
+
+def parse_fps_output(text):
+    """解析 hidumper -s 10 -a "fps <layer>" 的输出
+
+    输出为若干纯数字行：第一个较小的数字是屏幕刷新率，其余是每帧的上屏时间戳（纳秒），0表示空槽位
+    Returns:
+        (refresh_rate 或 None, [timestamp_ns, ...] 升序)
+    """
+    refresh_rate = None
+    timestamps = []
+    for line in text.splitlines():
+        token = line.strip()
+        if not token.isdigit():
+            continue
+        value = int(token)
+        if value >= _MIN_TIMESTAMP_NS:
+            timestamps.append(value)
+        elif value > 0 and refresh_rate is None:
+            refresh_rate = value
+    timestamps.sort()
+    return refresh_rate, timestamps
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def compute_frame_stats(timestamps_ns, expected_interval_ms=None):
+    """根据一段时间内的帧时间戳计算FPS、卡顿次数和帧耗时分位数
+
+    卡顿定义：相邻两帧间隔超过期望帧间隔的1.5倍；未给出期望帧间隔时取帧间隔中位数
+    """
+    return compute_segments_stats([timestamps_ns], expected_interval_ms)
+
+
+def compute_segments_stats(segments, expected_interval_ms=None):
+    """合并多段帧时间戳（如各次滑动窗口）计算统计结果，只统计段内相邻帧的间隔
+
+    段与段之间的空闲时间（没有绘制）不计入时长和帧间隔，FPS = 段内帧间隔总数 / 各段时长之和
+    """
+    segments = [segment for segment in segments if segment]
+    frames = sum(len(segment) for segment in segments)
+    stats = {"frames": frames, "fps": 0.0, "jank": 0,
+             "frame_p50_ms": 0.0, "frame_p90_ms": 0.0, "frame_p99_ms": 0.0, "frame_max_ms": 0.0}
+    intervals = sorted((b - a) / 1000000.0 for segment in segments for a, b in zip(segment, segment[1:]))
+    if not intervals:
+        return stats
+    duration_s = sum(segment[-1] - segment[0] for segment in segments) / 1000000000.0
+    if expected_interval_ms is None:
+        expected_interval_ms = _percentile(intervals, 50)
+    stats["fps"] = len(intervals) / duration_s if duration_s > 0 else 0.0
+    stats["jank"] = sum(1 for v in intervals if v > expected_interval_ms * 1.5)
+    stats["frame_p50_ms"] = _percentile(intervals, 50)
+    stats["frame_p90_ms"] = _percentile(intervals, 90)
+    stats["frame_p99_ms"] = _percentile(intervals, 99)
+    stats["frame_max_ms"] = intervals[-1]
+    return stats
+
+
+def split_idle(timestamps_ns, idle_gap_ms):
+    """在相邻帧间隔超过idle_gap_ms处切分（界面静止时不绘制），返回各段帧时间戳"""
+    segments = []
+    start = 0
+    for index in range(1, len(timestamps_ns)):
+        if (timestamps_ns[index] - timestamps_ns[index - 1]) / 1000000.0 > idle_gap_ms:
+            segments.append(timestamps_ns[start:index])
+            start = index
+    segments.append(timestamps_ns[start:])
+    return segments
+
+
+class FrameTimingCollector:
+    """后台线程定期读取帧时间戳并去重累积，结束后按滑动窗口统计
+
+    设备端只保留最近一段时间的帧（约128帧），所以轮询间隔要小于缓冲区覆盖的时长。
+    设备帧时间戳与主机时间的偏移用 min(轮询结束主机时间 - 本次最大帧时间戳) 估计。
+    """
+
+    def __init__(self, layer, poll_interval=0.5, command_runner=run_hdc_shell):
+        self.layer = layer
+        self.poll_interval = poll_interval
+        self.command_runner = command_runner
+        self.refresh_rate = None
+        # 去重后的全部帧时间戳（纳秒，设备时钟）
+        self.timestamps = []
+        self.polls = 0
+        self.summary = {}
+        # 时钟同步结果（aw/ClockSync.py），设置后按设备单调时钟换算主机时间，否则使用轮询估计的偏差
+        self.clock = None
+        self._offset_s = None
+        self._running = False
+        self._thread = None
+
+    def poll_once(self):
+        """读取一次帧时间戳，只追加比已有最大值更新的帧"""
+        output = self.command_runner(f"hidumper -s 10 -a 'fps {self.layer}'")
+        poll_end = time.time()
+        self.polls += 1
+        refresh_rate, timestamps = parse_fps_output(output)
+        if refresh_rate:
+            self.refresh_rate = refresh_rate
+        if not timestamps:
+            return
+        last = self.timestamps[-1] if self.timestamps else 0
+        self.timestamps.extend(ts for ts in timestamps if ts > last)
+        offset = poll_end - timestamps[-1] / 1000000000.0
+        if self._offset_s is None or offset < self._offset_s:
+            self._offset_s = offset
+
+    def _run(self):
+        while self._running:
+            loop_start = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"[Frame Monitor] 读取帧时间戳失败: {e}")
+            sleep_time = self.poll_interval - (time.monotonic() - loop_start)
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+    def start(self):
+        self._running = True
+        self.timestamps = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"[Frame Monitor] 已启动，图层: {self.layer}，轮询间隔: {self.poll_interval}秒")
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        print(f"[Frame Monitor] 已停止，共采集 {len(self.timestamps)} 帧")
+
+    def to_host_time(self, timestamp_ns):
+        """把设备帧时间戳换算为主机时间（秒）"""
+        if self.clock is not None and self.clock.bursts:
+            # 测试期间设备不休眠，单调时钟与boottime一致
+            return self.clock.boottime_to_host_us(timestamp_ns / 1000.0) / 1000000.0
+        return timestamp_ns / 1000000000.0 + (self._offset_s or 0.0)
+
+    def _window_ranges(self, windows):
+        """把主机时间窗口映射为帧下标范围，产出(名称, 开始, 结束, 开始下标, 结束下标)"""
+        host_times = [self.to_host_time(ts) for ts in self.timestamps]
+        index = 0
+        for name, start, end in sorted(windows, key=lambda w: w[1]):
+            while index < len(host_times) and host_times[index] < start:
+                index += 1
+            stop = index
+            while stop < len(host_times) and host_times[stop] < end:
+                stop += 1
+            yield name, start, end, index, stop
+
+    def window_stats(self, windows):
+        """按主机时间窗口统计帧数据
+
+        Args:
+            windows: list, [(名称, 开始时间秒, 结束时间秒), ...]
+        Returns:
+            list: [{"name", "start", "end", 以及compute_frame_stats的字段}, ...]
+        """
+        expected = 1000.0 / self.refresh_rate if self.refresh_rate else None
+        results = []
+        for name, start, end, index, stop in self._window_ranges(windows):
+            stats = compute_frame_stats(self.timestamps[index:stop], expected)
+            stats.update({"name": name, "start": start, "end": end})
+            results.append(stats)
+        return results
+
+    def summarize(self, run_events):
+        """以运行事件中的每次滑动为一个窗口（到下一次滑动或1秒后结束）统计，并汇总整体结果
+
+        整体结果只统计各滑动窗口内的帧（窗口之间和窗口末尾的空闲时间不计入）；
+        没有滑动事件时统计全部帧，并在超过IDLE_GAP_FRAMES个刷新周期的间隔处切分
+        """
+        swipes = [event[0] / 1000000.0 for event in run_events if event[1] == "swipe"]
+        windows = []
+        for i, start in enumerate(swipes):
+            end = swipes[i + 1] if i + 1 < len(swipes) else start + 1.0
+            windows.append((f"swipe_{i}", start, end))
+        per_window = self.window_stats(windows)
+        expected = 1000.0 / self.refresh_rate if self.refresh_rate else None
+        if windows:
+            segments = [self.timestamps[index:stop] for _, _, _, index, stop in self._window_ranges(windows)]
+        else:
+            segments = split_idle(self.timestamps, IDLE_GAP_FRAMES * (expected or 1000.0 / 60))
+        overall = compute_segments_stats(segments, expected)
+        overall["windows"] = len(per_window)
+        overall["window_fps_min"] = min((w["fps"] for w in per_window if w["frames"] > 1), default=0.0)
+        overall["window_jank_total"] = sum(w["jank"] for w in per_window)
+        self.summary = {"overall": overall, "windows": per_window, "refresh_rate": self.refresh_rate}
+        print(f"[Frame Monitor] 平均FPS {overall['fps']:.1f}, 卡顿 {overall['jank']}次, "
+              f"帧耗时P50/P90/P99 {overall['frame_p50_ms']:.1f}/{overall['frame_p90_ms']:.1f}/{overall['frame_p99_ms']:.1f}ms, "
+              f"滑动窗口最低FPS {overall['window_fps_min']:.1f}")
+        return self.summary
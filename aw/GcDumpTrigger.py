@@ -0,0 +1,110 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 GcDumpTrigger.py
+#文件说明：                 由实时内存采样驱动的gc dump触发器：阈值穿越、新高、时间点，带防抖和最大次数限制
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import time
+
+
+class GcDumpTrigger:
+    """根据pmap物理内存采样决定何时触发gc dump
+
+    触发条件（满足任一即可，同一样本只触发一次；时间点独立于内存条件判定，到期时优先于阈值、新高，
+    避免内存持续增长时阈值/新高条件一直待触发，时间点永远轮不到）：
+      thresholds_kb       物理内存达到列表中的某个阈值（每个阈值只触发一次，同时越过多个阈值时一起记为已触发）
+      new_high_margin_kb  物理内存比上一次新高触发时（首次为预热结束时）高出该值
+      at_seconds          距离start()的时间达到列表中的某个时间点（按采样粒度判定）
+    限制：
+      debounce_seconds    两次dump的最小间隔，期间满足的条件保留到防抖结束后的下一个样本再判定
+      max_dumps           最多触发次数
+      warmup_seconds      start()之后的预热时间，预热期间不做新高判定（应用启动时内存快速上涨）
+    """
+
+    def __init__(self, fire, thresholds_kb=(), new_high_margin_kb=None, at_seconds=(),
+                 debounce_seconds=10, max_dumps=3, warmup_seconds=5):
+        # fire(reason, physical_kb)：实际执行dump的回调
+        self.fire = fire
+        self.thresholds_kb = sorted(thresholds_kb)
+        self.new_high_margin_kb = new_high_margin_kb
+        self.at_seconds = sorted(at_seconds)
+        self.debounce_seconds = debounce_seconds
+        self.max_dumps = max_dumps
+        self.warmup_seconds = warmup_seconds
+        # 已触发的dump：[(timestamp_us, 原因, 物理内存kB), ...]
+        self.dumps = []
+        # 因防抖或次数上限被推迟/放弃的判定次数
+        self.suppressed = 0
+        self._start = None
+        self._last_fire = None
+        self._threshold_index = 0
+        self._time_index = 0
+        self._high_reference = None
+
+    @classmethod
+    def from_config(cls, fire, config):
+        """从场景文件或用例属性中的配置dict创建"""
+        return cls(fire,
+                   thresholds_kb=config.get("thresholds_kb", ()),
+                   new_high_margin_kb=config.get("new_high_margin_kb"),
+                   at_seconds=config.get("at_seconds", ()),
+                   debounce_seconds=config.get("debounce_seconds", 10),
+                   max_dumps=config.get("max_dumps", 3),
+                   warmup_seconds=config.get("warmup_seconds", 5))
+
+    def start(self):
+        self._start = time.monotonic()
+
+    def _candidate(self, physical_kb, elapsed):
+        memory = None
+        if self._threshold_index < len(self.thresholds_kb) and physical_kb >= self.thresholds_kb[self._threshold_index]:
+            memory = "threshold"
+        elif self.new_high_margin_kb is not None and elapsed >= self.warmup_seconds:
+            if self._high_reference is None:
+                self._high_reference = physical_kb
+            elif physical_kb >= self._high_reference + self.new_high_margin_kb:
+                memory = "new_high"
+        if self._time_index < len(self.at_seconds) and elapsed >= self.at_seconds[self._time_index]:
+            return "time"
+        return memory
+
+    def on_sample(self, timestamp_us, physical_kb):
+        """每个有效内存样本调用一次，触发dump时返回原因，否则返回None"""
+        if self._start is None or physical_kb <= 0:
+            return None
+        now = time.monotonic()
+        kind = self._candidate(physical_kb, now - self._start)
+        if kind is None:
+            return None
+        if len(self.dumps) >= self.max_dumps or (
+                self._last_fire is not None and now - self._last_fire < self.debounce_seconds):
+            self.suppressed += 1
+            return None
+        if kind == "threshold":
+            while (self._threshold_index < len(self.thresholds_kb)
+                   and physical_kb >= self.thresholds_kb[self._threshold_index]):
+                self._threshold_index += 1
+            reason = f"threshold {self.thresholds_kb[self._threshold_index - 1]}kB"
+        elif kind == "new_high":
+            reason = f"new_high +{physical_kb - self._high_reference}kB"
+            self._high_reference = physical_kb
+        else:
+            reason = f"time {self.at_seconds[self._time_index]}s"
+            self._time_index += 1
+        self._last_fire = now
+        self.dumps.append((timestamp_us, reason, physical_kb))
+        self.fire(reason, physical_kb)
+        return reason
+
+    def format_report(self):
+        if not self.dumps:
+            return f"[GC Trigger] 未触发gc dump（被防抖/次数上限抑制 {self.suppressed} 次）"
+        items = ", ".join(f"{reason}@{physical}kB" for _, reason, physical in self.dumps)
+        return f"[GC Trigger] 共触发 {len(self.dumps)} 次gc dump: {items}（被抑制 {self.suppressed} 次）"
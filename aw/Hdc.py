@@ -0,0 +1,47 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 Hdc.py
+#文件说明：                 主机端hdc命令封装：不依赖hypium，采样器、采集器可以在没有测试框架的主机上加载和回放
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import subprocess
+import threading
+
+
+def pid_lookup_script(package_name: str) -> str:
+    """设备端shell片段，执行后$pid为应用主进程PID（没有进程时为空）
+    应用有子进程或渲染进程时pidof会输出多个PID，只取第一个，否则/proc/$pid、pmap、hidumper的参数无效
+    """
+    return f'pid=$(pidof {package_name}); pid=${{pid%% *}}'
+
+
+def run_hdc_shell(command: str, timeout: float = 5) -> str:
+    """通过hdc执行设备端命令并返回stdout，hdc从PATH中查找，可以替换为本地回放程序
+    以参数列表方式调用，命令原样交给设备端shell解释，主机端不做转义
+    """
+    result = subprocess.run(["hdc", "shell", command], capture_output=True, text=True, timeout=timeout)
+    return result.stdout
+
+
+def stream_hdc_shell(command: str, timeout: float = 30):
+    """通过hdc执行设备端命令，逐行产出stdout，不在主机端缓存完整输出；超时后终止hdc进程"""
+    process = subprocess.Popen(["hdc", "shell", command], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        for line in process.stdout:
+            yield line
+    finally:
+        timer.cancel()
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
@@ -0,0 +1,112 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 HidumperCollector.py
+#文件说明：                 运行期间定期采集hidumper --mem，逐行增量解析，只保留各内存类型PSS的时间序列
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import threading
+import time
+from array import array
+
+from aw.Hdc import pid_lookup_script, stream_hdc_shell
+from analyze_hidumper import HidumperStreamParser
+
+
+class HidumperSeries:
+    """hidumper快照的列式时间序列：每个内存类型一列，与timestamps等长，某次快照中没有的类型记为0
+    device_times为采集时的设备realtime（微秒，未知时为0），用于时钟对齐
+    """
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.device_times = array('q')
+        self.total_pss = array('l')
+        self.columns = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp_us, pss_data, total_pss, device_time_us=0):
+        count = len(self.timestamps)
+        self.timestamps.append(timestamp_us)
+        self.device_times.append(device_time_us)
+        self.total_pss.append(total_pss)
+        for name, value in pss_data.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = array('l', bytes(count * array('l').itemsize))
+            column.append(value)
+        for column in self.columns.values():
+            if len(column) == count:
+                column.append(0)
+
+    def peak(self):
+        """返回(总PSS峰值kB, 峰值时间戳)，没有数据时返回(0, None)"""
+        if not self.total_pss:
+            return 0, None
+        index = max(range(len(self.total_pss)), key=self.total_pss.__getitem__)
+        return self.total_pss[index], self.timestamps[index]
+
+
+class HidumperMemCollector:
+    """后台线程定期执行hidumper --mem，输出逐行送入增量解析器，解析结果追加到HidumperSeries"""
+
+    def __init__(self, package_name, interval=30.0, line_source=stream_hdc_shell):
+        self.package_name = package_name
+        self.interval = interval
+        # line_source(command, timeout)：逐行返回设备端命令输出
+        self.line_source = line_source
+        self.series = HidumperSeries()
+        self._running = False
+        self._thread = None
+
+    def capture_once(self):
+        """采集一次快照，返回总PSS（kB），进程不存在或输出无效时返回None"""
+        timestamp = int(time.time() * 1000000)
+        parser = HidumperStreamParser()
+        # 第一行输出设备realtime（纳秒），其余为hidumper输出
+        command = f'date +%s%N; {pid_lookup_script(self.package_name)}; if [ -n "$pid" ]; then hidumper --mem $pid; fi'
+        device_time = 0
+        for index, line in enumerate(self.line_source(command, max(30, self.interval))):
+            if index == 0 and line.strip().isdigit():
+                device_time = int(line) // 1000
+                continue
+            parser.feed(line)
+        if not parser.pss_data:
+            return None
+        self.series.append(timestamp, parser.pss_data, parser.total_pss, device_time)
+        return parser.total_pss
+
+    def _run(self):
+        while self._running:
+            loop_start = time.monotonic()
+            try:
+                self.capture_once()
+            except Exception as e:
+                print(f"[Hidumper Monitor] 采集hidumper快照失败: {e}")
+            sleep_time = self.interval - (time.monotonic() - loop_start)
+            while self._running and sleep_time > 0:
+                time.sleep(min(sleep_time, 0.2))
+                sleep_time = self.interval - (time.monotonic() - loop_start)
+
+    def start(self):
+        self.series = HidumperSeries()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"[Hidumper Monitor] 已启动，采样间隔: {self.interval}秒")
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=max(30, self.interval))
+        peak, _ = self.series.peak()
+        print(f"[Hidumper Monitor] 已停止，共 {len(self.series)} 个快照，{len(self.series.columns)} 种内存类型，"
+              f"总PSS峰值 {peak} kB")
@@ -0,0 +1,151 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 LeakDetector.py
+#文件说明：                 在线内存泄漏检测：滑动窗口增量稳健回归，估算内存增长速率
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import math
+from collections import deque
+
+
+class LeakDetectedError(Exception):
+    """在线检测判定内存泄漏，提前结束用例时抛出"""
+
+
+class OnlineLeakDetector:
+    """对内存采样做滑动窗口线性回归，判断内存是否持续增长
+
+    - 维护窗口内 n、Σx、Σy、Σxx、Σxy、Σyy 的累加和，新增/移出样本都是O(1)，不重新扫描历史
+    - 稳健性：新样本先按当前拟合值截断到 预测值 ± outlier_k * 残差尺度（残差尺度为|残差|的指数滑动平均），
+      单次GC或瞬时尖峰不会拉偏斜率
+    - 斜率的t值 = 斜率 / 斜率标准误，作为置信度依据
+    - 窗口内样本数、时间跨度都达到要求，且斜率和t值都超过阈值时给出泄漏判定
+    """
+
+    # x轴原点偏离窗口起点超过该秒数时平移原点，避免累加和数值精度下降
+    _REBASE_SECONDS = 3600.0
+
+    def __init__(self, window_seconds=120, min_samples=30, min_span_seconds=60,
+                 slope_threshold_kb_per_min=1024, t_threshold=4.0, outlier_k=4.0):
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.min_span_seconds = min_span_seconds
+        self.slope_threshold_kb_per_min = slope_threshold_kb_per_min
+        self.t_threshold = t_threshold
+        self.outlier_k = outlier_k
+        self.reset()
+
+    def reset(self):
+        """清空窗口（如进程重启后重新开始检测）"""
+        self._window = deque()
+        self._origin_us = None
+        self._n = 0
+        self._sx = 0.0
+        self._sy = 0.0
+        self._sxx = 0.0
+        self._sxy = 0.0
+        self._syy = 0.0
+        self._residual_scale = None
+
+    def _add_sums(self, x, y, sign):
+        self._n += sign
+        self._sx += sign * x
+        self._sy += sign * y
+        self._sxx += sign * x * x
+        self._sxy += sign * x * y
+        self._syy += sign * y * y
+
+    def _rebase(self, shift):
+        """把x轴原点后移shift秒，按公式平移累加和"""
+        n = self._n
+        self._sxx += -2 * shift * self._sx + n * shift * shift
+        self._sxy -= shift * self._sy
+        self._sx -= n * shift
+        self._window = deque((x - shift, y) for x, y in self._window)
+        self._origin_us += int(shift * 1000000)
+
+    def _fit(self):
+        """返回(斜率kB/秒, 截距, 斜率标准误)，样本不足时返回None"""
+        n = self._n
+        if n < 3:
+            return None
+        sxx_c = self._sxx - self._sx * self._sx / n
+        if sxx_c <= 0:
+            return None
+        sxy_c = self._sxy - self._sx * self._sy / n
+        syy_c = self._syy - self._sy * self._sy / n
+        slope = sxy_c / sxx_c
+        intercept = (self._sy - slope * self._sx) / n
+        sse = max(syy_c - slope * sxy_c, 0.0)
+        stderr = math.sqrt(sse / (n - 2) / sxx_c)
+        return slope, intercept, stderr
+
+    def add(self, timestamp_us, value_kb):
+        """加入一个样本（微秒时间戳，内存kB），判定为泄漏时返回判定结果dict，否则返回None"""
+        if value_kb <= 0:
+            # 进程未运行时的0值不参与回归
+            return None
+        if self._origin_us is None:
+            self._origin_us = timestamp_us
+        x = (timestamp_us - self._origin_us) / 1000000.0
+        y = float(value_kb)
+
+        fit = self._fit()
+        if fit is not None:
+            predicted = fit[0] * x + fit[1]
+            residual = y - predicted
+            if self._residual_scale:
+                limit = self.outlier_k * self._residual_scale
+                y = predicted + max(-limit, min(limit, residual))
+            # 残差尺度取|残差|的指数滑动平均，下限1kB
+            scale = max(abs(residual), 1.0)
+            if self._residual_scale is None:
+                self._residual_scale = scale
+            else:
+                self._residual_scale = 0.9 * self._residual_scale + 0.1 * min(scale, self.outlier_k * self._residual_scale)
+
+        self._window.append((x, y))
+        self._add_sums(x, y, 1)
+        while self._window and x - self._window[0][0] > self.window_seconds:
+            old_x, old_y = self._window.popleft()
+            self._add_sums(old_x, old_y, -1)
+        if self._window[0][0] > self._REBASE_SECONDS:
+            self._rebase(self._window[0][0])
+
+        return self.verdict()
+
+    def estimate(self):
+        """返回当前窗口的估计结果：增长速率(kB/分钟)、t值、置信度、样本数、时间跨度"""
+        fit = self._fit()
+        if fit is None:
+            return None
+        slope, _, stderr = fit
+        t_value = slope / stderr if stderr > 0 else (math.inf if slope > 0 else 0.0)
+        span = self._window[-1][0] - self._window[0][0]
+        return {
+            "slope_kb_per_min": slope * 60,
+            "t_value": t_value,
+            # 单侧正态近似：斜率大于0的置信度
+            "confidence": 0.5 * (1 + math.erf(t_value / math.sqrt(2))) if math.isfinite(t_value) else 1.0,
+            "samples": self._n,
+            "window_seconds": span,
+        }
+
+    def verdict(self):
+        """满足泄漏判定条件时返回估计结果，否则返回None"""
+        estimate = self.estimate()
+        if estimate is None:
+            return None
+        if (estimate["samples"] >= self.min_samples
+                and estimate["window_seconds"] >= self.min_span_seconds
+                and estimate["slope_kb_per_min"] >= self.slope_threshold_kb_per_min
+                and estimate["t_value"] >= self.t_threshold):
+            return estimate
+        return None
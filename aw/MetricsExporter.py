@@ -0,0 +1,131 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 MetricsExporter.py
+#文件说明：                 本地HTTP指标端点：按OpenMetrics/Prometheus文本格式输出各设备的实时采样指标
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 同一进程内按端口共享的端点：{(host, port): MetricsExporter}
+_EXPORTERS = {}
+_EXPORTERS_LOCK = threading.Lock()
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_metrics(families, openmetrics=True):
+    """families: [(指标名, 类型gauge/counter, 说明, [(标签dict, 数值), ...]), ...]，同名指标合并输出
+    counter的样本名带_total后缀；OpenMetrics格式以# EOF结尾
+    """
+    merged = {}
+    for name, kind, help_text, samples in families:
+        family = merged.setdefault(name, (kind, help_text, []))
+        family[2].extend(samples)
+    lines = []
+    for name, (kind, help_text, samples) in merged.items():
+        sample_name = name + "_total" if kind == "counter" else name
+        type_name = name if openmetrics else sample_name
+        lines.append(f"# TYPE {type_name} {kind}")
+        lines.append(f"# HELP {type_name} {help_text}")
+        for labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {value}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.server.exporter.render(openmetrics).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 抓取请求频繁，不打印访问日志
+        pass
+
+
+class MetricsExporter:
+    """在后台线程中提供/metrics端点
+
+    每个设备注册一个collect回调，返回format_metrics所需的指标列表。回调只在被抓取时调用，
+    由回调自行读取采样数据的快照（不加锁），采样线程中不做任何格式化。
+    同一设备再次注册时替换旧的回调，用例结束后端点仍保留最后一次运行的数值，直到下一个用例注册。
+    """
+
+    def __init__(self, port, host="127.0.0.1"):
+        self.host = host
+        self.port = port
+        # {设备标识: collect回调}
+        self.sources = {}
+        self._server = None
+        self._thread = None
+
+    def register(self, device, collect):
+        self.sources[device] = collect
+
+    def unregister(self, device):
+        self.sources.pop(device, None)
+
+    def render(self, openmetrics=True):
+        families = []
+        for device, collect in list(self.sources.items()):
+            try:
+                families.extend(collect())
+            except Exception as e:
+                print(f"[Metrics] 读取设备 {device} 的指标失败: {e}")
+        return format_metrics(families, openmetrics)
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.exporter = self
+        # 端口为0时由系统分配，记录实际端口
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[Metrics] 指标端点已启动: http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def get_exporter(port, host="127.0.0.1"):
+    """返回监听指定端口的共享端点，首次调用时启动"""
+    with _EXPORTERS_LOCK:
+        exporter = _EXPORTERS.get((host, port))
+        if exporter is None:
+            exporter = MetricsExporter(port, host)
+            exporter.start()
+            _EXPORTERS[(host, port)] = exporter
+        return exporter
@@ -0,0 +1,404 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 PmapSnapshotStore.py
+#文件说明：                 完整pmap快照的增量存储：定期采集pmap -x，只保存相对上一快照新增、删除、大小变化的映射
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+
+from aw.Hdc import pid_lookup_script, run_hdc_shell
+
+# 每条索引：时间戳（微秒）、记录在数据文件中的偏移、记录长度、是否关键帧
+_INDEX_FORMAT = "<qQIB"
+_INDEX_SIZE = struct.calcsize(_INDEX_FORMAT)
+_FLAG_KEYFRAME = 1
+
+SNAPSHOT_DATA_FILE = "snapshots.bin"
+SNAPSHOT_INDEX_FILE = "index.bin"
+MAPPING_TABLE_FILE = "mappings.tsv"
+
+
+def parse_pmap_snapshot(text):
+    """解析pmap -x输出，返回{(起始地址, 映射名): (Kbytes, RSS, Dirty)}
+
+    数据行格式：地址 Kbytes RSS/PSS Dirty [其他数字列] 权限 映射名，表头、分隔线和total行会被忽略
+    """
+    snapshot = {}
+    for line in text.splitlines():
+        tokens = line.split()
+        if len(tokens) < 3:
+            continue
+        try:
+            address = int(tokens[0], 16)
+        except ValueError:
+            continue
+        numbers = []
+        index = 1
+        while index < len(tokens) and tokens[index].isdigit():
+            numbers.append(int(tokens[index]))
+            index += 1
+        if not numbers:
+            continue
+        # 权限列之后是映射名，匿名映射没有名称
+        name = " ".join(tokens[index + 1:]) or "[anon]"
+        numbers += [0, 0]
+        snapshot[(address, name)] = (numbers[0], numbers[1], numbers[2])
+    return snapshot
+
+
+def _put_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _get_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class PmapSnapshotWriter:
+    """增量写入pmap快照
+
+    目录中包含三个文件：
+      mappings.tsv   映射定义表（id、起始地址、映射名），每个映射第一次出现时追加一行
+      snapshots.bin  快照记录：每keyframe_interval个快照写一个关键帧（全部映射，zlib压缩），
+                     其余为增量（新增、删除、大小变化的映射，数值变化用zigzag变长整数编码）
+      index.bin      定长索引，每个快照一条，读取时可直接定位任意快照
+    映射id按出现顺序递增，记录内按id排序后只保存id差值，进一步缩小编码长度。
+    """
+
+    def __init__(self, directory, keyframe_interval=30):
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        os.makedirs(directory, exist_ok=True)
+        self._data = open(os.path.join(directory, SNAPSHOT_DATA_FILE), "ab")
+        self._index = open(os.path.join(directory, SNAPSHOT_INDEX_FILE), "ab")
+        self._mappings = open(os.path.join(directory, MAPPING_TABLE_FILE), "a", encoding="utf-8")
+        self._ids = {}
+        self._previous = {}
+        self.count = 0
+        self.bytes_written = 0
+
+    def close(self):
+        for f in (self._data, self._index, self._mappings):
+            f.close()
+
+    def _mapping_id(self, key):
+        mapping_id = self._ids.get(key)
+        if mapping_id is None:
+            mapping_id = self._ids[key] = len(self._ids)
+            self._mappings.write(f"{mapping_id}\t{key[0]:x}\t{key[1]}\n")
+        return mapping_id
+
+    def add(self, timestamp_us, snapshot):
+        """追加一个快照，snapshot为parse_pmap_snapshot的返回值"""
+        current = {self._mapping_id(key): values for key, values in snapshot.items()}
+        keyframe = self.count % self.keyframe_interval == 0
+        buf = bytearray()
+        if keyframe:
+            ids = sorted(current)
+            _put_varint(buf, len(ids))
+            last = 0
+            for mapping_id in ids:
+                _put_varint(buf, mapping_id - last)
+                last = mapping_id
+                for value in current[mapping_id]:
+                    _put_varint(buf, value)
+            payload = zlib.compress(bytes(buf))
+        else:
+            previous = self._previous
+            added = sorted(i for i in current if i not in previous)
+            removed = sorted(i for i in previous if i not in current)
+            resized = sorted(i for i in current if i in previous and current[i] != previous[i])
+            for group in (added, removed, resized):
+                _put_varint(buf, len(group))
+                last = 0
+                for mapping_id in group:
+                    _put_varint(buf, mapping_id - last)
+                    last = mapping_id
+                    if group is added:
+                        for value in current[mapping_id]:
+                            _put_varint(buf, value)
+                    elif group is resized:
+                        for new, old in zip(current[mapping_id], previous[mapping_id]):
+                            _put_varint(buf, _zigzag(new - old))
+            payload = bytes(buf)
+        offset = self._data.tell()
+        self._data.write(payload)
+        self._index.write(struct.pack(_INDEX_FORMAT, timestamp_us, offset, len(payload),
+                                      _FLAG_KEYFRAME if keyframe else 0))
+        # 映射表先于数据落盘，读取端看到的记录引用的映射都已定义
+        self._mappings.flush()
+        self._data.flush()
+        self._index.flush()
+        self._previous = current
+        self.count += 1
+        self.bytes_written += len(payload) + _INDEX_SIZE
+
+
+class PmapSnapshotReader:
+    """带索引的快照读取：从最近的关键帧开始应用增量重建任意快照，按映射查询变化历史"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, SNAPSHOT_INDEX_FILE), "rb") as f:
+            index_data = f.read()
+        usable = len(index_data) - len(index_data) % _INDEX_SIZE
+        self.index = list(struct.iter_unpack(_INDEX_FORMAT, index_data[:usable]))
+        self.timestamps = [entry[0] for entry in self.index]
+        self.keyframes = [i for i, entry in enumerate(self.index) if entry[3] & _FLAG_KEYFRAME]
+        with open(os.path.join(directory, SNAPSHOT_DATA_FILE), "rb") as f:
+            self._data = f.read()
+        # 映射定义：id -> (起始地址, 映射名)
+        self.mappings = {}
+        with open(os.path.join(directory, MAPPING_TABLE_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t", 2)
+                if len(parts) == 3:
+                    self.mappings[int(parts[0])] = (int(parts[1], 16), parts[2])
+        self._history = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def _record(self, n):
+        _, offset, length, flags = self.index[n]
+        payload = self._data[offset:offset + length]
+        return (zlib.decompress(payload) if flags & _FLAG_KEYFRAME else payload), flags & _FLAG_KEYFRAME
+
+    @staticmethod
+    def _decode_keyframe(data):
+        state = {}
+        count, pos = _get_varint(data, 0)
+        mapping_id = 0
+        for _ in range(count):
+            gap, pos = _get_varint(data, pos)
+            mapping_id += gap
+            kbytes, pos = _get_varint(data, pos)
+            rss, pos = _get_varint(data, pos)
+            dirty, pos = _get_varint(data, pos)
+            state[mapping_id] = (kbytes, rss, dirty)
+        return state
+
+    @staticmethod
+    def _decode_delta(data):
+        """返回(新增{id: 数值}, 删除[id], 变化{id: 差值})"""
+        pos = 0
+        groups = []
+        for group in range(3):
+            count, pos = _get_varint(data, pos)
+            mapping_id = 0
+            entries = {}
+            for _ in range(count):
+                gap, pos = _get_varint(data, pos)
+                mapping_id += gap
+                if group == 1:
+                    entries[mapping_id] = None
+                    continue
+                values = []
+                for _ in range(3):
+                    value, pos = _get_varint(data, pos)
+                    values.append(_unzigzag(value) if group == 2 else value)
+                entries[mapping_id] = tuple(values)
+            groups.append(entries)
+        return groups[0], list(groups[1]), groups[2]
+
+    @staticmethod
+    def _apply_delta(state, delta):
+        added, removed, resized = delta
+        for mapping_id in removed:
+            state.pop(mapping_id, None)
+        state.update(added)
+        for mapping_id, change in resized.items():
+            old = state.get(mapping_id, (0, 0, 0))
+            state[mapping_id] = (old[0] + change[0], old[1] + change[1], old[2] + change[2])
+
+    def snapshot_ids(self, n):
+        """重建第n个快照，返回{映射id: (Kbytes, RSS, Dirty)}"""
+        start = self.keyframes[bisect_right(self.keyframes, n) - 1]
+        state = self._decode_keyframe(self._record(start)[0])
+        for i in range(start + 1, n + 1):
+            data, keyframe = self._record(i)
+            if keyframe:
+                state = self._decode_keyframe(data)
+            else:
+                self._apply_delta(state, self._decode_delta(data))
+        return state
+
+    def snapshot(self, n):
+        """重建第n个快照，返回{(起始地址, 映射名): (Kbytes, RSS, Dirty)}"""
+        return {self.mappings[i]: values for i, values in self.snapshot_ids(n).items()}
+
+    def snapshot_at(self, timestamp_us):
+        """重建时间戳之前（含）的最后一个快照"""
+        return self.snapshot(max(0, bisect_right(self.timestamps, timestamp_us) - 1))
+
+    def _build_history(self):
+        """一次顺序扫描，建立每个映射的变化点列表：{id: [(时间戳, 数值或None表示删除), ...]}"""
+        history = {}
+        state = {}
+        for n in range(len(self.index)):
+            timestamp = self.index[n][0]
+            data, keyframe = self._record(n)
+            if keyframe:
+                new_state = self._decode_keyframe(data)
+            else:
+                new_state = dict(state)
+                self._apply_delta(new_state, self._decode_delta(data))
+            for mapping_id, values in new_state.items():
+                if state.get(mapping_id) != values:
+                    history.setdefault(mapping_id, []).append((timestamp, values))
+            for mapping_id in state:
+                if mapping_id not in new_state:
+                    history.setdefault(mapping_id, []).append((timestamp, None))
+            state = new_state
+        self._history = history
+
+    def mapping_history(self, mapping_id):
+        """返回某个映射的变化历史：[(时间戳, (Kbytes, RSS, Dirty) 或 None), ...]"""
+        if self._history is None:
+            self._build_history()
+        return self._history.get(mapping_id, [])
+
+    def find_mappings(self, name_part):
+        """按映射名（子串）查找映射id"""
+        return [i for i, (_, name) in self.mappings.items() if name_part in name]
+
+    def growth(self, first=0, last=-1, top_n=10):
+        """比较两个快照，按RSS增长量排序，返回[(映射名, 起始地址, RSS增长kB), ...]，同名映射合并统计"""
+        last = last if last >= 0 else len(self.index) + last
+        before, after = self.snapshot_ids(first), self.snapshot_ids(last)
+        totals = {}
+        for mapping_id in set(before) | set(after):
+            delta = after.get(mapping_id, (0, 0, 0))[1] - before.get(mapping_id, (0, 0, 0))[1]
+            if delta:
+                address, name = self.mappings[mapping_id]
+                total = totals.setdefault(name, [address, 0])
+                total[1] += delta
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:top_n]
+        return [(name, address, delta) for name, (address, delta) in ranked]
+
+
+class PmapSnapshotCollector:
+    """后台线程定期采集完整pmap快照并增量写入目录"""
+
+    def __init__(self, package_name, directory, interval=10.0, keyframe_interval=30,
+                 command_runner=run_hdc_shell):
+        self.package_name = package_name
+        self.directory = directory
+        self.interval = interval
+        self.keyframe_interval = keyframe_interval
+        self.command_runner = command_runner
+        self.writer = None
+        # 原始pmap文本总字节数，用于计算压缩比
+        self.raw_bytes = 0
+        # 与已写入的快照一一对应的设备realtime（微秒，未知时为0），用于时钟对齐
+        self.device_times = array('q')
+        self._running = False
+        self._thread = None
+
+    def capture_once(self):
+        timestamp = int(time.time() * 1000000)
+        # 第一行输出设备realtime（纳秒），其余为pmap输出
+        output = self.command_runner(f'date +%s%N; {pid_lookup_script(self.package_name)}; '
+                                     f'if [ -n "$pid" ]; then pmap -x $pid; fi',
+                                     timeout=max(5, self.interval))
+        first_line, _, rest = output.partition("\n")
+        device_time = 0
+        if first_line.strip().isdigit():
+            device_time = int(first_line) // 1000
+            output = rest
+        snapshot = parse_pmap_snapshot(output)
+        if not snapshot:
+            return
+        self.raw_bytes += len(output.encode("utf-8"))
+        self.writer.add(timestamp, snapshot)
+        self.device_times.append(device_time)
+
+    def align_timestamps(self, device_to_host_us):
+        """停止采集后，把索引中的快照时间戳替换为设备realtime换算得到的主机时间，返回替换的快照数
+        索引为定长记录，原地改写时间戳字段即可，数据文件和映射表不变
+        """
+        if not self.device_times:
+            return 0
+        path = os.path.join(self.directory, SNAPSHOT_INDEX_FILE)
+        aligned = 0
+        with open(path, "r+b") as f:
+            count = os.fstat(f.fileno()).st_size // _INDEX_SIZE
+            # 目录中已有的旧快照没有设备时间，只改写本次采集的部分
+            first = count - len(self.device_times)
+            for n, device_time in enumerate(self.device_times):
+                if device_time and first + n >= 0:
+                    f.seek((first + n) * _INDEX_SIZE)
+                    f.write(struct.pack("<q", int(device_to_host_us(device_time))))
+                    aligned += 1
+        return aligned
+
+    def _run(self):
+        while self._running:
+            loop_start = time.monotonic()
+            try:
+                self.capture_once()
+            except Exception as e:
+                print(f"[Pmap Snapshot] 采集pmap快照失败: {e}")
+            sleep_time = self.interval - (time.monotonic() - loop_start)
+            while self._running and sleep_time > 0:
+                time.sleep(min(sleep_time, 0.2))
+                sleep_time = self.interval - (time.monotonic() - loop_start)
+
+    def start(self):
+        self.writer = PmapSnapshotWriter(self.directory, self.keyframe_interval)
+        self.raw_bytes = 0
+        self.device_times = array('q')
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"[Pmap Snapshot] 已启动，采样间隔: {self.interval}秒，输出目录: {self.directory}")
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=max(5, self.interval))
+        if self.writer is not None:
+            self.writer.close()
+            ratio = self.raw_bytes / self.writer.bytes_written if self.writer.bytes_written else 0.0
+            print(f"[Pmap Snapshot] 已停止，共 {self.writer.count} 个快照，存储 {self.writer.bytes_written} 字节，"
+                  f"原始pmap文本 {self.raw_bytes} 字节，压缩比 {ratio:.1f}x")
+
+    def report_growth(self, top_n=10):
+        """打印首尾快照之间RSS增长最多的映射"""
+        if self.writer is None or self.writer.count < 2:
+            return []
+        growth = PmapSnapshotReader(self.directory).growth(top_n=top_n)
+        for name, address, delta in growth:
+            print(f"[Pmap Snapshot] RSS增长 {delta:+d} kB  {name} (0x{address:x})")
+        return growth
@@ -0,0 +1,98 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ProcessTracker.py
+#文件说明：                 采样线程的PID缓存和进程生命周期跟踪：按/proc/<pid>/stat的启动时间识别进程启动、退出和重启
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+from aw.Hdc import pid_lookup_script
+
+
+def parse_proc_stat(line):
+    """解析/proc/<pid>/stat，返回(pid, 进程名, 启动时间starttime)，格式不对时返回None
+    进程名可能包含空格和括号，以最后一个')'为界，其后第20个字段（从0开始为19）是starttime
+    """
+    line = line.strip()
+    left, right = line.find('('), line.rfind(')')
+    if left <= 0 or right < left:
+        return None
+    fields = line[right + 1:].split()
+    try:
+        return int(line[:left]), line[left + 1:right], int(fields[19])
+    except (ValueError, IndexError):
+        return None
+
+
+class ProcessTracker:
+    """缓存被测应用的PID，并根据每次采样读到的/proc/<pid>/stat判断进程实例是否变化
+
+    进程实例从1开始编号，每出现一个新进程（首次启动或重启）加1，0表示还没有见到过进程。
+    observe()返回的事件：
+      process_start    首次见到进程
+      process_exit     进程消失（pidof没有结果），或缓存的PID已被其他进程复用
+      process_restart  出现了新的进程实例（PID或启动时间与上一个实例不同）
+    """
+
+    def __init__(self, package_name):
+        self.package_name = package_name
+        self.pid = None
+        self.starttime = None
+        self.instance = 0
+        # 生命周期事件：[(timestamp_us, 事件类型, 详情), ...]
+        self.events = []
+        # 上一个实例的PID，用于重启事件的详情
+        self._last_pid = None
+
+    def pid_script(self):
+        """设备端shell片段，执行后$pid为应用PID（没有进程时为空）
+        已缓存PID且/proc/<pid>仍存在时直接复用，不再执行pidof
+        """
+        lookup = pid_lookup_script(self.package_name)
+        if self.pid is None:
+            return lookup
+        return f'pid={self.pid}; if [ ! -r /proc/$pid/stat ]; then {lookup}; fi'
+
+    def observe(self, timestamp, stat_line):
+        """每次采样调用一次，stat_line为本次读到的/proc/<pid>/stat（没有进程时为None或空）
+        返回(是否可用, 事件)：是否可用表示本次采样是否属于当前进程实例；事件为(事件类型, 详情)或None
+        """
+        if not stat_line:
+            if self.pid is None:
+                return False, None
+            event = ("process_exit", f"pid={self.pid}")
+            self._last_pid, self.pid, self.starttime = self.pid, None, None
+            return self._emit(timestamp, event)
+        parsed = parse_proc_stat(stat_line)
+        if parsed is None:
+            return False, None
+        pid, _, starttime = parsed
+        if pid == self.pid:
+            if starttime == self.starttime:
+                return True, None
+            # 缓存的PID被其他进程复用：原实例已退出；无法确认新进程是被测应用，丢弃本次采样，下次重新pidof，
+            # 与进程消失时一样先记退出事件，下次找到进程时再记重启事件
+            event = ("process_exit", f"pid={self.pid} reused")
+            self._last_pid, self.pid, self.starttime = self.pid, None, None
+            return self._emit(timestamp, event)
+        previous = self.pid if self.pid is not None else self._last_pid
+        self.pid, self.starttime = pid, starttime
+        self.instance += 1
+        if self.instance == 1:
+            event = ("process_start", f"pid={pid}")
+        else:
+            event = ("process_restart", f"pid={previous}->{pid}")
+        return self._emit(timestamp, event, True)
+
+    def _emit(self, timestamp, event, usable=False):
+        self.events.append((timestamp, event[0], event[1]))
+        return usable, event
+
+    @property
+    def restarts(self):
+        return sum(1 for _, kind, _ in self.events if kind == "process_restart")
@@ -0,0 +1,151 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ProfilerSession.py
+#文件说明：                 hiprofiler nativehook会话管理：按预设渲染配置，随用例生命周期启动/停止，监测trace文件落盘完成
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import string
+import subprocess
+import time
+
+from aw.Hdc import run_hdc_shell
+
+# 设备端trace文件路径
+REMOTE_HTRACE_PATH = "/data/local/tmp/hiprofiler_data.htrace"
+
+# 配置预设：
+#   light     小缓冲区、大采样间隔、浅调用栈，缓冲区满时不阻塞应用，对被测性能影响最小
+#   standard  原有的固定配置
+#   deep      大缓冲区、逐次采样、深调用栈，用于定位具体泄漏点
+PROFILER_PRESETS = {
+    "light": {"pages": 16384, "smb_pages": 4096, "sample_interval": 65536,
+              "max_stack_depth": 10, "statistics_interval": 10, "blocked": "false"},
+    "standard": {"pages": 131072, "smb_pages": 16384, "sample_interval": 5000,
+                 "max_stack_depth": 20, "statistics_interval": 1, "blocked": "true"},
+    "deep": {"pages": 262144, "smb_pages": 32768, "sample_interval": 256,
+             "max_stack_depth": 40, "statistics_interval": 1, "blocked": "true"},
+}
+
+_CONFIG_TEMPLATE = string.Template("""request_id: 1
+session_config {
+ buffers {
+  pages: $pages
+ }
+}
+plugin_configs {
+ plugin_name: "nativehook"
+ sample_interval: $sample_interval
+ config_data {
+  save_file: false
+  smb_pages: $smb_pages
+  max_stack_depth: $max_stack_depth
+  process_name: "$process_name"
+  string_compressed: true
+  fp_unwind: true
+  blocked: $blocked
+  callframe_compress: true
+  record_accurately: true
+  offline_symbolization: true
+  statistics_interval: $statistics_interval
+  startup_mode: true
+ }
+}""")
+
+
+class ProfilerSession:
+    """一次hiprofiler采集会话
+
+    - start()：清理旧trace并在后台启动hiprofiler_cmd，-t只作为兜底上限（max_duration），不再决定采集时长
+    - stop()：process()结束后调用，向hiprofiler_cmd发送SIGINT，结束采集并把缓冲区写入trace文件
+    - wait_complete()：本地hdc shell进程退出（设备端hiprofiler_cmd已结束）且trace文件大小不再变化时视为完成，
+      等待时间随实际trace大小变化，而不是固定等待
+    """
+
+    def __init__(self, package_name, preset="standard", output_path=REMOTE_HTRACE_PATH, max_duration=3600,
+                 command_runner=run_hdc_shell, **overrides):
+        if preset not in PROFILER_PRESETS:
+            raise ValueError(f"未知的profiler预设: {preset}，可选: {', '.join(PROFILER_PRESETS)}")
+        self.package_name = package_name
+        self.preset = preset
+        self.output_path = output_path
+        self.max_duration = max_duration
+        self.command_runner = command_runner
+        self.config = dict(PROFILER_PRESETS[preset], **overrides)
+        # 采集时长、trace大小（字节）、stop之后等待落盘的时间（秒）
+        self.duration = None
+        self.trace_size = None
+        self.flush_seconds = None
+        self._process = None
+        self._started = None
+        self._stopped = None
+
+    def render_config(self):
+        """按预设渲染hiprofiler配置文本"""
+        return _CONFIG_TEMPLATE.substitute(self.config, process_name=self.package_name)
+
+    def start(self):
+        """清理旧trace文件并在后台启动采集"""
+        self.command_runner(f"rm -f {self.output_path}")
+        command = (f"hiprofiler_cmd -c - -o {self.output_path} -t {int(self.max_duration)} -s -k <<CONFIG\n"
+                   f"{self.render_config()}\nCONFIG")
+        # 以参数列表方式调用，heredoc和配置中的引号由设备端shell解释
+        self._process = subprocess.Popen(["hdc", "shell", command],
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._started = time.monotonic()
+        self._stopped = None
+        print(f"[Profiler] 已启动，预设: {self.preset}，兜底时长: {int(self.max_duration)}秒")
+
+    @property
+    def running(self):
+        return self._started is not None and self._stopped is None
+
+    def stop(self):
+        """结束采集：hiprofiler_cmd收到SIGINT后停止会话并写出trace文件"""
+        if not self.running:
+            return
+        self.command_runner("pid=$(pidof hiprofiler_cmd); if [ -n \"$pid\" ]; then kill -INT $pid; fi")
+        self._stopped = time.monotonic()
+        self.duration = self._stopped - self._started
+        print(f"[Profiler] 已发送停止信号，采集时长 {self.duration:.1f}秒")
+
+    def _remote_size(self):
+        output = self.command_runner(f"stat -c %s {self.output_path} 2>/dev/null").strip()
+        return int(output) if output.isdigit() else None
+
+    def wait_complete(self, timeout=120, poll_interval=0.5, stable_polls=4):
+        """等待trace文件写完，返回是否完成
+
+        本地hdc shell进程已退出时，文件大小连续两次相同即视为完成；
+        进程状态不可用（例如hdc提前断开）时，要求文件大小连续stable_polls次不变
+        """
+        if self._started is None:
+            return False
+        wait_start = time.monotonic()
+        deadline = wait_start + timeout
+        last_size = None
+        stable = 0
+        while time.monotonic() < deadline:
+            exited = self._process is None or self._process.poll() is not None
+            size = self._remote_size()
+            if size is not None and size > 0 and size == last_size:
+                stable += 1
+            else:
+                stable = 0
+            last_size = size
+            if (exited and stable >= 1) or stable >= stable_polls:
+                self.trace_size = size
+                self.flush_seconds = time.monotonic() - wait_start
+                print(f"[Profiler] trace文件已完成，大小 {size / 1048576:.1f}MB，等待落盘 {self.flush_seconds:.1f}秒")
+                return True
+            time.sleep(poll_interval)
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+        print(f"[Profiler] 等待trace文件完成超时（{timeout}秒），最后大小: {last_size}")
+        return False
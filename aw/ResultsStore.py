@@ -0,0 +1,219 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ResultsStore.py
+#文件说明：                 运行结果库：用SQLite统一保存每次运行的采样、事件、产物和指标
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+# 默认结果库路径：工程目录下的results/results.db
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "results" / "results.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    testcase     TEXT NOT NULL,
+    device       TEXT,
+    package_name TEXT,
+    version_code INTEGER,
+    start_type   TEXT,
+    started_at   INTEGER,
+    finished_at  INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id TEXT NOT NULL,
+    series TEXT NOT NULL,
+    ts_us  INTEGER NOT NULL,
+    value  REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    run_id TEXT NOT NULL,
+    ts_us  INTEGER NOT NULL,
+    kind   TEXT NOT NULL,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    path   TEXT NOT NULL,
+    size   INTEGER
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    value  REAL
+);
+CREATE TABLE IF NOT EXISTS baselines (
+    testcase     TEXT NOT NULL,
+    version_code INTEGER NOT NULL,
+    start_type   TEXT NOT NULL,
+    metric       TEXT NOT NULL,
+    n            INTEGER NOT NULL,
+    mean         REAL,
+    std          REAL,
+    updated_at   INTEGER,
+    PRIMARY KEY (testcase, version_code, start_type, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_case_version ON runs (testcase, version_code, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_device ON runs (device, started_at);
+CREATE INDEX IF NOT EXISTS idx_samples_run_series ON samples (run_id, series, ts_us);
+CREATE INDEX IF NOT EXISTS idx_events_run_kind ON events (run_id, kind, ts_us);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run ON artifacts (run_id, kind);
+CREATE INDEX IF NOT EXISTS idx_metrics_name_run ON metrics (name, run_id);
+"""
+
+
+def new_run_id():
+    """生成全局唯一的运行ID：时间前缀便于排序，随机后缀保证并行运行不冲突"""
+    return f"{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:12]}"
+
+
+class ResultsStore:
+    """运行结果库
+
+    表结构：
+      runs       每次运行一行，按run_id区分，记录用例名、设备、应用versionCode、冷/热启动、起止时间
+      samples    时间序列采样（长表）：series为序列名，如pmap_physical_kb、cpu_process_pct
+      events     运行事件：步骤、UI操作、启动阶段、泄漏判定等
+      artifacts  运行产物文件：memdump、htrace、hidumper输出等
+      metrics    每次运行的汇总指标
+      baselines  每个用例、versionCode、冷/热启动、指标的滚动基线（最近若干次运行的均值和标准差）
+    每次运行在teardown时一次性写入（单个事务批量插入）。
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        # WAL模式允许并行运行的用例同时写入，查询不阻塞写入
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save_run(self, run, samples=(), events=(), artifacts=(), metrics=None):
+        """批量写入一次运行的全部结果
+
+        Args:
+            run: dict, runs表字段（run_id、testcase必填）
+            samples: iterable, [(series, ts_us, value), ...]
+            events: iterable, [(ts_us, kind, detail), ...]
+            artifacts: iterable, [(kind, path, size), ...]
+            metrics: dict, {指标名: 数值}
+        """
+        run_id = run["run_id"]
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, testcase, device, package_name, version_code, "
+                "start_type, started_at, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, run["testcase"], run.get("device"), run.get("package_name"), run.get("version_code"),
+                 run.get("start_type"), run.get("started_at"), run.get("finished_at")))
+            self._conn.executemany("INSERT INTO samples (run_id, series, ts_us, value) VALUES (?, ?, ?, ?)",
+                                   ((run_id, series, ts, value) for series, ts, value in samples))
+            self._conn.executemany("INSERT INTO events (run_id, ts_us, kind, detail) VALUES (?, ?, ?, ?)",
+                                   ((run_id, ts, kind, detail) for ts, kind, detail in events))
+            self._conn.executemany("INSERT INTO artifacts (run_id, kind, path, size) VALUES (?, ?, ?, ?)",
+                                   ((run_id, kind, path, size) for kind, path, size in artifacts))
+            self._conn.executemany("INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                                   ((run_id, name, value) for name, value in (metrics or {}).items()))
+
+    def query_runs(self, testcase=None, version_code=None, device=None, limit=None):
+        """按用例名、versionCode、设备查询运行记录，按开始时间倒序，返回dict列表"""
+        sql = "SELECT * FROM runs"
+        conditions, params = [], []
+        for column, value in (("testcase", testcase), ("version_code", version_code), ("device", device)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY started_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cursor = self._conn.execute(sql, params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def query_samples(self, run_id, series):
+        """查询一次运行的某个时间序列，返回[(ts_us, value), ...]"""
+        return self._conn.execute(
+            "SELECT ts_us, value FROM samples WHERE run_id = ? AND series = ? ORDER BY ts_us",
+            (run_id, series)).fetchall()
+
+    def list_series(self, run_id):
+        """列出一次运行包含的时间序列名"""
+        return [row[0] for row in self._conn.execute(
+            "SELECT DISTINCT series FROM samples WHERE run_id = ?", (run_id,)).fetchall()]
+
+    def query_events(self, run_id, kind=None):
+        """查询一次运行的事件，返回[(ts_us, kind, detail), ...]"""
+        if kind is None:
+            return self._conn.execute("SELECT ts_us, kind, detail FROM events WHERE run_id = ? ORDER BY ts_us",
+                                      (run_id,)).fetchall()
+        return self._conn.execute("SELECT ts_us, kind, detail FROM events WHERE run_id = ? AND kind = ? ORDER BY ts_us",
+                                  (run_id, kind)).fetchall()
+
+    def query_artifacts(self, run_id, kind=None):
+        """查询一次运行的产物，返回[(kind, path, size), ...]"""
+        if kind is None:
+            return self._conn.execute("SELECT kind, path, size FROM artifacts WHERE run_id = ?", (run_id,)).fetchall()
+        return self._conn.execute("SELECT kind, path, size FROM artifacts WHERE run_id = ? AND kind = ?",
+                                  (run_id, kind)).fetchall()
+
+    def query_metric(self, testcase, name, version_code=None, limit=None, start_type=None):
+        """查询某用例某指标的历史值，返回[(run_id, version_code, started_at, value), ...]，按时间倒序"""
+        sql = ("SELECT r.run_id, r.version_code, r.started_at, m.value FROM metrics m "
+               "JOIN runs r ON r.run_id = m.run_id WHERE m.name = ? AND r.testcase = ?")
+        params = [name, testcase]
+        if version_code is not None:
+            sql += " AND r.version_code = ?"
+            params.append(version_code)
+        if start_type is not None:
+            sql += " AND r.start_type = ?"
+            params.append(start_type)
+        sql += " ORDER BY r.started_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._conn.execute(sql, params).fetchall()
+
+    def compare_versions(self, testcase, name):
+        """按versionCode聚合某用例某指标，返回[(version_code, 运行次数, 均值, 最小值, 最大值), ...]"""
+        return self._conn.execute(
+            "SELECT r.version_code, COUNT(*), AVG(m.value), MIN(m.value), MAX(m.value) FROM metrics m "
+            "JOIN runs r ON r.run_id = m.run_id WHERE m.name = ? AND r.testcase = ? "
+            "GROUP BY r.version_code ORDER BY r.version_code", (name, testcase)).fetchall()
+
+    def upsert_baseline(self, testcase, version_code, metric, n, mean, std, start_type="cold"):
+        """写入或更新某用例、versionCode、冷/热启动、指标的基线"""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO baselines (testcase, version_code, start_type, metric, n, mean, std, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (testcase, version_code, start_type, metric, n, mean, std, int(time.time() * 1000000)))
+
+    def get_previous_baseline(self, testcase, metric, version_code, min_runs=1, start_type="cold"):
+        """获取同一启动类型下低于version_code的最近一个版本的基线，返回dict或None"""
+        row = self._conn.execute(
+            "SELECT version_code, n, mean, std FROM baselines WHERE testcase = ? AND metric = ? AND start_type = ? "
+            "AND version_code < ? AND n >= ? ORDER BY version_code DESC LIMIT 1",
+            (testcase, metric, start_type, version_code, min_runs)).fetchone()
+        if row is None:
+            return None
+        return {"version_code": row[0], "n": row[1], "mean": row[2], "std": row[3]}
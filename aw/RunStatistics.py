@@ -0,0 +1,72 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 RunStatistics.py
+#文件说明：                 多次运行结果统计：均值、中位数、bootstrap置信区间与序贯停止判断
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def bootstrap_summary(values, n_boot=2000, confidence=0.95, seed=0):
+    """计算一组数值的均值、中位数和均值的bootstrap置信区间
+
+    所有重采样一次性生成 n_boot x n 的下标矩阵，向量化计算，不做Python循环
+    Returns:
+        dict: {n, mean, median, std, ci_low, ci_high, rel_half_width}
+    """
+    if not HAS_NUMPY:
+        raise ImportError("多次运行统计需要numpy，请运行: pip install numpy")
+    data = np.asarray(values, dtype=float)
+    data = data[np.isfinite(data)]
+    n = data.size
+    summary = {"n": int(n), "mean": float("nan"), "median": float("nan"), "std": float("nan"),
+               "ci_low": float("nan"), "ci_high": float("nan"), "rel_half_width": float("inf")}
+    if n == 0:
+        return summary
+    summary["mean"] = float(data.mean())
+    summary["median"] = float(np.median(data))
+    summary["std"] = float(data.std(ddof=1)) if n > 1 else 0.0
+    if n < 2:
+        return summary
+    rng = np.random.default_rng(seed)
+    boot_means = data[rng.integers(0, n, size=(n_boot, n))].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    ci_low, ci_high = np.quantile(boot_means, [alpha, 1 - alpha])
+    summary["ci_low"] = float(ci_low)
+    summary["ci_high"] = float(ci_high)
+    if summary["mean"] != 0:
+        summary["rel_half_width"] = float((ci_high - ci_low) / 2 / abs(summary["mean"]))
+    return summary
+
+
+def summarize_runs(run_metrics, **kwargs):
+    """对多次运行的指标做汇总
+
+    Args:
+        run_metrics: list, 每次运行的指标dict，如[{"pmap_peak_physical_kb": 1234, ...}, ...]
+    Returns:
+        dict: {指标名: bootstrap_summary结果}
+    """
+    names = []
+    for metrics in run_metrics:
+        for name in metrics:
+            if name not in names:
+                names.append(name)
+    return {name: bootstrap_summary([m[name] for m in run_metrics if m.get(name) is not None], **kwargs)
+            for name in names}
+
+
+def is_precise_enough(summary, rel_half_width, min_runs):
+    """序贯停止判断：样本数达到min_runs且置信区间相对半宽不超过rel_half_width"""
+    return summary["n"] >= min_runs and summary["rel_half_width"] <= rel_half_width
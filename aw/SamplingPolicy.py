@@ -0,0 +1,107 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 SamplingPolicy.py
+#文件说明：                 内存监控采样策略：固定间隔与自适应间隔，统计实际采样率和超时次数
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import threading
+import time
+
+
+class FixedSamplingPolicy:
+    """固定间隔采样，只统计实际采样率和超时次数"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = 0
+        self.overruns = 0
+        self._intervals = []
+        self._started_at = time.monotonic()
+        self._stopped_at = None
+        self._wake = threading.Event()
+
+    def note_action(self):
+        """UI操作发生时调用，固定间隔策略下不做处理"""
+
+    def next_interval(self, loop_elapsed, last_delta_kb):
+        """根据本次采样耗时和内存变化量计算下次采样间隔（秒）"""
+        self.samples += 1
+        if loop_elapsed > self.interval:
+            self.overruns += 1
+        self._intervals.append(self.interval)
+        return self.interval
+
+    def wait(self, timeout):
+        """等待到下一次采样，note_action/stop可以提前唤醒"""
+        if timeout > 0:
+            self._wake.wait(timeout)
+        self._wake.clear()
+
+    def stop(self):
+        self._stopped_at = time.monotonic()
+        self._wake.set()
+
+    def stats(self):
+        """返回采样统计：采样数、超时次数、实际采样率、间隔范围"""
+        end = self._stopped_at if self._stopped_at is not None else time.monotonic()
+        duration = end - self._started_at
+        return {
+            "samples": self.samples,
+            "overruns": self.overruns,
+            "effective_rate": self.samples / duration if duration > 0 else 0.0,
+            "min_interval": min(self._intervals) if self._intervals else 0.0,
+            "max_interval": max(self._intervals) if self._intervals else 0.0,
+        }
+
+
+class AdaptiveSamplingPolicy(FixedSamplingPolicy):
+    """自适应间隔采样
+
+    - UI操作后action_window秒内，或上次内存变化超过delta_threshold_kb时，按min_interval高频采样
+    - 内存平稳时按backoff倍数逐步放慢，最慢max_interval
+    - 单次采样耗时超过计划间隔时记为超时，并把间隔下限提高到实际耗时的1.2倍，
+      通过降低采样率避免采样任务积压
+    """
+
+    def __init__(self, interval, min_interval, max_interval, delta_threshold_kb=1024,
+                 action_window=2.0, backoff=1.5):
+        super().__init__(interval)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, interval)
+        self.delta_threshold_kb = delta_threshold_kb
+        self.action_window = action_window
+        self.backoff = backoff
+        self._last_action = None
+        self._overload_floor = 0.0
+
+    def note_action(self):
+        """UI操作发生时调用，立即唤醒采样线程进入高频采样"""
+        self._last_action = time.monotonic()
+        self._wake.set()
+
+    def next_interval(self, loop_elapsed, last_delta_kb):
+        self.samples += 1
+        planned = self.interval
+        if loop_elapsed > planned:
+            self.overruns += 1
+            self._overload_floor = max(self._overload_floor, loop_elapsed * 1.2)
+        else:
+            # 未超时时下限缓慢回落，负载恢复后可以重新提高采样率
+            self._overload_floor *= 0.9
+
+        now = time.monotonic()
+        in_action = self._last_action is not None and now - self._last_action < self.action_window
+        if in_action or abs(last_delta_kb) >= self.delta_threshold_kb:
+            interval = self.min_interval
+        else:
+            interval = min(planned * self.backoff, self.max_interval)
+        self.interval = max(interval, self._overload_floor)
+        self._intervals.append(self.interval)
+        return self.interval
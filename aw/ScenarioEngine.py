@@ -0,0 +1,179 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 ScenarioEngine.py
+#文件说明：                 场景执行引擎：按声明式场景描述文件(*.scenario.json)执行用例操作
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import json
+import time
+from hypium import *
+from aw.ActionPacer import ActionPacer
+
+# 场景描述文件格式示例：
+# {
+#   "variables": {"swipe_count": 30},
+#   "steps": [
+#     {"name": "4.切换到短视频界面", "action": "touch", "point": [482, 2525], "pause": 1},
+#     {"name": "5.短视频上划", "action": "swipe", "repeat": "$swipe_count",
+#      "from": [0.5, 0.7], "to": [0.5, 0.2], "slide_time": 0.3, "pause": 1,
+#      "triggers": [{"remaining": 5, "action": "gc_dump", "name": "6.触发gc dump"}]}
+#   ]
+# }
+# 支持的action：
+#   touch          点击坐标，point为像素坐标，at为相对屏幕的比例坐标
+#   click_text     按文本查找控件点击，找不到时点击fallback_point
+#   click_buttons  批量点击button列表，reverse为true时逆序
+#   swipe          滑动，from/to为相对屏幕的比例坐标，repeat为重复次数，
+#                  设置period时按固定周期（秒）调度每次滑动，否则每次滑动后等待pause秒
+#   wait           等待pause秒
+# 以'$'开头的字符串值会替换为variables中的同名变量，用例可以通过参数覆盖
+
+
+class ScenarioEngine:
+    """声明式场景执行引擎，屏幕尺寸和滑动坐标在一次运行中只计算一次"""
+
+    def __init__(self, case, spec, variables=None):
+        self.case = case
+        self.driver = case.driver
+        self.spec = spec
+        self.variables = dict(spec.get("variables", {}))
+        if variables:
+            self.variables.update(variables)
+        self._window_size = None
+        self._point_cache = {}
+
+    @classmethod
+    def load(cls, case, spec_path, variables=None):
+        """从场景描述文件创建引擎"""
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        return cls(case, spec, variables)
+
+    def _value(self, value):
+        """解析'$变量名'引用"""
+        if isinstance(value, str) and value.startswith("$"):
+            return self.variables[value[1:]]
+        return value
+
+    def window_size(self):
+        """获取屏幕尺寸，一次运行只查询一次"""
+        if self._window_size is None:
+            window_size = self.driver.get_window_size()
+            # tuple的第一个元素是width，第二个元素是height
+            self._window_size = (window_size[0], window_size[1])
+        return self._window_size
+
+    def fraction_point(self, fraction):
+        """将比例坐标换算为像素坐标，结果缓存"""
+        key = tuple(fraction)
+        point = self._point_cache.get(key)
+        if point is None:
+            width, height = self.window_size()
+            point = (int(width * key[0]), int(height * key[1]))
+            self._point_cache[key] = point
+        return point
+
+    def _pause(self, step):
+        pause = self._value(step.get("pause", 0))
+        if pause:
+            time.sleep(pause)
+
+    def run(self):
+        """按顺序执行场景中的所有步骤
+
+        场景文件顶层的gc_dump配置会在开始时交给用例的gc dump触发器，时间点相对场景开始
+        """
+        if "gc_dump" in self.spec:
+            self.case._configure_gc_dump_trigger(self._value(self.spec["gc_dump"]))
+        for step in self.spec.get("steps", []):
+            self.case._check_abort()
+            if step.get("name"):
+                self.case._step(step["name"])
+            handler = getattr(self, f"_run_{step['action']}", None)
+            if handler is None:
+                raise ValueError(f"不支持的场景action: {step['action']}")
+            handler(step)
+
+    def _fire_triggers(self, step, index, remaining):
+        """执行命中当前循环位置的触发器"""
+        for trigger in step.get("triggers", []):
+            if "remaining" in trigger and self._value(trigger["remaining"]) != remaining:
+                continue
+            if "index" in trigger and self._value(trigger["index"]) != index:
+                continue
+            if trigger["action"] == "gc_dump":
+                self.case._trigger_gc_dump(trigger.get("name"))
+            else:
+                raise ValueError(f"不支持的触发器action: {trigger['action']}")
+
+    def _run_touch(self, step):
+        if "at" in step:
+            point = self.fraction_point(self._value(step["at"]))
+        else:
+            point = tuple(self._value(step["point"]))
+        self.driver.touch(point)
+        self.case._record_event("touch", f"{point[0]},{point[1]}")
+        self._pause(step)
+
+    def _run_click_text(self, step):
+        text = self._value(step["text"])
+        try:
+            # 尝试通过文本查找控件（Text类型）
+            self.driver.find_element(By.text(text)).click()
+        except:
+            try:
+                # 如果By不存在，尝试直接通过文本查找
+                self.driver.find_element_by_text(text).click()
+            except:
+                if "fallback_point" not in step:
+                    raise
+                # 如果都失败，使用driver执行坐标点击
+                self.driver.touch(tuple(self._value(step["fallback_point"])))
+        self.case._record_event("click_text", text)
+        self._pause(step)
+
+    def _run_click_buttons(self, step):
+        button_list = list(self._value(step["buttons"]))
+        if step.get("reverse"):
+            button_list.reverse()
+        self.case._click_button_list(button_list,
+                                     self._value(step.get("click_interval", 1)),
+                                     self._value(step.get("miss_interval", 0.5)))
+
+    def _run_swipe(self, step):
+        repeat = int(self._value(step.get("repeat", 1)))
+        start = self.fraction_point(self._value(step["from"]))
+        end = self.fraction_point(self._value(step["to"]))
+        slide_time = self._value(step.get("slide_time", 0.3))
+        period = self._value(step.get("period", 0))
+        if not period:
+            for i in range(repeat):
+                self.case._check_abort()
+                remaining = repeat - i - 1  # 剩余次数
+                self._fire_triggers(step, i, remaining)
+                # 先记录事件：帧统计窗口从滑动开始算起，包含整个惯性滑动
+                self.case._record_event("swipe", str(i))
+                self.driver.slide(start, end, slide_time=slide_time)
+                self._pause(step)
+            return
+        # 按绝对截止时间调度，slide耗时和触发器耗时都计入周期内
+        pacer = ActionPacer(period, name=step.get("name") or "swipe")
+        for i in pacer.ticks(repeat):
+            self.case._check_abort()
+            remaining = repeat - i - 1  # 剩余次数
+            self._fire_triggers(step, i, remaining)
+            # 先记录事件：帧统计窗口从滑动开始算起，包含整个惯性滑动
+            self.case._record_event("swipe", str(i))
+            self.driver.slide(start, end, slide_time=slide_time)
+        print(pacer.format_report())
+        self.case.pacer_reports.append(pacer.report())
+
+    def _run_wait(self, step):
+        self._pause(step)
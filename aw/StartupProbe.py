@@ -0,0 +1,79 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 StartupProbe.py
+#文件说明：                 应用启动时延测量：轮询进程、首个窗口、可交互标志，记录各阶段耗时
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import time
+
+
+class StartupProbe:
+    """轮询应用启动的就绪标志
+
+    阶段依次为：
+      time_to_process      应用进程出现（pidof有结果）
+      time_to_first_ui     布局快照中出现该应用的窗口节点
+      time_to_interactive  出现可交互标志：广告页"跳过"按钮或ready_texts中的任一文本
+    各阶段时间取观测到该标志的那次探测的中点，相对于start()调用时刻，单位秒
+    """
+
+    def __init__(self, driver, package_name, ui_snapshot, skip_text="跳过", ready_texts=("首页",)):
+        self.driver = driver
+        self.package_name = package_name
+        self.ui_snapshot = ui_snapshot
+        self.skip_text = skip_text
+        self.ready_texts = tuple(ready_texts)
+        self.metrics = {}
+        # 就绪时"跳过"按钮的坐标，没有广告页时为None
+        self.skip_position = None
+        self._start = None
+
+    def start(self):
+        """在调用start_app之前调用，记录起点"""
+        self._start = time.monotonic()
+        self.metrics = {}
+        self.skip_position = None
+
+    def _process_present(self):
+        output = self.driver.shell(f"pidof {self.package_name}")
+        # 启动过程中pidof可能只输出空白或换行
+        parts = output.split() if output else []
+        return bool(parts) and parts[0].isdigit()
+
+    def wait_ready(self, timeout=8.0, poll_interval=0.05):
+        """轮询直到应用可交互或超时，返回是否就绪"""
+        deadline = self._start + timeout
+        while time.monotonic() < deadline:
+            probe_start = time.monotonic()
+            if "time_to_process" not in self.metrics:
+                if self._process_present():
+                    self.metrics["time_to_process"] = (probe_start + time.monotonic()) / 2 - self._start
+                    continue
+            else:
+                if self.ui_snapshot.refresh():
+                    observed = (probe_start + time.monotonic()) / 2 - self._start
+                    if "time_to_first_ui" not in self.metrics and self.package_name in self.ui_snapshot.bundles:
+                        self.metrics["time_to_first_ui"] = observed
+                    if "time_to_first_ui" in self.metrics:
+                        positions = self.ui_snapshot.resolve([self.skip_text])
+                        self.skip_position = positions.get(self.skip_text)
+                        ready = self.skip_position is not None or any(
+                            self.ui_snapshot.find(text=text) for text in self.ready_texts)
+                        if ready:
+                            self.metrics["time_to_interactive"] = observed
+                            return True
+            time.sleep(poll_interval)
+        return False
+
+    def format_metrics(self):
+        names = (("time_to_process", "进程出现"), ("time_to_first_ui", "首个窗口"), ("time_to_interactive", "可交互"))
+        parts = [f"{label} {self.metrics[key] * 1000:.0f}ms" if key in self.metrics else f"{label} 未观测到"
+                 for key, label in names]
+        return "[Startup] " + ", ".join(parts)
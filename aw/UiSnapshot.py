@@ -0,0 +1,156 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 UiSnapshot.py
+#文件说明：                 UI布局快照：一次dumpLayout，批量解析多个控件坐标
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import json
+import re
+
+# 设备端布局文件路径
+LAYOUT_REMOTE_PATH = "/data/local/tmp/ui_snapshot_layout.json"
+
+_BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+def parse_bounds(bounds_str):
+    """解析'[x1,y1][x2,y2]'格式的bounds，返回(x1, y1, x2, y2)，解析失败返回None"""
+    match = _BOUNDS_PATTERN.search(bounds_str or "")
+    if not match:
+        return None
+    return tuple(int(v) for v in match.groups())
+
+
+class UiNode:
+    """布局树中的单个节点"""
+
+    __slots__ = ("text", "type", "bounds", "center")
+
+    def __init__(self, text, node_type, bounds):
+        self.text = text
+        self.type = node_type
+        self.bounds = bounds
+        self.center = ((bounds[0] + bounds[2]) // 2, (bounds[1] + bounds[3]) // 2)
+
+    def __repr__(self):
+        return f"UiNode(text={self.text!r}, type={self.type!r}, bounds={self.bounds})"
+
+
+class UiSnapshot:
+    """对当前界面做一次布局快照，并按文本、类型、bounds建立哈希索引
+
+    一次refresh只产生一次设备端UI查询，之后resolve任意数量的控件都只查本地索引。
+    界面发生变化后调用invalidate()，下一次查询时会自动重新抓取快照。
+    """
+
+    def __init__(self, driver, remote_path=LAYOUT_REMOTE_PATH):
+        self.driver = driver
+        self.remote_path = remote_path
+        # 累计的设备端UI查询次数，用于统计
+        self.query_count = 0
+        self._valid = False
+        self._by_text = {}
+        self._by_text_type = {}
+        self._by_type = {}
+        self._by_bounds = {}
+        # 快照中出现过的应用包名（节点的bundleName属性）
+        self.bundles = set()
+
+    def _dump_layout(self):
+        """在设备端dump布局并读回JSON文本，一次shell调用完成"""
+        command = f"uitest dumpLayout -p {self.remote_path} >/dev/null 2>&1; cat {self.remote_path}"
+        return self.driver.shell(command)
+
+    def _index_node(self, node_json):
+        """深度优先遍历布局树，把有效节点加入索引"""
+        stack = [node_json]
+        while stack:
+            current = stack.pop()
+            attributes = current.get("attributes", {})
+            if attributes.get("bundleName"):
+                self.bundles.add(attributes["bundleName"])
+            bounds = parse_bounds(attributes.get("bounds"))
+            # 跳过面积为0的节点（不可见或未布局）
+            if bounds and bounds[2] > bounds[0] and bounds[3] > bounds[1]:
+                node = UiNode(attributes.get("text", ""), attributes.get("type", ""), bounds)
+                if node.text:
+                    self._by_text.setdefault(node.text, []).append(node)
+                    self._by_text_type.setdefault((node.text, node.type), []).append(node)
+                self._by_type.setdefault(node.type, []).append(node)
+                self._by_bounds.setdefault(bounds, node)
+            # 逆序入栈，保证遍历顺序与布局树顺序一致
+            stack.extend(reversed(current.get("children", [])))
+
+    def refresh(self):
+        """重新抓取布局快照并重建索引，返回是否成功"""
+        self.query_count += 1
+        self._by_text = {}
+        self._by_text_type = {}
+        self._by_type = {}
+        self._by_bounds = {}
+        self.bundles = set()
+        self._valid = False
+        try:
+            output = self._dump_layout()
+            # 输出中可能夹带非JSON的提示信息，从第一个'{'开始解析
+            start = output.find("{")
+            if start < 0:
+                print(f"[UiSnapshot] 布局快照为空: {output[:200]}")
+                return False
+            self._index_node(json.loads(output[start:]))
+            self._valid = True
+        except Exception as e:
+            print(f"[UiSnapshot] 获取布局快照失败: {e}")
+        return self._valid
+
+    def invalidate(self):
+        """标记快照失效（界面已变化），下一次查询时重新抓取"""
+        self._valid = False
+
+    def _ensure(self):
+        if not self._valid:
+            self.refresh()
+
+    def find(self, text=None, node_type=None):
+        """按文本和/或类型查找节点列表"""
+        self._ensure()
+        if text is not None and node_type is not None:
+            return self._by_text_type.get((text, node_type), [])
+        if text is not None:
+            return self._by_text.get(text, [])
+        if node_type is not None:
+            return self._by_type.get(node_type, [])
+        return list(self._by_bounds.values())
+
+    def node_at_bounds(self, bounds):
+        """按bounds精确查找节点"""
+        self._ensure()
+        return self._by_bounds.get(tuple(bounds))
+
+    def resolve(self, targets, node_type=None):
+        """批量解析目标文本对应的点击坐标，返回{text: (x, y) 或 None}
+
+        匹配顺序与逐个查找时一致：文本+类型、仅文本、文本包含匹配
+        """
+        self._ensure()
+        positions = {}
+        for text in targets:
+            nodes = []
+            if node_type is not None:
+                nodes = self._by_text_type.get((text, node_type), [])
+            if not nodes:
+                nodes = self._by_text.get(text, [])
+            if not nodes:
+                for node_text, candidates in self._by_text.items():
+                    if text in node_text:
+                        nodes = candidates
+                        break
+            positions[text] = nodes[0].center if nodes else None
+        return positions
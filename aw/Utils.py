@@ -7,3 +7,17 @@ def get_app_version_code(driver: UiDriver, bundle: str) -> int:
     token = info.splitlines()[-1]
     code_str = token.replace('"versionCode":', '').replace(',', '').strip()
     return int(code_str)
+
+
+# 会话内的versionCode缓存：{(设备, 包名): versionCode}
+_VERSION_CODE_CACHE = {}
+
+
+def get_cached_app_version_code(driver: UiDriver, bundle: str, device_sn: str = "") -> int:
+    """获取应用versionCode，同一进程（测试会话）内每个设备、包名只执行一次bm dump
+    driver每个用例重新创建，不能作为缓存键；未给出设备序列号时依次使用driver的设备序列号、hdc默认设备
+    """
+    key = (device_sn or getattr(driver, "device_sn", "") or "default", bundle)
+    if key not in _VERSION_CODE_CACHE:
+        _VERSION_CODE_CACHE[key] = get_app_version_code(driver, bundle)
+    return _VERSION_CODE_CACHE[key]
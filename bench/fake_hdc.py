@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 fake_hdc.py
+#文件说明：                 本地hdc替身：按录制的规则回放设备端命令输出，并模拟命令时延
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+
+用法：由benchmark_harness.py生成名为hdc的包装脚本放到PATH最前面，用例中的
+subprocess.run("hdc shell ...") / subprocess.run(["hdc", "shell", ...]) 都会调用到这里。
+通过环境变量配置：
+  FAKE_HDC_RECORDINGS      录制文件路径（默认bench/recordings.json）
+  FAKE_HDC_STATE           规则计数器目录（按输出序列回放时使用）
+  FAKE_HDC_LATENCY_SCALE   时延缩放系数，默认1
+  FAKE_HDC_EPOCH           模拟设备的启动时刻（主机time.time()），生成类规则以此为时间原点
+  FAKE_HDC_LOG             每次调用追加一行（UiDriver替身的shell也记录），用于统计hdc子进程数
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import time
+
+DEFAULT_RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings.json")
+
+
+class HdcReplay:
+    """按规则回放设备端命令输出
+
+    录制文件中rules按顺序匹配（re.search），命中的规则给出：
+      outputs    输出序列，按调用次数依次回放；hold_last为true时回放到最后一条后保持不变，否则循环
+      output_ref 引用录制文件中的其他字段（dict/list按JSON输出）
+      generator  按当前时间生成输出：pmap、fps、cpu_stat、clock
+      latency    该命令的模拟时延（秒），缺省取default_latency
+
+    模拟设备的realtime = 主机时间 + device_clock.offset_ms，并按device_clock.drift_ppm漂移；
+    boottime/单调时钟使用主机time.monotonic()
+    """
+
+    def __init__(self, recordings_path=None, state_dir=None, latency_scale=1.0, epoch=None):
+        with open(recordings_path or DEFAULT_RECORDINGS, "r", encoding="utf-8") as f:
+            self.recordings = json.load(f)
+        self.rules = [(re.compile(rule["match"]), rule) for rule in self.recordings["rules"]]
+        self.state_dir = state_dir
+        self.latency_scale = latency_scale
+        self.epoch = epoch if epoch is not None else time.time()
+        self._counters = {}
+
+    def _next_index(self, rule_index):
+        """规则的调用计数；配置了state_dir时保存在文件中，多个hdc进程共享"""
+        if not self.state_dir:
+            count = self._counters.get(rule_index, 0)
+            self._counters[rule_index] = count + 1
+            return count
+        path = os.path.join(self.state_dir, f"rule_{rule_index}")
+        try:
+            with open(path, "r") as f:
+                count = int(f.read() or 0)
+        except (OSError, ValueError):
+            count = 0
+        with open(path, "w") as f:
+            f.write(str(count + 1))
+        return count
+
+    def _latency(self, rule):
+        return rule.get("latency", self.recordings.get("default_latency", 0.03)) * self.latency_scale
+
+    def respond(self, command):
+        """返回(输出文本, 模拟时延秒)"""
+        for rule_index, (pattern, rule) in enumerate(self.rules):
+            if not pattern.search(command):
+                continue
+            if "generator" in rule:
+                output = getattr(self, "_generate_" + rule["generator"])(rule)
+            elif "output_ref" in rule:
+                value = self.recordings[rule["output_ref"]]
+                output = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+            else:
+                outputs = rule.get("outputs", [""])
+                count = self._next_index(rule_index)
+                index = min(count, len(outputs) - 1) if rule.get("hold_last") else count % len(outputs)
+                output = outputs[index]
+            return output, self._latency(rule)
+        return "", self.recordings.get("default_latency", 0.03) * self.latency_scale
+
+    def recv(self, remote_path, local_path):
+        """模拟hdc file recv：把录制的文件内容写到本地路径，返回模拟时延"""
+        content = self.recordings.get("files", {}).get(os.path.basename(remote_path), "")
+        with open(local_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return self.recordings.get("recv_latency", 0.2) * self.latency_scale
+
+    def _generate_pmap(self, rule):
+        """进程stat + anon:Kotlin虚拟/物理内存：线性增长叠加GC锯齿"""
+        elapsed = time.time() - self.epoch
+        fields = ["S", "1"] + ["0"] * 17 + [str(rule.get("starttime", 424242))] + ["0"] * 5
+        stat = f"{rule.get('pid', 12345)} ({rule.get('process_name', 'com.tencent.videohm')[:15]}) {' '.join(fields)}"
+        virtual = rule.get("virtual_kb", 2400000)
+        gc_period = rule.get("gc_period_s", 15)
+        physical = (rule.get("physical_kb", 180000) + rule.get("growth_kb_per_s", 20) * elapsed
+                    + rule.get("sawtooth_kb", 8192) * (elapsed % gc_period) / gc_period)
+        return f"{stat}\n{virtual} {int(physical)} {self._device_realtime_ns()}\n"
+
+    def _device_realtime_ns(self):
+        clock = self.recordings.get("device_clock", {})
+        now = time.time()
+        skew = clock.get("offset_ms", 0) / 1000.0 + clock.get("drift_ppm", 0) * 1e-6 * (now - self.epoch)
+        return int((now + skew) * 1000000000)
+
+    def _generate_clock(self, rule):
+        """时钟同步探测：设备realtime纳秒 + /proc/uptime"""
+        uptime = time.monotonic()
+        return f"{self._device_realtime_ns()}\n{uptime:.2f} {uptime * 4:.2f}\n"
+
+    def _generate_fps(self, rule):
+        """最近128帧的上屏时间戳（纳秒），每隔jank_every帧丢一帧
+        配置idle_s时按单调时钟周期模拟静止：每个active_s + idle_s周期中只有前active_s秒绘制
+        """
+        refresh_rate = rule.get("refresh_rate", 120)
+        interval_ns = 1000000000 // refresh_rate
+        jank_every = rule.get("jank_every", 97)
+        active_ns = int(rule.get("active_s", 1) * 1000000000)
+        cycle_ns = active_ns + int(rule.get("idle_s", 0) * 1000000000)
+        last = time.monotonic_ns() // interval_ns
+        lines = [str(refresh_rate)]
+        for slot in range(last - 127, last + 1):
+            if slot % jank_every != 0 and (slot * interval_ns) % cycle_ns < active_ns:
+                lines.append(str(slot * interval_ns))
+        return "\n".join(lines) + "\n"
+
+    def _generate_cpu_stat(self, rule):
+        """/proc/uptime + 进程stat + 线程stat，CPU时间按固定占比随时间增长"""
+        pid = rule.get("pid", 12345)
+        uptime = time.monotonic()
+        threads = rule.get("threads", {"videohm": 0.2, "RSRenderThread": 0.1, "OS_IPC_0": 0.02})
+
+        def stat_line(tid, name, share):
+            ticks = int(uptime * 100 * share)
+            utime, stime = ticks * 3 // 4, ticks - ticks * 3 // 4
+            return f"{tid} ({name}) S 1 0 0 0 -1 0 0 0 0 0 {utime} {stime} 0 0 20 0 {len(threads)} 0 100"
+
+        lines = [f"{uptime:.2f} {uptime * 4:.2f}",
+                 stat_line(pid, rule.get("process_name", "com.tencent.videohm"), math.fsum(threads.values()))]
+        for offset, (name, share) in enumerate(threads.items()):
+            lines.append(stat_line(pid + offset, name, share))
+        return "\n".join(lines) + "\n"
+
+
+def log_call(args):
+    """配置了FAKE_HDC_LOG时追加一行调用记录（真机上每次调用对应一个hdc子进程）"""
+    log_path = os.environ.get("FAKE_HDC_LOG")
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(f"{time.time():.6f}\t{' '.join(args)[:200]}\n")
+
+
+def main(argv):
+    args = list(argv)
+    # 忽略连接参数，如 -t <sn>
+    while len(args) >= 2 and args[0] in ("-t", "-s"):
+        args = args[2:]
+    log_call(args)
+    replay = HdcReplay(os.environ.get("FAKE_HDC_RECORDINGS"),
+                       os.environ.get("FAKE_HDC_STATE"),
+                       float(os.environ.get("FAKE_HDC_LATENCY_SCALE", "1")),
+                       float(os.environ["FAKE_HDC_EPOCH"]) if "FAKE_HDC_EPOCH" in os.environ else None)
+    if len(args) >= 4 and args[0] == "file" and args[1] == "recv":
+        time.sleep(replay.recv(args[2], args[3]))
+        return 0
+    if args and args[0] == "shell":
+        output, latency = replay.respond(" ".join(args[1:]))
+        time.sleep(latency)
+        sys.stdout.write(output)
+        return 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
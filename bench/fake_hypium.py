@@ -0,0 +1,159 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 fake_hypium.py
+#文件说明：                 hypium / devicetest替身：UiDriver按录制规则回放并模拟时延，只在基准测试工具中注入
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import os
+import sys
+import threading
+import time
+import types
+
+from fake_hdc import HdcReplay, log_call
+
+
+class FakeDevice:
+    """替代controllers中的设备对象"""
+
+    def __init__(self, device_sn="FAKE0000000001"):
+        self.device_sn = device_sn
+
+
+class Selector:
+    """By / BY 选择器替身，只记录查找条件"""
+
+    def __init__(self, text=None, match_type=None):
+        self.text_value = text
+        self.match_type = match_type
+        self.type_value = None
+
+    def text(self, text, match_type=None):
+        return Selector(text, match_type)
+
+    def type(self, node_type):
+        self.type_value = node_type
+        return self
+
+
+class MatchType:
+    EQUALS = "equals"
+    CONTAINS = "contains"
+
+
+class ElementNotFound(Exception):
+    pass
+
+
+class FakeUiDriver:
+    """UiDriver替身：shell命令按录制规则回放，UI操作按录制的时延sleep，并统计各方法调用次数"""
+
+    # 所有实例共用的回放器和时延配置，由install()设置
+    replay = None
+    latency_scale = 1.0
+
+    def __init__(self, device=None):
+        self.device = device
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _wait(self, method, extra=0.0):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        latency = self.replay.recordings.get("driver_latency", {}).get(method, 0.02)
+        time.sleep(latency * self.latency_scale + extra)
+
+    def shell(self, command, timeout=60):
+        with self._lock:
+            self.calls["shell"] = self.calls.get("shell", 0) + 1
+        # 真实UiDriver的shell也会启动hdc子进程，与hdc替身的调用记在同一个日志中
+        log_call(["shell", command])
+        output, latency = self.replay.respond(command)
+        time.sleep(latency)
+        return output
+
+    def touch(self, target, *args, **kwargs):
+        self._wait("touch")
+
+    def slide(self, start, end, slide_time=0.3, *args, **kwargs):
+        self._wait("slide_overhead", slide_time)
+
+    def get_window_size(self):
+        self._wait("get_window_size")
+        return tuple(self.replay.recordings.get("window_size", (1260, 2720)))
+
+    def start_app(self, package_name=None, *args, **kwargs):
+        self._wait("start_app")
+
+    def stop_app(self, package_name=None, *args, **kwargs):
+        self._wait("stop_app")
+
+    def go_home(self):
+        self._wait("go_home")
+
+    def find_element(self, selector, *args, **kwargs):
+        # 回放环境下控件查找一律走坐标回退路径（与布局快照路径无关）
+        self._wait("find_element")
+        raise ElementNotFound(getattr(selector, "text_value", selector))
+
+    def find_element_by_text(self, text, *args, **kwargs):
+        self._wait("find_element")
+        raise ElementNotFound(text)
+
+
+class TestCase:
+    """devicetest TestCase替身"""
+
+    def __init__(self, tag, controllers):
+        self.TAG = tag
+        self.controllers = controllers
+        self.device1 = controllers[0] if controllers else FakeDevice()
+
+
+def Step(name):
+    pass
+
+
+def install(recordings_path=None, state_dir=None, latency_scale=1.0, epoch=None):
+    """把hypium、devicetest替身注册到sys.modules，必须在导入用例模块之前调用"""
+    FakeUiDriver.replay = HdcReplay(recordings_path, state_dir, latency_scale, epoch)
+    FakeUiDriver.latency_scale = latency_scale
+
+    hypium = types.ModuleType("hypium")
+    hypium.UiDriver = FakeUiDriver
+    hypium.By = Selector()
+    hypium.BY = Selector()
+    hypium.MatchType = MatchType
+    hypium.__all__ = ["UiDriver", "By", "BY", "MatchType"]
+
+    test_case = types.ModuleType("devicetest.core.test_case")
+    test_case.TestCase = TestCase
+    test_case.Step = Step
+    core = types.ModuleType("devicetest.core")
+    core.test_case = test_case
+    devicetest = types.ModuleType("devicetest")
+    devicetest.core = core
+
+    sys.modules["hypium"] = hypium
+    sys.modules["devicetest"] = devicetest
+    sys.modules["devicetest.core"] = core
+    sys.modules["devicetest.core.test_case"] = test_case
+    return FakeUiDriver.replay
+
+
+def write_hdc_wrapper(bin_dir):
+    """在bin_dir下生成可执行的hdc包装脚本，转发到fake_hdc.py"""
+    os.makedirs(bin_dir, exist_ok=True)
+    path = os.path.join(bin_dir, "hdc")
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_hdc.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+    os.chmod(path, 0o755)
+    return path
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+测试框架自身开销基准：用本地hdc替身和UiDriver替身回放录制的设备输出，在普通Linux主机上端到端运行用例和采样器，
+统计框架CPU时间、子进程数、采样超时率和teardown耗时
+
+用法：
+    python benchmark_harness.py                         # 运行全部用例和采样器基准
+    python benchmark_harness.py --cases TencentVideoShort --swipes 10
+    python benchmark_harness.py --skip-cases --sampler-duration 30
+    python benchmark_harness.py --latency-scale 2       # 模拟更慢的设备/连接
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent
+BENCH_DIR = PROJECT_DIR / "bench"
+DEFAULT_CASES = ["TencentVideoShort", "TencentVideoHome", "TencentVideoComment",
+                 "TencentVideoButton", "TencentVideoComprehensive"]
+# 采样器基准的配置：(名称, 采样间隔秒, 是否自适应)
+SAMPLER_CONFIGS = [("fixed_1s", 1.0, False), ("fixed_0.5s", 0.5, False),
+                   ("fixed_0.25s", 0.25, False), ("adaptive_1s", 1.0, True)]
+
+
+class FakeEnvironment:
+    """准备回放环境：PATH最前面放hdc包装脚本，注入hypium/devicetest替身，设置回放状态目录"""
+
+    def __init__(self, recordings_path, latency_scale):
+        self.recordings_path = str(recordings_path)
+        self.latency_scale = latency_scale
+        self.work_dir = tempfile.mkdtemp(prefix="harness_bench_")
+        self.state_dir = os.path.join(self.work_dir, "state")
+        self.log_path = os.path.join(self.work_dir, "hdc_calls.log")
+        self.db_path = os.path.join(self.work_dir, "results.db")
+        self.artifact_root = os.path.join(self.work_dir, "artifacts")
+        self.replay = None
+
+    def __enter__(self):
+        sys.path.insert(0, str(BENCH_DIR))
+        sys.path.insert(0, str(PROJECT_DIR / "testcases"))
+        sys.path.insert(0, str(PROJECT_DIR))
+        import fake_hypium
+        fake_hypium.write_hdc_wrapper(os.path.join(self.work_dir, "bin"))
+        os.environ["PATH"] = os.path.join(self.work_dir, "bin") + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_HDC_RECORDINGS"] = self.recordings_path
+        os.environ["FAKE_HDC_STATE"] = self.state_dir
+        os.environ["FAKE_HDC_LATENCY_SCALE"] = str(self.latency_scale)
+        os.environ["FAKE_HDC_LOG"] = self.log_path
+        self.replay = fake_hypium.install(self.recordings_path, self.state_dir, self.latency_scale)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def reset(self):
+        """每个基准项开始前清空回放计数和调用日志，并把模拟设备的时间原点设为当前"""
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        os.makedirs(self.state_dir)
+        open(self.log_path, "w").close()
+        epoch = time.time()
+        os.environ["FAKE_HDC_EPOCH"] = str(epoch)
+        self.replay.epoch = epoch
+        self.replay._counters = {}
+
+    def subprocess_count(self):
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+
+class ResourceMeter:
+    """统计一段代码的墙钟时间、本进程CPU时间（含所有线程）和已回收子进程的CPU时间"""
+
+    def __enter__(self):
+        self._wall = time.monotonic()
+        self._self = resource.getrusage(resource.RUSAGE_SELF)
+        self._children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        usage_self = resource.getrusage(resource.RUSAGE_SELF)
+        usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.wall = time.monotonic() - self._wall
+        self.cpu = (usage_self.ru_utime - self._self.ru_utime) + (usage_self.ru_stime - self._self.ru_stime)
+        self.children_cpu = ((usage_children.ru_utime - self._children.ru_utime)
+                             + (usage_children.ru_stime - self._children.ru_stime))
+
+
+def _overrun_rate(stats):
+    return stats["overruns"] / stats["samples"] if stats and stats.get("samples") else 0.0
+
+
+def bench_case(env, case_name, args, device):
+    """端到端运行一个用例（setup、process、teardown），返回统计结果"""
+    env.reset()
+    module = importlib.import_module(case_name)
+    case = getattr(module, case_name)([device])
+    case.results_db_path = env.db_path
+    case.artifact_root = env.artifact_root
+    for attribute in ("swipe_count", "video_swipe_count", "comment_swipe_count"):
+        if args.swipes is not None and hasattr(case, attribute):
+            setattr(case, attribute, args.swipes)
+    if args.switch_count is not None and hasattr(case, "switch_count"):
+        case.switch_count = args.switch_count
+    if args.profiler:
+        case.enable_profiler = True
+        case.profiler_preset = args.profiler
+    log = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+        with ResourceMeter() as total:
+            try:
+                case.setup()
+                case.process()
+            except Exception as e:
+                error = repr(e)
+            with ResourceMeter() as teardown:
+                case.teardown()
+    return {
+        "name": case_name,
+        "wall_s": total.wall,
+        "harness_cpu_s": total.cpu,
+        "subprocess_cpu_s": total.children_cpu,
+        "subprocesses": env.subprocess_count(),
+        "driver_calls": sum(case.driver.calls.values()),
+        "ui_snapshot_queries": case.ui_snapshot.query_count,
+        "samples": case.sampler_stats.get("samples", 0),
+        "overrun_rate": _overrun_rate(case.sampler_stats),
+        "teardown_s": teardown.wall,
+        "teardown_cpu_s": teardown.cpu,
+        "error": error,
+    }
+
+
+def bench_sampler(env, name, interval, adaptive, duration, device):
+    """只运行pmap采样线程，返回统计结果"""
+    env.reset()
+    from TencentVideoBase import TencentVideoBase
+    case = TencentVideoBase([device])
+    case.hidumper_interval = interval
+    case.enable_adaptive_sampling = adaptive
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ResourceMeter() as meter:
+            case._start_hidumper_monitor()
+            time.sleep(duration)
+            case._stop_hidumper_monitor()
+    return {
+        "name": name,
+        "wall_s": meter.wall,
+        "harness_cpu_s": meter.cpu,
+        "subprocess_cpu_s": meter.children_cpu,
+        "subprocesses": env.subprocess_count(),
+        "samples": case.sampler_stats["samples"],
+        "effective_rate": case.sampler_stats["effective_rate"],
+        "overrun_rate": _overrun_rate(case.sampler_stats),
+    }
+
+
+def format_report(case_results, sampler_results, latency_scale):
+    lines = [f"测试框架开销基准（回放时延缩放 {latency_scale}）", ""]
+    if case_results:
+        lines.append(f"{'用例':<28}{'墙钟(s)':>9}{'框架CPU(s)':>12}{'子进程CPU(s)':>14}{'子进程数':>9}"
+                     f"{'驱动调用':>9}{'超时率':>8}{'teardown(s)':>13}")
+        for r in case_results:
+            lines.append(f"{r['name']:<28}{r['wall_s']:>9.2f}{r['harness_cpu_s']:>12.3f}{r['subprocess_cpu_s']:>14.3f}"
+                         f"{r['subprocesses']:>9}{r['driver_calls']:>9}{r['overrun_rate']:>8.1%}{r['teardown_s']:>13.2f}")
+            if r["error"]:
+                lines.append(f"    异常: {r['error']}")
+        lines.append("")
+    if sampler_results:
+        lines.append(f"{'采样器':<28}{'墙钟(s)':>9}{'框架CPU(s)':>12}{'子进程CPU(s)':>14}{'子进程数':>9}"
+                     f"{'采样数':>8}{'采样率/s':>10}{'超时率':>8}")
+        for r in sampler_results:
+            lines.append(f"{r['name']:<28}{r['wall_s']:>9.2f}{r['harness_cpu_s']:>12.3f}{r['subprocess_cpu_s']:>14.3f}"
+                         f"{r['subprocesses']:>9}{r['samples']:>8}{r['effective_rate']:>10.2f}{r['overrun_rate']:>8.1%}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="测试框架开销基准（无需真机）")
+    parser.add_argument("--cases", nargs="*", default=DEFAULT_CASES, help="要运行的用例类名")
+    parser.add_argument("--skip-cases", action="store_true", help="只运行采样器基准")
+    parser.add_argument("--skip-sampler", action="store_true", help="只运行用例基准")
+    parser.add_argument("--swipes", type=int, default=5, help="覆盖用例的滑动次数，缩短运行时间")
+    parser.add_argument("--switch-count", type=int, default=1, help="覆盖TencentVideoButton的切换轮数")
+    parser.add_argument("--sampler-duration", type=float, default=10, help="每种采样器配置的运行时长（秒）")
+    parser.add_argument("--profiler", choices=["light", "standard", "deep"],
+                        help="开启profiler并使用指定预设")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="回放时延缩放系数")
+    parser.add_argument("--recordings", default=str(BENCH_DIR / "recordings.json"), help="录制文件路径")
+    parser.add_argument("--output", default=str(PROJECT_DIR / "bench_output.txt"), help="报告输出路径")
+    parser.add_argument("--json", help="同时把原始结果保存为JSON")
+    parser.add_argument("--verbose", action="store_true", help="显示用例自身的输出")
+    args = parser.parse_args()
+
+    case_results, sampler_results = [], []
+    with FakeEnvironment(args.recordings, args.latency_scale) as env:
+        import fake_hypium
+        device = fake_hypium.FakeDevice()
+        if not args.skip_cases:
+            for case_name in args.cases:
+                print(f"[Bench] 运行用例 {case_name} ...")
+                case_results.append(bench_case(env, case_name, args, device))
+        if not args.skip_sampler:
+            for name, interval, adaptive in SAMPLER_CONFIGS:
+                print(f"[Bench] 运行采样器 {name} ...")
+                sampler_results.append(bench_sampler(env, name, interval, adaptive, args.sampler_duration, device))
+
+    report = format_report(case_results, sampler_results, args.latency_scale)
+    print(report)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cases": case_results, "sampler": sampler_results}, f, ensure_ascii=False, indent=2)
+    print(f"[Bench] 报告已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
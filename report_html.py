@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+从结果库生成单次运行的HTML报告：pmap、CPU、hidumper等时间序列分面板显示，叠加步骤和UI操作标记
+
+长时间运行的采样点很多（几十万点），不能直接画到浏览器里。每个序列按min/max分桶降采样（保留每桶的最小值
+和最大值，尖峰和GC回落不会被抹平），用numpy向量化计算，并预先生成多个缩放级别：第L级的点数是第0级的2^L倍，
+页面按当前可见范围选用刚好够用的级别，多小时的运行也能从一个很小的HTML文件即时渲染。
+
+用法：
+    python report_html.py                                  # 结果库中最近一次运行
+    python report_html.py --testcase TencentVideoComprehensive
+    python report_html.py --run-id 20261019120000_ab12cd34ef56 -o report.html --points 1500 --levels 6
+"""
+
+import argparse
+import fnmatch
+import html
+import json
+import math
+from pathlib import Path
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from aw.ResultsStore import ResultsStore, DEFAULT_DB_PATH
+
+# 面板定义：(标题, 序列名通配符列表, 通配符匹配到多个序列时最多显示几个（按均值排序）)
+PANELS = [
+    ("anon:Kotlin 物理内存 / hidumper 总PSS (kB)", ["pmap_physical_kb", "hidumper_total_pss_kb"], None),
+    ("anon:Kotlin 虚拟内存 (kB)", ["pmap_virtual_kb"], None),
+    ("CPU 占用 (%)", ["cpu_process_pct", "cpu_thread:*"], 6),
+    ("hidumper 各类型PSS (kB)", ["hidumper_pss:*"], 8),
+    ("帧率 / 卡顿", ["frame_fps", "frame_jank"], None),
+]
+# 显示为竖线并带标签的事件，其余事件显示为面板顶部的短刻度
+STEP_EVENTS = ("step",)
+
+
+def minmax_indices(values, buckets):
+    """把序列按下标均分为buckets个桶，返回每个桶最小值、最大值所在的下标（含首尾点），按时间顺序排列
+    点数不超过2*buckets时返回全部下标
+    """
+    n = values.size
+    if n <= 2 * buckets + 2:
+        return np.arange(n)
+    starts = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(starts, n)))
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    first_min = _first_per_bucket(values == mins[bucket_of], bucket_of)
+    first_max = _first_per_bucket(values == maxs[bucket_of], bucket_of)
+    return np.unique(np.concatenate(([0, n - 1], first_min, first_max)))
+
+
+def _first_per_bucket(mask, bucket_of):
+    """mask为True的位置中，每个桶取第一个"""
+    positions = np.flatnonzero(mask)
+    _, first = np.unique(bucket_of[positions], return_index=True)
+    return positions[first]
+
+
+def build_levels(ts_ms, values, points, max_levels):
+    """生成多个缩放级别：第L级约points*2^L个点，达到原始分辨率后不再生成更高级别
+    每级为[时间差分(ms)列表, 数值列表]，时间按差分存储、整数值不带小数，减小报告文件大小
+    """
+    levels = []
+    for level in range(max_levels):
+        index = minmax_indices(values, max(1, points * 2 ** level // 2))
+        deltas = np.diff(ts_ms[index], prepend=0).tolist()
+        compact = [int(v) if v.is_integer() else v for v in np.round(values[index], 1).tolist()]
+        levels.append([deltas, compact])
+        if index.size == values.size:
+            break
+    return levels
+
+
+def _select_series(all_series, patterns, limit, means):
+    selected = []
+    for pattern in patterns:
+        matched = sorted(name for name in all_series if fnmatch.fnmatchcase(name, pattern) and name not in selected)
+        if limit is not None and any(ch in pattern for ch in "*?["):
+            matched = sorted(matched, key=lambda name: means[name], reverse=True)[:limit]
+        selected.extend(matched)
+    return selected
+
+
+def build_report_data(store, run, points=1000, max_levels=4):
+    """读取一次运行的采样和事件，返回报告页面使用的数据（时间为相对运行开始的毫秒数）"""
+    if not HAS_NUMPY:
+        raise ImportError("生成HTML报告需要numpy，请运行: pip install numpy")
+    run_id = run["run_id"]
+    arrays = {}
+    for name in store.list_series(run_id):
+        rows = np.array(store.query_samples(run_id, name), dtype=float).reshape(-1, 2)
+        rows = rows[np.isfinite(rows[:, 1])]
+        if rows.size:
+            arrays[name] = rows
+    events = store.query_events(run_id)
+    origin = min([run["started_at"] or math.inf] + [rows[0, 0] for rows in arrays.values()]
+                 + [ts for ts, _, _ in events[:1]])
+    end = max([run["finished_at"] or -math.inf] + [rows[-1, 0] for rows in arrays.values()]
+              + [ts for ts, _, _ in events[-1:]])
+    if not math.isfinite(origin):
+        origin = end = 0
+    peaks = {name: float(rows[:, 1].max()) for name, rows in arrays.items()}
+    means = {name: float(rows[:, 1].mean()) for name, rows in arrays.items()}
+
+    panels = []
+    for title, patterns, limit in PANELS:
+        series = []
+        for name in _select_series(arrays, patterns, limit, means):
+            rows = arrays[name]
+            ts_ms = np.round((rows[:, 0] - origin) / 1000).astype(np.int64)
+            series.append({"name": name, "points": int(rows.shape[0]), "peak": peaks[name],
+                           "levels": build_levels(ts_ms, rows[:, 1], points, max_levels)})
+        if series:
+            panels.append({"title": title, "series": series})
+    return {
+        "run": {key: run[key] for key in ("run_id", "testcase", "device", "version_code", "start_type")},
+        "duration_ms": int((end - origin) / 1000),
+        "points": points,
+        "panels": panels,
+        "events": [[int((ts - origin) / 1000), kind, detail or ""] for ts, kind, detail in events],
+        "step_events": list(STEP_EVENTS),
+    }
+
+
+def render_html(data):
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    title = html.escape(f"{data['run']['testcase']} {data['run']['run_id']}")
+    return _HTML_TEMPLATE.replace("__TITLE__", title).replace("__REPORT_DATA__", payload)
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; margin: 16px; color: #222; }
+h1 { font-size: 18px; margin: 0 0 4px; }
+#info, #hint { font-size: 12px; color: #666; margin-bottom: 6px; }
+.panel { margin-bottom: 10px; }
+.panel h2 { font-size: 13px; margin: 6px 0 2px; }
+.legend { font-size: 12px; }
+.legend span { margin-right: 12px; white-space: nowrap; }
+.legend i { display: inline-block; width: 10px; height: 10px; margin-right: 4px; vertical-align: middle; }
+canvas { display: block; width: 100%; height: 200px; cursor: crosshair; }
+#tooltip { position: fixed; pointer-events: none; background: rgba(255,255,255,0.95); border: 1px solid #aaa;
+           font-size: 12px; padding: 4px 6px; display: none; white-space: pre; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div id="info"></div>
+<div id="hint">拖动选择区间放大，滚轮缩放，双击还原；竖线为测试步骤，顶部刻度为UI操作和其他事件</div>
+<div id="panels"></div>
+<div id="tooltip"></div>
+<script>
+const DATA = __REPORT_DATA__;
+// 时间按差分存储，加载时还原为累计值
+DATA.panels.forEach(panel => panel.series.forEach(series => series.levels.forEach(level => {
+  for (let i = 1; i < level[0].length; i++) level[0][i] += level[0][i - 1];
+})));
+const COLORS = ["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b", "#e377c2", "#17becf"];
+const EVENT_COLORS = {touch: "#999", swipe: "#999", click_text: "#999", click_buttons: "#999",
+                      gc_dump: "#d62728", leak_detected: "#d62728", process_restart: "#ff7f0e",
+                      process_exit: "#ff7f0e", process_start: "#2ca02c"};
+const PAD = {left: 70, right: 10, top: 12, bottom: 20};
+let view = [0, Math.max(DATA.duration_ms, 1)];
+const charts = [];
+
+document.getElementById("info").textContent =
+  "设备 " + DATA.run.device + "，versionCode " + DATA.run.version_code + "，" + DATA.run.start_type +
+  "，时长 " + (DATA.duration_ms / 1000).toFixed(1) + " 秒";
+
+function levelFor(series) {
+  // 可见范围占全程的比例越小，选用的级别越高，保证可见点数不少于第0级的点数
+  const fraction = (view[1] - view[0]) / Math.max(DATA.duration_ms, 1);
+  const wanted = Math.max(0, Math.ceil(Math.log2(1 / Math.max(fraction, 1e-9))));
+  return series.levels[Math.min(wanted, series.levels.length - 1)];
+}
+
+function lowerBound(arr, x) {
+  let lo = 0, hi = arr.length;
+  while (lo < hi) { const mid = (lo + hi) >> 1; if (arr[mid] < x) lo = mid + 1; else hi = mid; }
+  return lo;
+}
+
+function formatValue(v) {
+  return Math.abs(v) >= 10000 ? v.toExponential(2) : (+v.toFixed(2)).toString();
+}
+
+function draw(chart) {
+  const canvas = chart.canvas, ctx = canvas.getContext("2d");
+  const ratio = window.devicePixelRatio || 1;
+  const width = canvas.clientWidth, height = canvas.clientHeight;
+  canvas.width = width * ratio; canvas.height = height * ratio;
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.clearRect(0, 0, width, height);
+  const plotW = width - PAD.left - PAD.right, plotH = height - PAD.top - PAD.bottom;
+  const x = t => PAD.left + (t - view[0]) / (view[1] - view[0]) * plotW;
+  // 先取可见区间内的点，纵轴范围只按可见点计算
+  const visible = chart.panel.series.map(series => {
+    const level = levelFor(series);
+    const start = Math.max(0, lowerBound(level[0], view[0]) - 1);
+    const stop = Math.min(level[0].length, lowerBound(level[0], view[1]) + 1);
+    return [level[0].slice(start, stop), level[1].slice(start, stop)];
+  });
+  let lo = Infinity, hi = -Infinity;
+  visible.forEach(v => v[1].forEach(value => { if (value < lo) lo = value; if (value > hi) hi = value; }));
+  if (!isFinite(lo)) { lo = 0; hi = 1; }
+  if (hi === lo) { hi += 1; lo -= 1; }
+  const margin = (hi - lo) * 0.05; lo -= margin; hi += margin;
+  const y = v => PAD.top + (1 - (v - lo) / (hi - lo)) * plotH;
+  chart.scale = {x, y, lo, hi, plotW};
+
+  ctx.strokeStyle = "#ddd"; ctx.fillStyle = "#666"; ctx.font = "11px sans-serif"; ctx.lineWidth = 1;
+  for (let i = 0; i <= 4; i++) {
+    const v = lo + (hi - lo) * i / 4, py = y(v);
+    ctx.beginPath(); ctx.moveTo(PAD.left, py); ctx.lineTo(width - PAD.right, py); ctx.stroke();
+    ctx.fillText(formatValue(v), 4, py + 4);
+  }
+  for (let i = 0; i <= 8; i++) {
+    const t = view[0] + (view[1] - view[0]) * i / 8;
+    ctx.fillText((t / 1000).toFixed(1) + "s", x(t) - 12, height - 4);
+  }
+
+  ctx.save();
+  ctx.beginPath(); ctx.rect(PAD.left, PAD.top, plotW, plotH); ctx.clip();
+  DATA.events.forEach(([t, kind, detail]) => {
+    if (t < view[0] || t > view[1]) return;
+    const px = x(t);
+    if (DATA.step_events.includes(kind)) {
+      ctx.strokeStyle = "#bbb"; ctx.setLineDash([4, 3]);
+      ctx.beginPath(); ctx.moveTo(px, PAD.top); ctx.lineTo(px, PAD.top + plotH); ctx.stroke();
+      ctx.setLineDash([]);
+      if (chart.index === 0) { ctx.fillStyle = "#888"; ctx.fillText(detail, px + 2, PAD.top + 10); }
+    } else {
+      ctx.strokeStyle = EVENT_COLORS[kind] || "#9467bd";
+      ctx.beginPath(); ctx.moveTo(px, PAD.top); ctx.lineTo(px, PAD.top + 6); ctx.stroke();
+    }
+  });
+  visible.forEach(([ts, values], i) => {
+    ctx.strokeStyle = COLORS[i % COLORS.length]; ctx.lineWidth = 1.2;
+    ctx.beginPath();
+    for (let k = 0; k < ts.length; k++) {
+      if (k === 0) ctx.moveTo(x(ts[k]), y(values[k])); else ctx.lineTo(x(ts[k]), y(values[k]));
+    }
+    ctx.stroke();
+  });
+  if (chart.selection) {
+    ctx.fillStyle = "rgba(31,119,180,0.15)";
+    const [a, b] = chart.selection;
+    ctx.fillRect(Math.min(a, b), PAD.top, Math.abs(b - a), plotH);
+  }
+  ctx.restore();
+}
+
+function drawAll() { charts.forEach(draw); }
+
+function timeAt(chart, px) {
+  return view[0] + (px - PAD.left) / chart.scale.plotW * (view[1] - view[0]);
+}
+
+function setView(t0, t1) {
+  const full = Math.max(DATA.duration_ms, 1);
+  const span = Math.min(Math.max(t1 - t0, 50), full);
+  t0 = Math.min(Math.max(t0, 0), full - span);
+  view = [t0, t0 + span];
+  drawAll();
+}
+
+function showTooltip(chart, event) {
+  const tooltip = document.getElementById("tooltip");
+  const t = timeAt(chart, event.offsetX);
+  const lines = [(t / 1000).toFixed(2) + "s"];
+  chart.panel.series.forEach(series => {
+    const level = levelFor(series);
+    const i = Math.min(lowerBound(level[0], t), level[0].length - 1);
+    if (i >= 0) lines.push(series.name + ": " + formatValue(level[1][i]));
+  });
+  const near = (view[1] - view[0]) / chart.scale.plotW * 4;
+  DATA.events.forEach(([et, kind, detail]) => {
+    if (Math.abs(et - t) <= near) lines.push("[" + kind + "] " + detail);
+  });
+  tooltip.textContent = lines.join("\\n");
+  tooltip.style.left = (event.clientX + 12) + "px";
+  tooltip.style.top = (event.clientY + 12) + "px";
+  tooltip.style.display = "block";
+}
+
+DATA.panels.forEach((panel, index) => {
+  const div = document.createElement("div");
+  div.className = "panel";
+  div.innerHTML = "<h2></h2><div class='legend'></div><canvas></canvas>";
+  div.querySelector("h2").textContent = panel.title;
+  // 序列名来自线程名、hidumper类型等设备数据，只能作为文本插入
+  const legend = div.querySelector(".legend");
+  panel.series.forEach((s, i) => {
+    const span = document.createElement("span");
+    const swatch = document.createElement("i");
+    swatch.style.background = COLORS[i % COLORS.length];
+    span.appendChild(swatch);
+    span.appendChild(document.createTextNode(s.name + "（" + s.points + "点，峰值 " + formatValue(s.peak) + "）"));
+    legend.appendChild(span);
+  });
+  document.getElementById("panels").appendChild(div);
+  const chart = {panel, index, canvas: div.querySelector("canvas"), selection: null};
+  charts.push(chart);
+  const canvas = chart.canvas;
+  canvas.addEventListener("mousedown", e => { chart.selection = [e.offsetX, e.offsetX]; });
+  canvas.addEventListener("mousemove", e => {
+    if (chart.selection) { chart.selection[1] = e.offsetX; draw(chart); }
+    showTooltip(chart, e);
+  });
+  canvas.addEventListener("mouseup", () => {
+    const selection = chart.selection;
+    chart.selection = null;
+    if (selection && Math.abs(selection[1] - selection[0]) > 4) {
+      const a = timeAt(chart, Math.min(...selection)), b = timeAt(chart, Math.max(...selection));
+      setView(a, b);
+    } else {
+      draw(chart);
+    }
+  });
+  canvas.addEventListener("mouseleave", () => {
+    document.getElementById("tooltip").style.display = "none";
+    if (chart.selection) { chart.selection = null; draw(chart); }
+  });
+  canvas.addEventListener("wheel", e => {
+    e.preventDefault();
+    const t = timeAt(chart, e.offsetX), factor = e.deltaY > 0 ? 1.25 : 0.8;
+    setView(t - (t - view[0]) * factor, t + (view[1] - t) * factor);
+  }, {passive: false});
+  canvas.addEventListener("dblclick", () => setView(0, DATA.duration_ms));
+});
+window.addEventListener("resize", drawAll);
+drawAll();
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="从结果库生成单次运行的HTML时间序列报告")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="结果库路径")
+    parser.add_argument("--run-id", help="运行ID，默认为最近一次运行")
+    parser.add_argument("--testcase", help="未指定--run-id时，取该用例最近一次运行")
+    parser.add_argument("-o", "--output", help="输出文件，默认为 results/report_<run_id>.html")
+    parser.add_argument("--points", type=int, default=1000, help="第0级（全程视图）每个序列的点数")
+    parser.add_argument("--levels", type=int, default=4, help="预先生成的缩放级别数，每级点数翻倍")
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("错误: 生成HTML报告需要numpy，请运行: pip install numpy")
+        return
+    with ResultsStore(args.db) as store:
+        if args.run_id:
+            runs = [run for run in store.query_runs() if run["run_id"] == args.run_id]
+        else:
+            runs = store.query_runs(testcase=args.testcase, limit=1)
+        if not runs:
+            print(f"错误: 结果库 {args.db} 中没有找到运行记录")
+            return
+        data = build_report_data(store, runs[0], args.points, args.levels)
+
+    output_path = Path(args.output or Path(args.db).parent / f"report_{data['run']['run_id']}.html")
+    content = render_html(data)
+    output_path.write_text(content, encoding="utf-8")
+    total_points = sum(s["points"] for panel in data["panels"] for s in panel["series"])
+    print(f"[Report] {data['run']['testcase']} {data['run']['run_id']}: {len(data['panels'])} 个面板，"
+          f"原始 {total_points} 个采样点，{len(data['events'])} 个事件")
+    print(f"[Report] 报告已保存到 {output_path}（{len(content) / 1024:.0f} KB）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+离线符号化：用从设备拉取的.so文件解析nativehook离线符号化模式（offline_symbolization: true）下的原始地址，
+并把结果保存到持久化符号缓存中，同一应用版本的后续trace几乎全部从缓存解析
+
+缓存（默认results/symbol_cache.db）包含以下几部分：
+  files     本地库文件（路径、大小、修改时间）到build ID的映射，文件未变化时不需要再读取ELF
+  ranges    每个库的函数地址区间表（按起始地址排序），有了区间表就不需要再解析ELF
+  resolved  已解析过的(build ID, 文件偏移) -> 符号，重复出现的帧直接命中
+
+输入：每行一个帧，格式为 "库路径 偏移" 或 "库路径+0x偏移"（偏移为文件内偏移，十六进制需带0x），
+可以由trace导出工具生成。输出：在每行后追加 "符号+0x函数内偏移"。
+
+用法：
+    python symbolize_offline.py frames.txt --symbols-dir pulled_libs/ -o frames_symbolized.txt
+"""
+
+import argparse
+import hashlib
+import lzma
+import os
+import sqlite3
+import struct
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / "results" / "symbol_cache.db"
+
+_SHT_SYMTAB = 2
+_SHT_NOTE = 7
+_SHT_DYNSYM = 11
+_PT_LOAD = 1
+_STT_FUNC = 2
+_NT_GNU_BUILD_ID = 3
+
+
+class ElfError(Exception):
+    pass
+
+
+class ElfInfo:
+    """解析ELF得到的符号化所需信息"""
+
+    def __init__(self, build_id, symbols, segments):
+        # build ID（十六进制），没有.note.gnu.build-id时为文件内容的sha256
+        self.build_id = build_id
+        # 函数符号：[(起始虚拟地址, 大小, 名称), ...]
+        self.symbols = symbols
+        # 可加载段：[(p_offset, p_vaddr, p_filesz), ...]，用于文件偏移到虚拟地址的换算
+        self.segments = segments
+
+
+def _parse_elf_bytes(data, allow_debugdata=True):
+    """从ELF文件内容解析build ID、函数符号和可加载段"""
+    if data[:4] != b"\x7fELF":
+        raise ElfError("不是ELF文件")
+    is_64 = data[4] == 2
+    endian = "<" if data[5] == 1 else ">"
+    if is_64:
+        (_, _, _, _, e_phoff, e_shoff, _, _, e_phentsize, e_phnum,
+         e_shentsize, e_shnum, e_shstrndx) = struct.unpack_from(endian + "HHIQQQIHHHHHH", data, 16)
+        sh_format, ph_format, sym_format = endian + "IIQQQQIIQQ", endian + "IIQQQQQQ", endian + "IBBHQQ"
+    else:
+        (_, _, _, _, e_phoff, e_shoff, _, _, e_phentsize, e_phnum,
+         e_shentsize, e_shnum, e_shstrndx) = struct.unpack_from(endian + "HHIIIIIHHHHHH", data, 16)
+        sh_format, ph_format, sym_format = endian + "IIIIIIIIII", endian + "IIIIIIII", endian + "IIIBBH"
+
+    segments = []
+    for i in range(e_phnum):
+        fields = struct.unpack_from(ph_format, data, e_phoff + i * e_phentsize)
+        if is_64:
+            p_type, _, p_offset, p_vaddr, _, p_filesz, _, _ = fields
+        else:
+            p_type, p_offset, p_vaddr, _, p_filesz, _, _, _ = fields
+        if p_type == _PT_LOAD:
+            segments.append((p_offset, p_vaddr, p_filesz))
+
+    sections = []
+    for i in range(e_shnum):
+        fields = struct.unpack_from(sh_format, data, e_shoff + i * e_shentsize)
+        # (sh_name, sh_type, sh_offset, sh_size, sh_link, sh_entsize)
+        sections.append((fields[0], fields[1], fields[4], fields[5], fields[6], fields[9]))
+
+    def section_name(section):
+        if e_shstrndx >= len(sections):
+            return ""
+        strtab_offset = sections[e_shstrndx][2]
+        start = strtab_offset + section[0]
+        return data[start:data.index(b"\0", start)].decode("utf-8", "replace")
+
+    build_id = None
+    symbols = []
+    for section in sections:
+        _, sh_type, sh_offset, sh_size, sh_link, sh_entsize = section
+        if sh_type == _SHT_NOTE and build_id is None:
+            pos, end = sh_offset, sh_offset + sh_size
+            while pos + 12 <= end:
+                namesz, descsz, note_type = struct.unpack_from(endian + "III", data, pos)
+                name_start = pos + 12
+                desc_start = name_start + ((namesz + 3) & ~3)
+                if note_type == _NT_GNU_BUILD_ID and data[name_start:name_start + namesz] == b"GNU\0":
+                    build_id = data[desc_start:desc_start + descsz].hex()
+                    break
+                pos = desc_start + ((descsz + 3) & ~3)
+        elif sh_type in (_SHT_SYMTAB, _SHT_DYNSYM) and sh_entsize:
+            strtab_offset = sections[sh_link][2]
+            for pos in range(sh_offset, sh_offset + sh_size, sh_entsize):
+                fields = struct.unpack_from(sym_format, data, pos)
+                if is_64:
+                    st_name, st_info, _, st_shndx, st_value, st_size = fields
+                else:
+                    st_name, st_value, st_size, st_info, _, st_shndx = fields
+                if st_info & 0xf != _STT_FUNC or st_value == 0 or st_shndx == 0:
+                    continue
+                start = strtab_offset + st_name
+                name = data[start:data.index(b"\0", start)].decode("utf-8", "replace")
+                symbols.append((st_value, st_size, name))
+        elif allow_debugdata and section_name(section) == ".gnu_debugdata":
+            # MiniDebugInfo：xz压缩的内嵌ELF，其中的.symtab包含剥离掉的本地函数符号
+            try:
+                embedded = _parse_elf_bytes(lzma.decompress(data[sh_offset:sh_offset + sh_size]), False)
+                symbols.extend(embedded.symbols)
+            except (lzma.LZMAError, ElfError, struct.error, ValueError):
+                pass
+
+    if build_id is None:
+        build_id = "sha256:" + hashlib.sha256(data).hexdigest()
+    return ElfInfo(build_id, symbols, segments)
+
+
+def parse_elf(path):
+    """解析.so文件，返回ElfInfo"""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return _parse_elf_bytes(data)
+    except (struct.error, IndexError, ValueError) as e:
+        raise ElfError(f"ELF解析失败: {path}: {e}")
+
+
+class RangeTable:
+    """函数地址区间表：按起始地址排序的并列数组，二分查找地址所在函数"""
+
+    def __init__(self, symbols, segments):
+        starts, ends, names = array('Q'), array('Q'), []
+        last_start = None
+        # 同一起始地址只保留最大的符号（别名中取一个）
+        for start, size, name in sorted(symbols, key=lambda s: (s[0], -s[1])):
+            if start == last_start:
+                continue
+            last_start = start
+            starts.append(start)
+            ends.append(start + max(size, 1))
+            names.append(name)
+        self.starts = starts
+        self.ends = ends
+        self.names = names
+        self.segments = sorted(segments)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def offset_to_vaddr(self, offset):
+        """文件偏移换算为虚拟地址，不在任何可加载段内时按偏移原样返回"""
+        for p_offset, p_vaddr, p_filesz in self.segments:
+            if p_offset <= offset < p_offset + p_filesz:
+                return offset - p_offset + p_vaddr
+        return offset
+
+    def lookup(self, offset):
+        """返回"符号+0x函数内偏移"，地址不在任何函数内时返回None"""
+        vaddr = self.offset_to_vaddr(offset)
+        index = bisect_right(self.starts, vaddr) - 1
+        if index < 0 or vaddr >= self.ends[index]:
+            return None
+        return f"{self.names[index]}+0x{vaddr - self.starts[index]:x}"
+
+
+class SymbolCache:
+    """持久化符号缓存（SQLite），区间表和已解析结果都以build ID为键"""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ranges (
+        build_id TEXT NOT NULL,
+        start    INTEGER NOT NULL,
+        end      INTEGER NOT NULL,
+        name     TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS segments (
+        build_id TEXT NOT NULL,
+        p_offset INTEGER NOT NULL,
+        p_vaddr  INTEGER NOT NULL,
+        p_filesz INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS resolved (
+        build_id TEXT NOT NULL,
+        offset   INTEGER NOT NULL,
+        symbol   TEXT,
+        PRIMARY KEY (build_id, offset)
+    );
+    CREATE TABLE IF NOT EXISTS files (
+        path     TEXT PRIMARY KEY,
+        size     INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        build_id TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_ranges_build ON ranges (build_id, start);
+    CREATE INDEX IF NOT EXISTS idx_segments_build ON segments (build_id);
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        # 本次运行新解析的结果，close时批量写入
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_file_build_id(self, path, size, mtime_ns):
+        """本地库文件未变化（大小和修改时间相同）时返回缓存的build ID，否则返回None"""
+        row = self._conn.execute("SELECT build_id FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                                 (path, size, mtime_ns)).fetchone()
+        return row[0] if row else None
+
+    def put_file_build_id(self, path, size, mtime_ns, build_id):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, build_id) VALUES (?, ?, ?, ?)",
+                               (path, size, mtime_ns, build_id))
+
+    def load_resolved(self, build_id):
+        """读取某个库全部已解析的偏移，返回{offset: symbol}"""
+        return dict(self._conn.execute("SELECT offset, symbol FROM resolved WHERE build_id = ?", (build_id,)))
+
+    def add_resolved(self, build_id, offset, symbol):
+        self._pending.append((build_id, offset, symbol))
+
+    def flush(self):
+        if self._pending:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO resolved (build_id, offset, symbol) VALUES (?, ?, ?)",
+                                       self._pending)
+            self._pending = []
+
+    def load_table(self, build_id):
+        """读取缓存的区间表，没有时返回None"""
+        rows = self._conn.execute("SELECT start, end, name FROM ranges WHERE build_id = ? ORDER BY start",
+                                  (build_id,)).fetchall()
+        segments = self._conn.execute("SELECT p_offset, p_vaddr, p_filesz FROM segments WHERE build_id = ?",
+                                      (build_id,)).fetchall()
+        if not rows and not segments:
+            return None
+        return RangeTable([(start, end - start, name) for start, end, name in rows], segments)
+
+    def save_table(self, build_id, table):
+        with self._conn:
+            self._conn.execute("DELETE FROM ranges WHERE build_id = ?", (build_id,))
+            self._conn.execute("DELETE FROM segments WHERE build_id = ?", (build_id,))
+            self._conn.executemany("INSERT INTO ranges (build_id, start, end, name) VALUES (?, ?, ?, ?)",
+                                   ((build_id, s, e, n) for s, e, n in zip(table.starts, table.ends, table.names)))
+            self._conn.executemany("INSERT INTO segments (build_id, p_offset, p_vaddr, p_filesz) VALUES (?, ?, ?, ?)",
+                                   ((build_id,) + tuple(segment) for segment in table.segments))
+
+
+class OfflineSymbolizer:
+    """按库路径和文件偏移解析符号
+
+    查找顺序：内存中的已解析结果（启动时按build ID从缓存整体载入）-> 区间表（缓存或解析ELF后建立）
+    """
+
+    def __init__(self, symbols_dir, cache):
+        self.cache = cache
+        # 拉取的.so按文件名建立索引：{basename: 本地路径}
+        self.libraries = {}
+        for root, _, files in os.walk(symbols_dir):
+            for name in files:
+                if ".so" in name:
+                    self.libraries.setdefault(name, os.path.join(root, name))
+        self._build_ids = {}
+        self._tables = {}
+        self._resolved = {}
+        self.stats = {"frames": 0, "cache_hits": 0, "table_lookups": 0, "unresolved": 0,
+                      "missing_library": 0, "tables_from_cache": 0, "elf_parsed": 0}
+
+    def _library_key(self, lib_path):
+        """返回本地库文件对应的build ID，找不到本地文件时返回None"""
+        name = os.path.basename(lib_path)
+        if name in self._build_ids:
+            return self._build_ids[name]
+        build_id = None
+        local_path = self.libraries.get(name)
+        if local_path is not None:
+            try:
+                stat = os.stat(local_path)
+                local_path = os.path.abspath(local_path)
+                build_id = self.cache.get_file_build_id(local_path, stat.st_size, stat.st_mtime_ns)
+                info = None
+                if build_id is None:
+                    info = parse_elf(local_path)
+                    build_id = info.build_id
+                    self.cache.put_file_build_id(local_path, stat.st_size, stat.st_mtime_ns, build_id)
+                    self.stats["elf_parsed"] += 1
+                table = self.cache.load_table(build_id)
+                if table is not None:
+                    self.stats["tables_from_cache"] += 1
+                else:
+                    # 区间表不在缓存中（首次解析，或上次运行中断、区间表被清除）时用ELF重新建立
+                    if info is None:
+                        info = parse_elf(local_path)
+                        self.stats["elf_parsed"] += 1
+                    table = RangeTable(info.symbols, info.segments)
+                    self.cache.save_table(build_id, table)
+                self._tables[build_id] = table
+            except (OSError, ElfError) as e:
+                print(f"[Symbolizer] 无法解析 {local_path}: {e}")
+        self._build_ids[name] = build_id
+        return build_id
+
+    def _table(self, build_id):
+        table = self._tables.get(build_id)
+        if table is None and build_id not in self._tables:
+            table = self.cache.load_table(build_id)
+            self._tables[build_id] = table
+            if table is not None:
+                self.stats["tables_from_cache"] += 1
+        return table
+
+    def symbolize(self, lib_path, offset):
+        """返回"符号+0x函数内偏移"，无法解析时返回None"""
+        self.stats["frames"] += 1
+        build_id = self._library_key(lib_path)
+        if build_id is None:
+            self.stats["missing_library"] += 1
+            return None
+        resolved = self._resolved.get(build_id)
+        if resolved is None:
+            resolved = self._resolved[build_id] = self.cache.load_resolved(build_id)
+        if offset in resolved:
+            self.stats["cache_hits"] += 1
+            return resolved[offset]
+        self.stats["table_lookups"] += 1
+        table = self._table(build_id)
+        symbol = table.lookup(offset) if table is not None else None
+        if symbol is None:
+            self.stats["unresolved"] += 1
+        resolved[offset] = symbol
+        self.cache.add_resolved(build_id, offset, symbol)
+        return symbol
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["cache_hits"] + self.stats["table_lookups"]
+        return self.stats["cache_hits"] / lookups if lookups else 0.0
+
+    def format_stats(self):
+        s = self.stats
+        return (f"[Symbolizer] 帧 {s['frames']}，缓存命中 {s['cache_hits']}（命中率 {self.hit_rate:.1%}），"
+                f"区间表查找 {s['table_lookups']}，未解析 {s['unresolved']}，缺少库文件 {s['missing_library']}，"
+                f"解析ELF {s['elf_parsed']}个，从缓存载入区间表 {s['tables_from_cache']}个")
+
+
+def parse_frame_line(line):
+    """解析一行帧：'库路径 偏移' 或 '库路径+0x偏移'，返回(库路径, 偏移)或None"""
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+    if " " in text or "\t" in text:
+        lib_path, _, offset_text = text.replace("\t", " ").rpartition(" ")
+    else:
+        lib_path, _, offset_text = text.rpartition("+")
+    try:
+        return lib_path.strip(), int(offset_text, 0)
+    except ValueError:
+        return None
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="使用拉取的.so文件离线解析nativehook原始地址")
+    parser.add_argument("frames", help="帧列表文件，每行 '库路径 偏移' 或 '库路径+0x偏移'")
+    parser.add_argument("--symbols-dir", required=True, help="从设备拉取的.so所在目录（递归查找）")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_PATH), help="符号缓存路径")
+    parser.add_argument("-o", "--output", help="输出文件，默认为 <输入>_symbolized.txt")
+    args = parser.parse_args()
+
+    output_path = args.output or str(Path(args.frames).with_suffix("")) + "_symbolized.txt"
+    with SymbolCache(args.cache) as cache:
+        symbolizer = OfflineSymbolizer(args.symbols_dir, cache)
+        with open(args.frames, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as dst:
+            for line in src:
+                frame = parse_frame_line(line)
+                if frame is None:
+                    dst.write(line)
+                    continue
+                symbol = symbolizer.symbolize(*frame)
+                dst.write(f"{line.rstrip()}\t{symbol or '??'}\n")
+    print(symbolizer.format_stats())
+    print(f"[Symbolizer] 结果已保存到 {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,9 +16,32 @@ import subprocess
 import os
 import threading
 import re
+import json
 from pathlib import Path
 from devicetest.core.test_case import TestCase, Step
 from hypium import *
+from aw.UiSnapshot import UiSnapshot
+from aw.ScenarioEngine import ScenarioEngine
+from aw.SamplingPolicy import FixedSamplingPolicy, AdaptiveSamplingPolicy
+from aw.LeakDetector import OnlineLeakDetector, LeakDetectedError
+from aw.GcDumpTrigger import GcDumpTrigger
+from aw.StartupProbe import StartupProbe
+from aw.FrameTimingCollector import FrameTimingCollector
+from aw.CpuSampler import CpuSampler
+from aw.ProcessTracker import ProcessTracker
+from aw.ClockSync import ClockSync
+from aw.MetricsExporter import get_exporter
+from aw.HidumperCollector import HidumperMemCollector
+from aw.PmapSnapshotStore import PmapSnapshotCollector, SNAPSHOT_DATA_FILE, SNAPSHOT_INDEX_FILE, MAPPING_TABLE_FILE
+from aw.ResultsStore import ResultsStore, DEFAULT_DB_PATH
+from aw.ArtifactStore import ArtifactStore, DEFAULT_ARTIFACT_ROOT
+from aw.BaselineGate import BaselineGate
+from aw.ProfilerSession import ProfilerSession, REMOTE_HTRACE_PATH
+from aw.Utils import get_cached_app_version_code
+from analyze_hidumper import parse_hidumper_lines
+
+# 会唤醒自适应采样进入高频采样的事件类型
+UI_ACTION_EVENTS = ("touch", "swipe", "click_text", "click_buttons", "gc_dump")
 
 
 class TencentVideoBase(TestCase):
@@ -27,31 +50,158 @@ class TencentVideoBase(TestCase):
     def __init__(self, controllers):
         self.TAG = self.__class__.__name__
         TestCase.__init__(self, self.TAG, controllers)
+        # 保存controllers，多次运行统计时用来创建被测用例实例
+        self.controllers = controllers
         self.driver = UiDriver(self.device1)
         self.package_name = "com.tencent.videohm"
+        # 冷启动开关：True时启动前强制退出应用；False时为热启动，直接把后台的应用拉到前台
+        self.cold_start = True
+        # 结束时是否保留应用进程（退到后台），供下一次热启动使用
+        self.keep_app_alive = False
         # memdump相关操作开关，默认开启
         self.enable_memdump = False
         # profiler相关操作开关，默认开启
         self.enable_profiler = False
+        # profiler配置预设：light / standard / deep，见aw/ProfilerSession.py
+        self.profiler_preset = "standard"
+        # profiler兜底时长（秒），正常情况下在process()结束后主动停止
+        self.profiler_max_duration = 3600
+        # 等待trace文件写完的超时时间（秒）
+        self.profiler_flush_timeout = 120
+        self.profiler_session = None
         # pmap采样间隔时间（秒），默认1秒
         self.hidumper_interval = 1
-        # 存储pmap采样数据：[(timestamp, virtual_mem_kb, physical_mem_kb), ...]
+        # 存储pmap采样数据：[(timestamp, virtual_mem_kb, physical_mem_kb, 进程实例, 设备realtime), ...]
+        # 进程不存在时不记录样本，进程实例见aw/ProcessTracker.py，不同实例的样本在分析时分开处理；
+        # 设备realtime（微秒，未取到时为None）在时钟对齐后用于替换主机时间戳
         self.hidumper_data = []
+        # pmap采样的运行汇总，由采样线程每个样本整体替换，供指标端点读取（不需要扫描hidumper_data）：
+        # {"count", "virtual_kb", "physical_kb", "physical_min_kb", "physical_max_kb", "physical_sum_kb"}
+        self.pmap_aggregates = None
+        # 采样线程的PID缓存和进程生命周期跟踪（启动、退出、重启事件）
+        self.process_tracker = None
+        # 是否在监控开始和结束时做主机/设备时钟同步，把采样、事件和设备端数据统一到主机时间轴，每组探测次数
+        self.enable_clock_sync = True
+        self.clock_sync_probes = 8
+        self.clock_sync = None
         # 用于控制pmap采样线程的标志
         self.hidumper_running = False
         self.hidumper_thread = None
+        # 是否启用自适应采样：UI操作期间或内存变化较大时加快采样，内存平稳时放慢，过载时自动降频
+        self.enable_adaptive_sampling = False
+        # 自适应采样的最短/最长间隔（秒）
+        self.hidumper_min_interval = 0.25
+        self.hidumper_max_interval = 4
+        # 相邻两次采样物理内存变化超过该值（kB）时加快采样
+        self.hidumper_delta_threshold_kb = 1024
+        # 当前采样策略，以及监控停止后的采样统计（采样数、超时次数、实际采样率等）
+        self.sampling_policy = None
+        self.sampler_stats = {}
+        # 是否启用在线内存泄漏检测（基于pmap物理内存采样）
+        self.enable_leak_detector = False
+        # 检测到泄漏时是否提前结束用例（结束前采集hidumper快照并触发gc dump）
+        self.leak_abort = False
+        # 判定为泄漏的物理内存增长速率阈值（kB/分钟）
+        self.leak_slope_threshold_kb_per_min = 1024
+        self.leak_detector = None
+        # 泄漏判定结果，未检测到泄漏时为None
+        self.leak_verdict = None
+        # 由实时内存采样驱动的gc dump触发配置（阈值、新高、时间点、防抖、最大次数），见aw/GcDumpTrigger.py
+        # 在pmap监控启动时生效，时间点相对监控启动；场景文件中的gc_dump配置在场景开始时覆盖此配置
+        # 仅在enable_memdump开启时生效
+        self.gc_dump_triggers = None
+        self.gc_dump_trigger = None
+        # UI布局快照，批量解析控件坐标，减少逐个查找控件的UI查询次数
+        self.ui_snapshot = UiSnapshot(self.driver)
+        # 运行事件：[(timestamp_us, 事件类型, 详情), ...]，记录步骤和UI操作
+        self.run_events = []
+        # 固定频率操作的节拍统计：[ActionPacer.report(), ...]
+        self.pacer_reports = []
+        # 启动测量模式：轮询进程、首个窗口、跳过按钮等就绪标志，应用就绪后立即继续，替代固定等待2.8秒
+        self.enable_startup_measure = True
+        # 等待应用就绪的超时时间（秒），超时后回退到原有的查找跳过按钮流程
+        self.startup_timeout = 8
+        # 启动各阶段耗时（秒）：{time_to_process, time_to_first_ui, time_to_interactive}
+        self.startup_metrics = {}
+        # 是否采集帧时间数据（FPS、卡顿、帧耗时分位数），滑动类用例中开启
+        self.enable_frame_timing = False
+        # 读取帧时间戳的RenderService图层名
+        self.frame_timing_layer = "composer"
+        self.frame_collector = None
+        # 帧时间统计结果：{"overall": {...}, "windows": [...], "refresh_rate": ...}
+        self.frame_timing_summary = {}
+        # 是否采集应用进程及各线程的CPU占用，采样间隔（秒）
+        self.enable_cpu_sampler = False
+        self.cpu_interval = 1
+        self.cpu_sampler = None
+        # 按测试步骤统计的CPU占用最高线程：{步骤名: [(线程名, tid, 平均CPU%), ...]}
+        self.cpu_step_report = {}
+        # 是否定期采集完整pmap快照（增量存储，用于定位是哪些映射在增长），采样间隔（秒）
+        self.enable_pmap_snapshots = False
+        self.pmap_snapshot_interval = 10
+        self.pmap_snapshot_collector = None
+        # 是否在运行期间定期采集hidumper --mem（只保留解析后的各内存类型PSS），采样间隔（秒）
+        self.enable_hidumper_snapshots = False
+        self.hidumper_snapshot_interval = 30
+        self.hidumper_collector = None
+        # 与pmap监控同时启动/停止的附加监控，元素需实现start()/stop()
+        self.monitors = []
+        # 是否在teardown时把本次运行的采样、事件、产物和指标写入结果库（results/results.db）
+        self.enable_results_store = True
+        # 结果库文件路径
+        self.results_db_path = DEFAULT_DB_PATH
+        # 运行产物存储根目录：产物gzip压缩、按内容哈希去重，每次运行一个目录和产物索引，见aw/ArtifactStore.py
+        self.artifact_root = DEFAULT_ARTIFACT_ROOT
+        self.artifact_store = None
+        # 是否在保存结果后与上一版本的基线比较（anon:Kotlin峰值、hidumper总PSS、内存增长斜率）
+        self.enable_baseline_gate = True
+        # 基线门禁不通过时是否让用例失败（默认只打印结论并记录事件）
+        self.baseline_gate_enforce = False
+        # 基线门禁结论：{"passed": bool, "metrics": {...}}，未比较时为None
+        self.baseline_verdict = None
+        # 本次运行的ID、开始时间（微秒）和产物文件列表[(类型, 本地路径), ...]，入库的产物路径为压缩后的对象文件
+        self.run_id = None
+        self.run_started_at = None
+        self.run_artifacts = []
+        # teardown中hidumper --mem输出的总PSS（kB），未采集时为None
+        self.hidumper_total_pss = None
+        # 本地OpenMetrics指标端点端口（http://127.0.0.1:<端口>/metrics），0表示不开启
+        # 多个用例/设备使用同一端口时共用一个端点，按device标签区分
+        self.metrics_port = 0
+        self.metrics_host = "127.0.0.1"
 
     def setup(self):
         """公共setup方法，子类可以重写"""
-        Step('1.检查并关闭腾讯视频应用（如果已打开）')
-        # 检查应用是否在运行，如果运行则关闭
-        try:
-            # 尝试停止应用，如果应用未运行会抛出异常，忽略即可
-            self.driver.stop_app(self.package_name)
-            time.sleep(0.5)
-        except:
-            # 应用未运行，忽略异常
-            pass
+        # 运行目录原子创建，并行运行的用例不会分到同一个run_id
+        self.artifact_store = ArtifactStore(self.artifact_root)
+        self.run_id = self.artifact_store.create_run()
+        self.run_started_at = int(time.time() * 1000000)
+        self.run_artifacts = []
+        self.run_events = []
+        self.pacer_reports = []
+        self.hidumper_total_pss = None
+        self.startup_metrics = {}
+        self.frame_timing_summary = {}
+        self.cpu_step_report = {}
+        self.baseline_verdict = None
+        self.profiler_session = None
+        self.clock_sync = None
+        if self.metrics_port:
+            try:
+                get_exporter(self.metrics_port, self.metrics_host).register(self._metrics_device(),
+                                                                            self._metrics_snapshot)
+            except OSError as e:
+                print(f"[Metrics] 指标端点启动失败: {e}")
+        if self.cold_start:
+            self._step('1.检查并关闭腾讯视频应用（如果已打开）')
+            # 检查应用是否在运行，如果运行则关闭
+            try:
+                # 尝试停止应用，如果应用未运行会抛出异常，忽略即可
+                self.driver.stop_app(self.package_name)
+                time.sleep(0.5)
+            except:
+                # 应用未运行，忽略异常
+                pass
         
         # 只有当enable_memdump为True时才重置control.log
         if self.enable_memdump:
@@ -62,49 +212,114 @@ class TencentVideoBase(TestCase):
         
         # 如果开启profiler，在启动app前清理并启动profiler
         if self.enable_profiler:
-            Step('1.1.清理hiprofiler_data.htrace文件')
-            # 清理hiprofiler_data.htrace文件
-            command_clean = 'hdc shell "rm -f /data/local/tmp/hiprofiler_data.htrace"'
-            subprocess.run(command_clean, shell=True)
-            time.sleep(0.5)
+            self._step('1.1.清理hiprofiler_data.htrace文件')
+            self.profiler_session = ProfilerSession(self.package_name, self.profiler_preset,
+                                                    max_duration=self.profiler_max_duration)
             
-            Step('1.2.启动hiprofiler')
-            # 执行hiprofiler_cmd命令
-            hiprofiler_cmd = f'''hdc shell "hiprofiler_cmd \\
-  -c - \\
-  -o /data/local/tmp/hiprofiler_data.htrace \\
-  -t 60 \\
-  -s \\
-  -k \\
-<<CONFIG
- request_id: 1
- session_config {{
-  buffers {{
-   pages: 131072
-  }}
- }}
- plugin_configs {{
-  plugin_name: \\"nativehook\\"
-  sample_interval: 5000
-  config_data {{
-   save_file: false
-   smb_pages: 16384
-   max_stack_depth: 20
-   process_name: \\"{self.package_name}\\"
-   string_compressed: true
-   fp_unwind: true
-   blocked: true
-   callframe_compress: true
-   record_accurately: true
-   offline_symbolization: true
-   statistics_interval: 1
-   startup_mode: true
-  }}
- }}
-CONFIG"'''
-            # 在后台执行hiprofiler命令
-            subprocess.Popen(hiprofiler_cmd, shell=True)
-            time.sleep(1)
+            self._step('1.2.启动hiprofiler')
+            # 在后台执行hiprofiler命令，由teardown开始时主动停止
+            self.profiler_session.start()
+            self._record_event("profiler", f"start preset={self.profiler_preset}")
+
+    def _record_event(self, kind, detail=""):
+        """记录运行事件（微秒级时间戳）"""
+        self.run_events.append((int(time.time() * 1000000), kind, detail))
+        # UI操作发生时通知采样策略，自适应采样会立即进入高频采样
+        if kind in UI_ACTION_EVENTS and self.sampling_policy is not None:
+            self.sampling_policy.note_action()
+
+    def _record_artifact(self, kind, path, compress=True):
+        """记录本次运行产生的本地文件：默认压缩存入产物存储并删除原始文件，记录压缩后的对象路径
+        compress为False或文件不存在（如下载失败）时只记录原路径
+        """
+        if compress and self.artifact_store is not None and os.path.isfile(path):
+            try:
+                entry = self.artifact_store.put_file(self.run_id, kind, path)
+                path = self.artifact_store.entry_path(entry)
+                print(f"[Artifact] {entry['name']} 已入库: {entry['size']} -> {entry['stored_size']} 字节"
+                      f"{'（内容重复，已去重）' if entry['deduplicated'] else ''}")
+            except OSError as e:
+                print(f"[Artifact] 产物入库失败，保留原始文件 {path}: {e}")
+        self.run_artifacts.append((kind, str(path)))
+
+    def _step(self, name):
+        """标记测试步骤，同时记录到运行事件中"""
+        Step(name)
+        self._record_event("step", name)
+
+    def _on_memory_sample(self, timestamp, physical_mem):
+        """采样线程每得到一个有效内存样本时调用，驱动gc dump触发器和在线泄漏检测"""
+        trigger = self.gc_dump_trigger
+        if trigger is not None:
+            trigger.on_sample(timestamp, physical_mem)
+        if self.leak_detector is None or self.leak_verdict is not None:
+            return
+        verdict = self.leak_detector.add(timestamp, physical_mem)
+        if verdict is not None:
+            self.leak_verdict = verdict
+            self._record_event("leak_detected", f"{verdict['slope_kb_per_min']:.1f}kB/min")
+            print(f"[Leak Detector] 检测到内存泄漏: 增长速率 {verdict['slope_kb_per_min']:.1f} kB/分钟, "
+                  f"t值 {verdict['t_value']:.1f}, 置信度 {verdict['confidence']:.4f}, "
+                  f"窗口 {verdict['window_seconds']:.0f}秒/{verdict['samples']}个样本")
+
+    def _capture_leak_diagnostics(self):
+        """泄漏判定后采集诊断信息：hidumper内存快照，并触发gc dump"""
+        self._step('泄漏诊断.采集hidumper内存快照')
+        command_hidumper = f'hdc shell "hidumper --mem \\$(pidof {self.package_name})"'
+        result = subprocess.run(command_hidumper, shell=True, capture_output=True, text=True)
+        local_path = self._get_profiler_file_path("leak_hidumper.txt")
+        with open(local_path, 'w', encoding='utf-8') as f:
+            f.write(result.stdout)
+        self._record_artifact("leak_hidumper", local_path)
+        print(f"[Leak Detector] hidumper快照已保存: {local_path}")
+        self._trigger_gc_dump('泄漏诊断.触发gc dump')
+
+    def _check_abort(self):
+        """在操作之间调用：开启leak_abort且已判定泄漏时，采集诊断信息后提前结束用例"""
+        if not self.leak_abort or self.leak_verdict is None:
+            return
+        self._capture_leak_diagnostics()
+        raise LeakDetectedError(f"检测到内存泄漏，增长速率 {self.leak_verdict['slope_kb_per_min']:.1f} kB/分钟，提前结束用例")
+
+    def _send_gc_dump_signal(self, detail=""):
+        """写入control.log通知应用执行gc dump"""
+        # 执行hdc shell命令写入control.log
+        command = f'hdc shell \'echo "1" > /data/app/el2/100/base/{self.package_name}/files/control.log\''
+        subprocess.run(command, shell=True)
+        self._record_event("gc_dump", detail)
+
+    def _trigger_gc_dump(self, step_name=None):
+        """在用例流程中触发应用gc dump，仅在enable_memdump开启时生效"""
+        if not self.enable_memdump:
+            return
+        if step_name:
+            self._step(step_name)
+        self._send_gc_dump_signal()
+        time.sleep(1)
+
+    def _on_gc_dump_triggered(self, reason, physical_kb):
+        """gc dump触发器回调（在采样线程中），在独立线程中发送dump信号，不影响采样节奏"""
+        print(f"[GC Trigger] 触发gc dump: {reason}, 物理内存 {physical_kb} kB")
+        threading.Thread(target=self._send_gc_dump_signal, args=(reason,), daemon=True).start()
+
+    def _configure_gc_dump_trigger(self, config):
+        """按配置创建并启动gc dump触发器，时间点从调用时刻开始计算，仅在enable_memdump开启时生效"""
+        if not self.enable_memdump or not config:
+            return None
+        trigger = GcDumpTrigger.from_config(self._on_gc_dump_triggered, config)
+        trigger.start()
+        self.gc_dump_trigger = trigger
+        return trigger
+
+    def _run_scenario(self, spec_path=None, **variables):
+        """按场景描述文件执行用例操作，默认使用与用例同名的<用例名>.scenario.json
+        关键字参数会覆盖场景文件中的同名variables
+        """
+        if spec_path is None:
+            spec_path = Path(__file__).parent / f"{self.__class__.__name__}.scenario.json"
+        engine = ScenarioEngine.load(self, spec_path, variables)
+        engine.run()
+        return engine
 
     def _parse_pmap_kotlin_memory(self, output_line):
         """从shell命令输出中解析anon:Kotlin的内存信息，返回(虚拟内存总和, 物理内存总和)，单位kB
@@ -121,86 +336,248 @@ CONFIG"'''
             print(f"解析pmap输出失败: {e}, 输出: {output_line}")
             return None
     
+    def _on_process_event(self, kind, detail):
+        """采样线程发现进程启动、退出或重启时调用：记录事件，重启后重新开始泄漏检测"""
+        self._record_event(kind, detail)
+        print(f"[Pmap Monitor] 进程事件: {kind} {detail}")
+        if kind == "process_restart" and self.leak_detector is not None and self.leak_verdict is None:
+            # 新进程的内存从头开始增长，继续沿用旧实例的样本会把重启误判为泄漏或掩盖泄漏
+            self.leak_detector.reset()
+
+    def _parse_device_time(self, output_line):
+        """pmap输出第三列为设备realtime（纳秒），返回微秒，没有或无效时返回None"""
+        parts = output_line.split()
+        if len(parts) >= 3 and parts[2].isdigit():
+            return int(parts[2]) // 1000
+        return None
+
     def _hidumper_monitor_thread(self):
         """后台线程：定期执行pmap命令并解析anon:Kotlin内存信息"""
+        last_physical = None
+        tracker = self.process_tracker
         while self.hidumper_running:
             # 记录本次循环开始时间
-            loop_start_time = time.time()
+            loop_start_time = time.monotonic()
+            # 本次与上次采样的物理内存变化量，供采样策略调整间隔
+            last_delta_kb = 0
             
             try:
                 # 在执行pmap命令之前记录时间戳，确保反映实际内存状态的时间点
                 # 使用微秒级时间戳（整数格式）
                 timestamp = int(time.time() * 1000000)
                 
-                # 在设备端完成所有处理，返回两个数字（虚拟内存总和 物理内存总和）
+                # 在设备端完成所有处理，返回两行：进程的/proc/<pid>/stat、'虚拟内存总和 物理内存总和 设备realtime纳秒'
                 # 使用shell脚本在设备端完成提取和求和，避免Python端处理大量数据
                 # 使用临时文件避免子shell变量丢失问题
-                command_pmap = f"""hdc shell 'pid=$(pidof {self.package_name}); if [ -n "$pid" ]; then tmp=$(mktemp 2>/dev/null || echo /data/local/tmp/pmap_tmp_$$); pmap -x $pid 2>/dev/null | grep "anon:Kotlin" | sed "s/^[^ ]* *\\([0-9]*\\) *\\([0-9]*\\).*/\\1 \\2/" > $tmp; virtual=0; physical=0; while read kbytes rss rest; do [ -n "$kbytes" ] && [ -n "$rss" ] && virtual=$((virtual + kbytes)) && physical=$((physical + rss)); done < $tmp; rm -f $tmp 2>/dev/null; echo "$virtual $physical"; else echo "0 0"; fi'"""
+                # PID缓存有效时不执行pidof；进程不存在时没有输出
+                command_pmap = f"""hdc shell '{tracker.pid_script()}; if [ -n "$pid" ] && cat /proc/$pid/stat 2>/dev/null; then now=$(date +%s%N); tmp=$(mktemp 2>/dev/null || echo /data/local/tmp/pmap_tmp_$$); pmap -x $pid 2>/dev/null | grep "anon:Kotlin" | sed "s/^[^ ]* *\\([0-9]*\\) *\\([0-9]*\\).*/\\1 \\2/" > $tmp; virtual=0; physical=0; while read kbytes rss rest; do [ -n "$kbytes" ] && [ -n "$rss" ] && virtual=$((virtual + kbytes)) && physical=$((physical + rss)); done < $tmp; rm -f $tmp 2>/dev/null; echo "$virtual $physical $now"; fi'"""
                 
                 # 对于0.5秒间隔，设置超时为1秒（2倍间隔），如果超过说明有问题
                 cmd_timeout = max(1.0, self.hidumper_interval * 2)
                 result = subprocess.run(command_pmap, shell=True, capture_output=True, text=True, timeout=cmd_timeout)
                 
                 if result.returncode == 0:
-                    # 解析输出，应该只有一行：'virtual_sum physical_sum'
-                    output_line = result.stdout.strip()
-                    if output_line:
+                    # 第一行为进程stat，第二行为'virtual_sum physical_sum'
+                    lines = result.stdout.strip().splitlines()
+                    usable, event = tracker.observe(timestamp, lines[0] if lines else None)
+                    if event is not None:
+                        self._on_process_event(*event)
+                        if event[0] != "process_start":
+                            last_physical = None
+                    if usable and len(lines) >= 2:
+                        output_line = lines[1]
                         kotlin_mem = self._parse_pmap_kotlin_memory(output_line)
                         if kotlin_mem is not None:
                             virtual_mem, physical_mem = kotlin_mem
-                            # 保存时间戳、虚拟内存和物理内存
-                            self.hidumper_data.append((timestamp, virtual_mem, physical_mem))
+                            # 保存时间戳、虚拟内存、物理内存、进程实例和设备端读取pmap时的realtime
+                            self.hidumper_data.append((timestamp, virtual_mem, physical_mem, tracker.instance,
+                                                       self._parse_device_time(output_line)))
+                            self._update_pmap_aggregates(virtual_mem, physical_mem)
+                            if last_physical is not None:
+                                last_delta_kb = physical_mem - last_physical
+                            last_physical = physical_mem
+                            self._on_memory_sample(timestamp, physical_mem)
                             # 每10次采样打印一次，避免输出过多
                             if len(self.hidumper_data) % 10 == 1:
-                                print(f"[Pmap Monitor] 已采集 {len(self.hidumper_data)} 个数据点，最新: 时间={timestamp}, 虚拟内存={virtual_mem} kB, 物理内存={physical_mem} kB")
+                                print(f"[Pmap Monitor] 已采集 {len(self.hidumper_data)} 个数据点，最新: 时间={timestamp}, 虚拟内存={virtual_mem} kB, 物理内存={physical_mem} kB, 进程={tracker.pid}")
                         else:
                             print(f"[Pmap Monitor] 未能解析输出: {output_line}")
-                    else:
-                        # 没有输出，记录为0（可能是进程还未启动）
-                        self.hidumper_data.append((timestamp, 0, 0))
-                        if len(self.hidumper_data) <= 5:  # 前5次如果没有数据，打印提示
-                            print(f"[Pmap Monitor] 警告: 未找到anon:Kotlin内存信息 (可能是应用还未启动), 时间={timestamp}")
-                else:
-                    # 命令执行失败，记录为0
-                    self.hidumper_data.append((timestamp, 0, 0))
-                    if result.stderr:
-                        print(f"[Pmap Monitor] pmap命令执行失败: {result.stderr}, 时间={timestamp}")
+                    elif tracker.instance == 0 and self.sampling_policy.samples <= 5:
+                        # 进程还未启动，不记录样本（避免与内存为0混淆），前5次打印提示
+                        print(f"[Pmap Monitor] 警告: 未找到应用进程 (可能是应用还未启动), 时间={timestamp}")
+                elif result.stderr:
+                    print(f"[Pmap Monitor] pmap命令执行失败: {result.stderr}, 时间={timestamp}")
             except subprocess.TimeoutExpired:
                 print(f"[Pmap Monitor] pmap命令超时")
             except Exception as e:
                 print(f"[Pmap Monitor] 执行pmap命令时出错: {e}")
             
             # 计算本次循环实际耗时
-            loop_elapsed = time.time() - loop_start_time
-            # 计算需要等待的时间，确保采样间隔尽量接近设定值
-            sleep_time = self.hidumper_interval - loop_elapsed
-            # 如果实际耗时已经超过设定间隔，则立即进行下一次采样（不等待）
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            else:
-                # 如果处理时间已经超过设定间隔，打印警告信息
-                if loop_elapsed > self.hidumper_interval * 1.1:  # 超过10%才警告
-                    print(f"[Pmap Monitor] 警告: 处理耗时 {loop_elapsed:.3f}s 超过设定间隔 {self.hidumper_interval}s")
+            loop_elapsed = time.monotonic() - loop_start_time
+            planned_interval = self.sampling_policy.interval
+            # 由采样策略决定下次采样间隔（固定策略始终返回hidumper_interval）
+            next_interval = self.sampling_policy.next_interval(loop_elapsed, last_delta_kb)
+            # 如果处理时间已经超过设定间隔，打印警告信息
+            if loop_elapsed > planned_interval * 1.1:  # 超过10%才警告
+                print(f"[Pmap Monitor] 警告: 处理耗时 {loop_elapsed:.3f}s 超过设定间隔 {planned_interval:.3f}s，下次间隔 {next_interval:.3f}s")
+            # 等待剩余时间，确保采样间隔尽量接近计划值；已超时则立即进行下一次采样
+            self.sampling_policy.wait(next_interval - loop_elapsed)
     
+    def _update_pmap_aggregates(self, virtual_mem, physical_mem):
+        """采样线程中更新pmap运行汇总，新建dict后整体替换，读取端不加锁也能拿到一致的数值"""
+        previous = self.pmap_aggregates
+        if previous is None:
+            self.pmap_aggregates = {"count": 1, "virtual_kb": virtual_mem, "physical_kb": physical_mem,
+                                    "physical_min_kb": physical_mem, "physical_max_kb": physical_mem,
+                                    "physical_sum_kb": physical_mem}
+            return
+        self.pmap_aggregates = {"count": previous["count"] + 1, "virtual_kb": virtual_mem, "physical_kb": physical_mem,
+                                "physical_min_kb": min(previous["physical_min_kb"], physical_mem),
+                                "physical_max_kb": max(previous["physical_max_kb"], physical_mem),
+                                "physical_sum_kb": previous["physical_sum_kb"] + physical_mem}
+
     def _start_hidumper_monitor(self):
         """启动pmap监控线程"""
         if self.hidumper_interval > 0:
             self.hidumper_running = True
             self.hidumper_data = []
+            self.pmap_aggregates = None
+            self.process_tracker = ProcessTracker(self.package_name)
+            self.sampler_stats = {}
+            self.leak_verdict = None
+            if not self.enable_leak_detector:
+                self.leak_detector = None
+            elif self.leak_detector is None:
+                self.leak_detector = OnlineLeakDetector(slope_threshold_kb_per_min=self.leak_slope_threshold_kb_per_min)
+            else:
+                self.leak_detector.reset()
+            if self.enable_adaptive_sampling:
+                self.sampling_policy = AdaptiveSamplingPolicy(self.hidumper_interval,
+                                                              self.hidumper_min_interval,
+                                                              self.hidumper_max_interval,
+                                                              self.hidumper_delta_threshold_kb)
+            else:
+                self.sampling_policy = FixedSamplingPolicy(self.hidumper_interval)
+            self.gc_dump_trigger = None
+            self._configure_gc_dump_trigger(self.gc_dump_triggers)
             self.hidumper_thread = threading.Thread(target=self._hidumper_monitor_thread, daemon=True)
             self.hidumper_thread.start()
-            print(f"[Pmap Monitor] 已启动，采样间隔: {self.hidumper_interval}秒")
+            print(f"[Pmap Monitor] 已启动，采样间隔: {self.hidumper_interval}秒，自适应采样: {self.enable_adaptive_sampling}")
     
     def _stop_hidumper_monitor(self):
         """停止pmap监控线程"""
         if hasattr(self, 'hidumper_running') and self.hidumper_running:
             self.hidumper_running = False
+            # 唤醒采样线程，避免在长间隔等待中阻塞停止
+            self.sampling_policy.stop()
             if self.hidumper_thread and self.hidumper_thread.is_alive():
                 self.hidumper_thread.join(timeout=5)
-            print(f"[Pmap Monitor] 已停止，共采集 {len(self.hidumper_data)} 个数据点")
+            self.sampler_stats = self.sampling_policy.stats()
+            if self.gc_dump_trigger is not None:
+                print(self.gc_dump_trigger.format_report())
+            print(f"[Pmap Monitor] 已停止，共采集 {len(self.hidumper_data)} 个数据点，"
+                  f"实际采样率 {self.sampler_stats['effective_rate']:.2f}次/秒，超时 {self.sampler_stats['overruns']}次，"
+                  f"进程实例 {self.process_tracker.instance} 个，重启 {self.process_tracker.restarts} 次")
         elif hasattr(self, 'hidumper_data'):
             print(f"[Pmap Monitor] 监控未启动或已停止，共采集 {len(self.hidumper_data)} 个数据点")
 
+    def _create_monitors(self):
+        """根据开关创建附加监控，子类可以重写以追加自定义监控"""
+        monitors = []
+        self.frame_collector = None
+        if self.enable_frame_timing:
+            self.frame_collector = FrameTimingCollector(self.frame_timing_layer)
+            monitors.append(self.frame_collector)
+        self.cpu_sampler = None
+        if self.enable_cpu_sampler:
+            self.cpu_sampler = CpuSampler(self.package_name, self.cpu_interval)
+            monitors.append(self.cpu_sampler)
+        self.hidumper_collector = None
+        if self.enable_hidumper_snapshots:
+            self.hidumper_collector = HidumperMemCollector(self.package_name, self.hidumper_snapshot_interval)
+            monitors.append(self.hidumper_collector)
+        self.pmap_snapshot_collector = None
+        if self.enable_pmap_snapshots:
+            self.pmap_snapshot_collector = PmapSnapshotCollector(self.package_name, self._get_pmap_snapshot_dir(),
+                                                                 self.pmap_snapshot_interval)
+            monitors.append(self.pmap_snapshot_collector)
+        return monitors
+
+    def _measure_clock(self, label):
+        """执行一组时钟同步探测并记录事件"""
+        burst = self.clock_sync.measure(label)
+        if burst is not None:
+            self._record_event("clock_sync", f"{label} offset={burst['offset_us'] / 1000:+.3f}ms "
+                                             f"rtt={burst['rtt_us'] / 1000:.1f}ms")
+
+    def _align_timeline(self):
+        """监控停止后，用时钟同步结果把设备端时间换算到主机时间轴，替换发起命令时的主机时间戳
+        换算pmap采样、CPU采样、hidumper快照、完整pmap快照索引和帧时间戳（帧统计时换算）；
+        运行事件本身就是主机时间，不需要换算；同步结果保存为产物，供离线对齐htrace等设备端数据
+        """
+        clock = self.clock_sync
+        if clock is None or not clock.bursts:
+            return
+        aligned = 0
+        data = []
+        for data_point in self.hidumper_data:
+            if len(data_point) >= 5 and data_point[4]:
+                data_point = (int(clock.device_to_host_us(data_point[4])),) + tuple(data_point[1:])
+                aligned += 1
+            data.append(data_point)
+        self.hidumper_data = data
+        if self.cpu_sampler is not None:
+            cpu = self.cpu_sampler.buffer
+            for tick, uptime in enumerate(cpu.tick_uptimes):
+                if uptime > 0:
+                    cpu.tick_timestamps[tick] = int(clock.boottime_to_host_us(uptime * 1000000))
+                    aligned += 1
+        if self.hidumper_collector is not None:
+            series = self.hidumper_collector.series
+            for index, device_time in enumerate(series.device_times):
+                if device_time:
+                    series.timestamps[index] = int(clock.device_to_host_us(device_time))
+                    aligned += 1
+        if self.pmap_snapshot_collector is not None:
+            aligned += self.pmap_snapshot_collector.align_timestamps(clock.device_to_host_us)
+        if self.frame_collector is not None:
+            self.frame_collector.clock = clock
+        print(clock.format_report())
+        print(f"[Clock Sync] 已将 {aligned} 个采样点换算到主机时间轴")
+        try:
+            path = self.artifact_store.staging_path(self.run_id, "clock_sync.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(clock.summary(), f, ensure_ascii=False, indent=1)
+            self._record_artifact("clock_sync", path)
+        except Exception as e:
+            print(f"[Clock Sync] 保存时钟同步结果失败: {e}")
+
+    def _start_monitors(self):
+        """启动附加监控"""
+        self.monitors = self._create_monitors()
+        for monitor in self.monitors:
+            monitor.start()
+
+    def _stop_monitors(self):
+        """停止附加监控并汇总结果"""
+        for monitor in self.monitors:
+            try:
+                monitor.stop()
+            except Exception as e:
+                print(f"[Monitor] 停止监控{monitor.__class__.__name__}失败: {e}")
+        self.monitors = []
+        self._align_timeline()
+        if self.frame_collector is not None:
+            self.frame_timing_summary = self.frame_collector.summarize(self.run_events)
+        if self.cpu_sampler is not None:
+            self.cpu_step_report = self.cpu_sampler.report_by_step(self.run_events)
+        if self.pmap_snapshot_collector is not None:
+            self.pmap_snapshot_collector.report_growth()
+            # 快照文件已是增量编码，且读取时需要随机访问，不再压缩；PmapSnapshotReader需要同一目录下的全部三个文件
+            for name in (SNAPSHOT_DATA_FILE, SNAPSHOT_INDEX_FILE, MAPPING_TABLE_FILE):
+                self._record_artifact("pmap_snapshots", os.path.join(self.pmap_snapshot_collector.directory, name),
+                                      compress=False)
+
     def _force_stop_app(self):
         """强制退出应用，避免后台进程残留"""
         try:
@@ -222,19 +599,50 @@ CONFIG"'''
         """公共方法：强制退出app、启动pmap监控、启动应用、跳过广告
         这个方法包含了所有用例都需要的公共启动流程
         """
-        # 在启动监控前，强制退出app，避免后台进程残留
-        Step('2.强制退出腾讯视频应用（避免后台进程残留）')
-        self._force_stop_app()
+        if self.cold_start:
+            # 在启动监控前，强制退出app，避免后台进程残留
+            self._step('2.强制退出腾讯视频应用（避免后台进程残留）')
+            self._force_stop_app()
+        
+        if self.enable_clock_sync:
+            self._step('2.0.主机/设备时钟同步（开始）')
+            self.clock_sync = ClockSync(probes=self.clock_sync_probes)
+            self._measure_clock("start")
         
         # 启动pmap监控，确保在应用启动时就开始采集
-        Step('2.1.启动pmap内存监控')
+        self._step('2.1.启动pmap内存监控')
         self._start_hidumper_monitor()
+        self._start_monitors()
         
-        Step('2.2.启动腾讯视频应用')
+        self._step('2.2.启动腾讯视频应用')
+        probe = None
+        if self.enable_startup_measure:
+            probe = StartupProbe(self.driver, self.package_name, self.ui_snapshot)
+            probe.start()
         self.driver.start_app(package_name=self.package_name)
-        time.sleep(2.8)  # 等待应用启动和广告页加载
+        if probe is not None:
+            # 轮询就绪标志，应用可交互后立即继续
+            ready = probe.wait_ready(timeout=self.startup_timeout)
+            self.startup_metrics = dict(probe.metrics)
+            for key, value in self.startup_metrics.items():
+                self._record_event("startup", f"{key}={value * 1000:.0f}ms")
+            print(probe.format_metrics())
+            # 启动过程中界面一直在变化，后续操作需要重新抓取布局快照
+            self.ui_snapshot.invalidate()
+            if ready:
+                if probe.skip_position is not None:
+                    self._step('3.点击广告页右上角的跳过按钮')
+                    self.driver.touch(probe.skip_position)
+                    time.sleep(0.5)
+                return
+        if not self.cold_start:
+            # 热启动直接回到前台，没有广告页
+            time.sleep(1)
+            return
+        if probe is None:
+            time.sleep(2.8)  # 等待应用启动和广告页加载
         
-        Step('3.点击广告页右上角的跳过按钮')
+        self._step('3.点击广告页右上角的跳过按钮')
         # 通过Text类型查找"跳过"按钮
         skip_found = False
         try:
@@ -257,69 +665,89 @@ CONFIG"'''
         
         time.sleep(0.5)
 
+    def _click_button(self, button_name):
+        """点击指定的button，使用BY.text().type("Button")的方式"""
+        try:
+            # 使用BY.text().type("Button")的方式点击button
+            self.driver.touch(BY.text(button_name).type("Button"))
+            return True
+        except:
+            try:
+                # 如果失败，尝试只使用text查找
+                button_element = self.driver.find_element(By.text(button_name))
+                button_element.click()
+                return True
+            except:
+                try:
+                    # 如果By不存在，尝试直接通过文本查找
+                    button_element = self.driver.find_element_by_text(button_name)
+                    button_element.click()
+                    return True
+                except:
+                    try:
+                        # 如果都失败，使用CONTAINS模糊匹配，不限制类型
+                        self.driver.touch(BY.text(button_name, MatchType.CONTAINS))
+                        return True
+                    except:
+                        return False
+
+    def _click_button_list(self, button_list, click_interval, miss_interval):
+        """按顺序点击一组button，每次点击记录一个click_buttons事件
+        通过一次布局快照批量解析所有button坐标后直接点击坐标，
+        快照中找不到的button回退到_click_button逐个查找，并重新抓取快照解析剩余button；
+        一轮点击结束后快照失效，下一轮重新抓取，不沿用点击后可能已变化的坐标
+        """
+        positions = self.ui_snapshot.resolve(button_list, node_type="Button")
+        for index, button_name in enumerate(button_list):
+            position = positions.get(button_name)
+            if position is not None:
+                self.driver.touch(position)
+                self._record_event("click_buttons", button_name)
+                time.sleep(click_interval)
+                continue
+            if self._click_button(button_name):
+                self._record_event("click_buttons", button_name)
+                time.sleep(click_interval)
+            else:
+                # 如果找不到button，等待一下继续
+                time.sleep(miss_interval)
+            # 快照中没有该button，说明界面已变化（如tab栏滚动），重新解析剩余button
+            self.ui_snapshot.invalidate()
+            if index + 1 < len(button_list):
+                positions = self.ui_snapshot.resolve(button_list[index + 1:], node_type="Button")
+        self.ui_snapshot.invalidate()
+
     def _get_dump_file_path(self):
-        """获取dump文件保存路径，如果文件已存在则添加数字后缀"""
-        # 获取当前工程目录（testcases的父目录）
-        current_dir = Path(__file__).parent.parent
-        dump_dir = current_dir / "dump_output"
-        dump_dir.mkdir(exist_ok=True)
-        
-        # 根据用例名称生成文件名
-        case_name = self.__class__.__name__
-        base_filename = f"{case_name}_memdump.log"
-        file_path = dump_dir / base_filename
-        
-        # 如果文件已存在，添加数字后缀
-        counter = 1
-        while file_path.exists():
-            name_part = f"{case_name}_memdump_{counter}.log"
-            file_path = dump_dir / name_part
-            counter += 1
-        
-        return str(file_path)
+        """获取memdump文件的下载路径（本次运行目录下，run_id唯一，不需要探测已有文件）"""
+        return self.artifact_store.staging_path(self.run_id, f"{self.__class__.__name__}_memdump.log")
+    
+    def _get_pmap_snapshot_dir(self):
+        """获取完整pmap快照的保存目录（本次运行目录下）"""
+        return os.path.join(self.artifact_store.run_dir(self.run_id), "pmap_snapshots")
     
     def _get_profiler_file_path(self, suffix="htrace"):
-        """获取profiler文件保存路径，如果文件已存在则添加数字后缀"""
-        # 获取当前工程目录（testcases的父目录）
-        current_dir = Path(__file__).parent.parent
-        profiler_dir = current_dir / "hiperf_output"
-        profiler_dir.mkdir(exist_ok=True)
-        
-        # 根据用例名称生成文件名
-        case_name = self.__class__.__name__
-        base_filename = f"{case_name}_profiler.{suffix}"
-        file_path = profiler_dir / base_filename
-        
-        # 如果文件已存在，添加数字后缀
-        counter = 1
-        while file_path.exists():
-            name_part = f"{case_name}_profiler_{counter}.{suffix}"
-            file_path = profiler_dir / name_part
-            counter += 1
-        
-        return str(file_path)
+        """获取profiler相关文件的下载路径（本次运行目录下，run_id唯一，不需要探测已有文件）"""
+        return self.artifact_store.staging_path(self.run_id, f"{self.__class__.__name__}_profiler.{suffix}")
     
-    def _wait_for_file(self, remote_path, timeout=60):
-        """等待远程文件生成"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            # 检查文件是否存在
-            check_cmd = f'hdc shell "test -f {remote_path} && echo exists || echo not_exists"'
-            result = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
-            if "exists" in result.stdout:
-                return True
-            time.sleep(1)
-        return False
-
     def teardown(self):
         """公共teardown方法，子类可以重写或扩展"""
+        # process()已结束，先停止profiler，trace落盘与后续步骤并行进行
+        if self.profiler_session is not None and self.profiler_session.running:
+            self._step('7.0.停止hiprofiler采集')
+            self.profiler_session.stop()
+            self._record_event("profiler", "stop")
+        
         # 停止pmap监控
-        Step('7.1.停止pmap内存监控')
+        self._step('7.1.停止pmap内存监控')
         self._stop_hidumper_monitor()
+        if self.clock_sync is not None:
+            self._step('7.2.主机/设备时钟同步（结束）')
+            self._measure_clock("end")
+        self._stop_monitors()
         
         # 只有当enable_memdump为True时才执行memdump相关操作
         if self.enable_memdump:
-            Step('8.下载memdump.log文件到本地')
+            self._step('8.下载memdump.log文件到本地')
             # 获取保存路径
             local_file_path = self._get_dump_file_path()
             # 将memdump.log文件下载到本地
@@ -327,52 +755,64 @@ CONFIG"'''
             subprocess.run(command2, shell=True)
             time.sleep(1)
 
-            Step('9.重置control.log')
+            self._step('9.重置control.log')
             command3 = f'hdc shell \'echo "0" > /data/app/el2/100/base/{self.package_name}/files/control.log\''
             subprocess.run(command3, shell=True)
             time.sleep(0.5)
             
             # 将pmap采样数据追加到memdump文件末尾
             if self.hidumper_data:
-                Step('9.1.将pmap采样数据追加到memdump文件')
+                self._step('9.1.将pmap采样数据追加到memdump文件')
                 try:
                     with open(local_file_path, 'a', encoding='utf-8') as f:
                         f.write('\n')
                         f.write('=' * 80 + '\n')
                         f.write('Pmap采样数据 (anon:Kotlin内存信息，单位: kB)\n')
                         f.write('=' * 80 + '\n')
-                        f.write('时间戳,虚拟内存(kB),物理内存(kB)\n')
+                        f.write('时间戳,虚拟内存(kB),物理内存(kB),进程实例\n')
                         for data_point in self.hidumper_data:
-                            if len(data_point) == 3:
+                            if len(data_point) >= 4:
+                                timestamp, virtual_mem, physical_mem, instance = data_point[:4]
+                                f.write(f'{timestamp},{virtual_mem},{physical_mem},{instance}\n')
+                            elif len(data_point) == 3:
                                 timestamp, virtual_mem, physical_mem = data_point
-                                f.write(f'{timestamp},{virtual_mem},{physical_mem}\n')
+                                f.write(f'{timestamp},{virtual_mem},{physical_mem},\n')
                             elif len(data_point) == 2:
                                 # 兼容旧格式（只有时间戳和大小）
                                 timestamp, size = data_point
-                                f.write(f'{timestamp},{size},0\n')
+                                f.write(f'{timestamp},{size},0,\n')
                         f.write('=' * 80 + '\n')
+                        if self.sampler_stats:
+                            f.write(f"采样统计: 采样数={self.sampler_stats['samples']}, "
+                                    f"超时次数={self.sampler_stats['overruns']}, "
+                                    f"实际采样率={self.sampler_stats['effective_rate']:.3f}次/秒, "
+                                    f"间隔范围={self.sampler_stats['min_interval']:.3f}~{self.sampler_stats['max_interval']:.3f}秒\n")
+                        if self.leak_verdict is not None:
+                            f.write(f"泄漏检测: 增长速率={self.leak_verdict['slope_kb_per_min']:.1f}kB/分钟, "
+                                    f"t值={self.leak_verdict['t_value']:.1f}, 置信度={self.leak_verdict['confidence']:.4f}\n")
                     print(f"[Pmap Monitor] 已将 {len(self.hidumper_data)} 个数据点追加到 {local_file_path}")
                 except Exception as e:
                     print(f"[Pmap Monitor] 追加数据到memdump文件失败: {e}")
+            # 追加完pmap采样数据后再压缩入库
+            self._record_artifact("memdump", local_file_path)
         
         # 如果开启profiler，在关闭app前检查并导出htrace文件
         if self.enable_profiler:
-            Step('10.等待hiprofiler_data.htrace文件生成')
-            # 等待文件生成
-            if self._wait_for_file("/data/local/tmp/hiprofiler_data.htrace"):
-                Step('11.执行hidumper命令获取内存信息')
+            self._step('10.等待hiprofiler_data.htrace文件写完')
+            # 设备端采集进程退出且文件大小不再变化后继续，等待时间随trace大小变化
+            if self.profiler_session is not None and self.profiler_session.wait_complete(self.profiler_flush_timeout):
+                self._step('11.执行hidumper命令获取内存信息')
                 # 执行hidumper命令，需要转义$符号
                 command_hidumper = f'hdc shell "hidumper --mem \\$(pidof {self.package_name})"'
                 result = subprocess.run(command_hidumper, shell=True, capture_output=True, text=True)
-                Step('12.htrace文件生成后等待10秒')
-                time.sleep(10)
-                
-                Step('13.导出hiprofiler_data.htrace文件到本地')
+                _, self.hidumper_total_pss = parse_hidumper_lines(result.stdout.splitlines())
+                self._step('13.导出hiprofiler_data.htrace文件到本地')
                 # 获取保存路径
                 local_profiler_path = self._get_profiler_file_path("htrace")
                 # 导出htrace文件
-                command_profiler = f'hdc file recv /data/local/tmp/hiprofiler_data.htrace {local_profiler_path}'
+                command_profiler = f'hdc file recv {REMOTE_HTRACE_PATH} {local_profiler_path}'
                 subprocess.run(command_profiler, shell=True)
+                self._record_artifact("htrace", local_profiler_path)
                 time.sleep(1)
                 
                 # 保存hidumper输出到文件
@@ -382,17 +822,214 @@ CONFIG"'''
                     if result.stderr:
                         f.write("\n--- stderr ---\n")
                         f.write(result.stderr)
+                self._record_artifact("hidumper", local_hidumper_path)
                 time.sleep(0.5)
             else:
-                Step('11.hiprofiler_data.htrace文件未生成，跳过导出')
+                self._step('11.hiprofiler_data.htrace文件未完成，跳过导出')
         
-        Step('14.关闭腾讯视频应用')
-        self.driver.stop_app(self.package_name)
-        time.sleep(0.5)
+        if self.enable_results_store:
+            self._step('13.1.保存运行结果到结果库')
+            self._save_results()
         
-        Step('15.强制终止腾讯视频应用进程')
-        # 使用kill命令强制终止应用进程，确保应用完全退出
-        command4 = f'hdc shell \'kill -9 `pidof {self.package_name}`\''
-        subprocess.run(command4, shell=True)
-        time.sleep(0.5)
+        if self.keep_app_alive:
+            self._step('14.应用退到后台（保留进程供热启动）')
+            self.driver.go_home()
+            time.sleep(0.5)
+        else:
+            self._step('14.关闭腾讯视频应用')
+            self.driver.stop_app(self.package_name)
+            time.sleep(0.5)
+            
+            self._step('15.强制终止腾讯视频应用进程')
+            # 使用kill命令强制终止应用进程，确保应用完全退出
+            command4 = f'hdc shell \'kill -9 `pidof {self.package_name}`\''
+            subprocess.run(command4, shell=True)
+            time.sleep(0.5)
+        
+        if self.baseline_gate_enforce and self.baseline_verdict is not None and not self.baseline_verdict["passed"]:
+            failed = [name for name, r in self.baseline_verdict["metrics"].items() if not r["passed"]]
+            raise AssertionError(f"基线门禁不通过: {', '.join(failed)}")
+
+    def _metrics_device(self):
+        return getattr(self.device1, "device_sn", "") or "default"
+
+    def _metrics_snapshot(self):
+        """指标端点被抓取时调用：不加锁读取采样线程维护的运行汇总和各采样列表的末尾元素，汇总为指标列表"""
+        labels = {"device": self._metrics_device(), "testcase": self.__class__.__name__, "run_id": self.run_id or ""}
+        families = []
+
+        def add(name, kind, help_text, value, **extra):
+            families.append((name, kind, help_text, [(dict(labels, **extra), value)]))
+
+        aggregates = self.pmap_aggregates
+        add("harness_sampler_running", "gauge", "pmap sampler thread running", int(bool(self.hidumper_running)))
+        add("harness_pmap_samples", "counter", "pmap samples collected", aggregates["count"] if aggregates else 0)
+        if aggregates:
+            add("harness_pmap_physical_kb", "gauge", "latest anon:Kotlin physical memory (kB)", aggregates["physical_kb"])
+            add("harness_pmap_virtual_kb", "gauge", "latest anon:Kotlin virtual memory (kB)", aggregates["virtual_kb"])
+            add("harness_pmap_physical_peak_kb", "gauge", "peak anon:Kotlin physical memory (kB)",
+                aggregates["physical_max_kb"])
+            add("harness_pmap_physical_min_kb", "gauge", "minimum anon:Kotlin physical memory (kB)",
+                aggregates["physical_min_kb"])
+            add("harness_pmap_physical_mean_kb", "gauge", "mean anon:Kotlin physical memory (kB)",
+                round(aggregates["physical_sum_kb"] / aggregates["count"], 1))
+        policy = self.sampling_policy
+        if policy is not None:
+            add("harness_sampler_overruns", "counter", "sampler ticks slower than the planned interval", policy.overruns)
+            add("harness_sampler_interval_seconds", "gauge", "current planned sampling interval", policy.interval)
+        tracker = self.process_tracker
+        if tracker is not None:
+            add("harness_process_instance", "gauge", "app process instance number (0 before first start)",
+                tracker.instance)
+            add("harness_process_restarts", "counter", "app process restarts", tracker.restarts)
+
+        events = self.run_events
+        events = events[:len(events)]
+        action_counts = dict.fromkeys(UI_ACTION_EVENTS, 0)
+        current_step = ""
+        for _, kind, detail in events:
+            if kind in action_counts:
+                action_counts[kind] += 1
+            elif kind == "step":
+                current_step = detail
+        families.append(("harness_actions", "counter", "UI actions performed",
+                         [(dict(labels, action=kind), count) for kind, count in action_counts.items()]))
+        add("harness_current_step", "gauge", "current test step (value is always 1)", 1, step=current_step)
+
+        if self.cpu_sampler is not None and len(self.cpu_sampler.buffer):
+            add("harness_cpu_process_percent", "gauge", "latest app process CPU usage (%)",
+                self.cpu_sampler.buffer.process_pct[-1])
+        if self.hidumper_collector is not None and len(self.hidumper_collector.series):
+            add("harness_hidumper_total_pss_kb", "gauge", "latest hidumper --mem total PSS (kB)",
+                self.hidumper_collector.series.total_pss[-1])
+        if self.leak_verdict is not None:
+            add("harness_leak_slope_kb_per_min", "gauge", "detected leak growth rate (kB/min)",
+                round(self.leak_verdict["slope_kb_per_min"], 1))
+        return families
+
+    def _collect_samples(self):
+        """把各监控的采样数据展开为结果库的(series, ts_us, value)行"""
+        for data_point in self.hidumper_data:
+            if len(data_point) >= 3:
+                yield ("pmap_virtual_kb", data_point[0], data_point[1])
+                yield ("pmap_physical_kb", data_point[0], data_point[2])
+        if self.cpu_sampler is not None:
+            cpu = self.cpu_sampler.buffer
+            for ts, pct in zip(cpu.tick_timestamps, cpu.process_pct):
+                yield ("cpu_process_pct", ts, pct)
+            for tick, tid, pct in zip(cpu.thread_tick, cpu.thread_tid, cpu.thread_pct):
+                yield (f"cpu_thread:{tid}:{cpu.thread_names.get(tid, '')}", cpu.tick_timestamps[tick], pct)
+        if self.hidumper_collector is not None:
+            series = self.hidumper_collector.series
+            for ts, total in zip(series.timestamps, series.total_pss):
+                yield ("hidumper_total_pss_kb", ts, total)
+            for name, column in series.columns.items():
+                for ts, value in zip(series.timestamps, column):
+                    yield (f"hidumper_pss:{name}", ts, value)
+        for window in self.frame_timing_summary.get("windows", []):
+            if window["frames"] > 1:
+                yield ("frame_fps", int(window["start"] * 1000000), window["fps"])
+                yield ("frame_jank", int(window["start"] * 1000000), window["jank"])
+
+    def _save_results(self):
+        """teardown时把本次运行的全部结果批量写入结果库"""
+        try:
+            version_code = get_cached_app_version_code(self.driver, self.package_name,
+                                                       getattr(self.device1, "device_sn", ""))
+        except Exception as e:
+            print(f"[Results] 获取应用versionCode失败: {e}")
+            version_code = 0
+        run = {
+            "run_id": self.run_id,
+            "testcase": self.__class__.__name__,
+            "device": getattr(self.device1, "device_sn", ""),
+            "package_name": self.package_name,
+            "version_code": version_code,
+            "start_type": "cold" if self.cold_start else "warm",
+            "started_at": self.run_started_at,
+            "finished_at": int(time.time() * 1000000),
+        }
+        artifacts = [(kind, path, os.path.getsize(path) if os.path.exists(path) else None)
+                     for kind, path in self.run_artifacts]
+        metrics = self._collect_run_metrics()
+        try:
+            with ResultsStore(self.results_db_path) as store:
+                gate = BaselineGate(store) if self.enable_baseline_gate and version_code else None
+                if gate is not None:
+                    # 先与上一版本的基线比较，结论作为事件随本次运行一起保存
+                    self.baseline_verdict = gate.evaluate(run["testcase"], version_code, metrics, run["start_type"])
+                    print(BaselineGate.format_verdict(self.baseline_verdict))
+                    self._record_event("baseline_gate", "pass" if self.baseline_verdict["passed"] else "fail")
+                store.save_run(run, self._collect_samples(), self.run_events, artifacts, metrics)
+                if gate is not None:
+                    gate.update_baselines(run["testcase"], version_code, run["start_type"])
+            print(f"[Results] 运行结果已保存，run_id={self.run_id}, versionCode={version_code}")
+        except Exception as e:
+            print(f"[Results] 保存运行结果失败: {e}")
+
+    def _physical_growth_kb_per_min(self):
+        """对整次运行的pmap物理内存采样做最小二乘拟合，返回增长斜率（kB/分钟），采样不足时返回None
+        进程重启过时按进程实例分组，各实例分别去均值后合并拟合（组内斜率），重启造成的内存回落不计入增长
+        """
+        instances = {}
+        for data_point in self.hidumper_data:
+            if len(data_point) >= 3 and data_point[2] > 0:
+                instance = data_point[3] if len(data_point) >= 4 else 0
+                instances.setdefault(instance, []).append((data_point[0] / 60000000.0, data_point[2]))
+        if sum(len(points) for points in instances.values()) < 3:
+            return None
+        covariance = variance = 0.0
+        for points in instances.values():
+            n = len(points)
+            mean_t = sum(t for t, _ in points) / n
+            mean_v = sum(v for _, v in points) / n
+            variance += sum((t - mean_t) ** 2 for t, _ in points)
+            covariance += sum((t - mean_t) * (v - mean_v) for t, v in points)
+        if variance <= 0:
+            return None
+        return covariance / variance
+
+    def _collect_run_metrics(self):
+        """汇总本次运行采集到的指标，返回{指标名: 数值}，用于多次运行统计"""
+        metrics = {}
+        physical = [data_point[2] for data_point in self.hidumper_data if len(data_point) >= 3 and data_point[2] > 0]
+        if physical:
+            metrics["pmap_peak_physical_kb"] = max(physical)
+            metrics["pmap_mean_physical_kb"] = sum(physical) / len(physical)
+            metrics["pmap_final_physical_kb"] = physical[-1]
+        growth = self._physical_growth_kb_per_min()
+        if growth is not None:
+            metrics["pmap_growth_kb_per_min"] = growth
+        if self.hidumper_total_pss:
+            metrics["hidumper_total_pss_kb"] = self.hidumper_total_pss
+        if self.hidumper_collector is not None and len(self.hidumper_collector.series):
+            metrics["hidumper_peak_total_pss_kb"] = self.hidumper_collector.series.peak()[0]
+        for key, value in self.startup_metrics.items():
+            metrics[f"{key}_ms"] = value * 1000
+        action_ms = [r["mean_action_ms"] for r in self.pacer_reports if r["actions"] > 0]
+        if action_ms:
+            metrics["action_latency_ms"] = sum(action_ms) / len(action_ms)
+        if self.sampler_stats:
+            metrics["sampler_overruns"] = self.sampler_stats["overruns"]
+            metrics["sampler_effective_rate"] = self.sampler_stats["effective_rate"]
+        overall = self.frame_timing_summary.get("overall")
+        if overall and overall["frames"] > 1:
+            metrics["fps"] = overall["fps"]
+            metrics["jank_count"] = overall["jank"]
+            metrics["frame_p99_ms"] = overall["frame_p99_ms"]
+        if self.cpu_sampler is not None and len(self.cpu_sampler.buffer):
+            process_pct = self.cpu_sampler.buffer.process_pct
+            metrics["cpu_process_mean_pct"] = sum(process_pct) / len(process_pct)
+        if self.clock_sync is not None and self.clock_sync.bursts:
+            metrics["clock_offset_ms"] = self.clock_sync.bursts[0]["offset_us"] / 1000
+            metrics["clock_alignment_error_ms"] = self.clock_sync.alignment_error_us() / 1000
+            if self.clock_sync.drift is not None:
+                metrics["clock_drift_ppm"] = self.clock_sync.drift * 1e6
+        if self.process_tracker is not None:
+            metrics["process_restarts"] = self.process_tracker.restarts
+        if self.gc_dump_trigger is not None:
+            metrics["gc_dumps_triggered"] = len(self.gc_dump_trigger.dumps)
+        if self.leak_verdict is not None:
+            metrics["leak_slope_kb_per_min"] = self.leak_verdict["slope_kb_per_min"]
+        return metrics
 
@@ -0,0 +1,120 @@
+# !/usr/bin/env python
+# coding: utf-8
+"""
+#!!================================================================
+#版权 (C) 2023, Huawei Technologies Co.
+#==================================================================
+#文 件 名：                 TencentVideoRepeat.py
+#文件说明：                 腾讯视频多次运行统计用例：重复运行指定用例，区分冷/热启动汇总指标
+#作    者：                 author
+#生成日期：                 2026-10-19
+#!!================================================================
+"""
+
+import importlib
+import json
+from devicetest.core.test_case import Step
+from hypium import *
+from TencentVideoBase import TencentVideoBase
+from aw.ArtifactStore import ArtifactStore
+from aw.RunStatistics import summarize_runs, is_precise_enough
+
+
+class TencentVideoRepeat(TencentVideoBase):
+    def __init__(self, controllers):
+        super().__init__(controllers)
+        # 被重复运行的用例名（testcases目录下的模块名，与类名相同）
+        self.target_case = "TencentVideoShort"
+        # 最少/最多运行次数（冷/热启动交替时按每组计算最少次数）
+        self.min_runs = 3
+        self.max_runs = 10
+        # 是否冷启动、热启动交替运行，第一次总是冷启动
+        self.alternate_cold_warm = True
+        # 序贯停止：主指标均值的95%置信区间相对半宽不超过该值时停止
+        self.primary_metric = "pmap_peak_physical_kb"
+        self.target_rel_half_width = 0.05
+        # 每次运行的结果：[{"run": 序号, "start_type": "cold"/"warm", "metrics": {...}}, ...]
+        self.run_results = []
+
+    def setup(self):
+        """每次运行由被测用例自己完成setup，这里只清空结果，并为汇总结果分配一个运行目录"""
+        self.artifact_store = ArtifactStore(self.artifact_root)
+        self.run_id = self.artifact_store.create_run()
+        self.run_results = []
+
+    def _next_start_type(self, start_type):
+        """上一次运行成功后，下一次的启动类型"""
+        if self.alternate_cold_warm and start_type == "cold":
+            return "warm"
+        return "cold"
+
+    def _summarize(self):
+        """按启动类型分组汇总指标，返回{启动类型: {指标名: 统计结果}}"""
+        summaries = {}
+        for start_type in ("cold", "warm"):
+            runs = [r["metrics"] for r in self.run_results if r["start_type"] == start_type]
+            if runs:
+                summaries[start_type] = summarize_runs(runs)
+        return summaries
+
+    def _precise_enough(self, summaries):
+        """所有启动类型分组的主指标置信区间都足够窄时返回True"""
+        if not summaries:
+            return False
+        for summary in summaries.values():
+            metric = summary.get(self.primary_metric)
+            if metric is None or not is_precise_enough(metric, self.target_rel_half_width, self.min_runs):
+                return False
+        return True
+
+    def _save_summary(self, summaries):
+        """把每次运行的指标和汇总结果存入产物存储（本次重复运行的运行目录）"""
+        data = json.dumps({"target_case": self.target_case, "runs": self.run_results, "summary": summaries},
+                          ensure_ascii=False, indent=2)
+        entry = self.artifact_store.put_bytes(self.run_id, "repeat_summary", f"{self.target_case}_repeat.json", data)
+        print(f"[Repeat] 统计结果已保存: {self.artifact_store.entry_path(entry)}（运行 {self.run_id}）")
+
+    def process(self):
+        case_class = getattr(importlib.import_module(self.target_case), self.target_case)
+        summaries = {}
+        # 第一次总是冷启动；之后的启动类型取决于上一次运行的实际结果，而不是运行序号
+        start_type = "cold"
+        for run_index in range(self.max_runs):
+            next_start_type = self._next_start_type(start_type)
+            case = case_class(self.controllers)
+            case.cold_start = start_type == "cold"
+            # 下一次是热启动时保留应用进程
+            case.keep_app_alive = next_start_type == "warm" and run_index + 1 < self.max_runs
+            self._step(f'第{run_index + 1}次运行{self.target_case}（{start_type}）')
+            try:
+                case.setup()
+                try:
+                    case.process()
+                finally:
+                    case.teardown()
+            except Exception as e:
+                print(f"[Repeat] 第{run_index + 1}次运行失败，结果不计入统计，下一次改为冷启动: {e}")
+                # 失败的运行不一定保留了应用进程，下一次按冷启动重新开始，避免冷启动数据混入热启动统计
+                self._force_stop_app()
+                start_type = "cold"
+                continue
+            self.run_results.append({"run": run_index + 1, "start_type": start_type,
+                                     "metrics": case._collect_run_metrics()})
+            start_type = next_start_type
+
+            summaries = self._summarize()
+            for group, summary in summaries.items():
+                metric = summary.get(self.primary_metric)
+                if metric is not None:
+                    print(f"[Repeat] {group} n={metric['n']} {self.primary_metric}: 均值 {metric['mean']:.1f}, "
+                          f"中位数 {metric['median']:.1f}, 95%CI [{metric['ci_low']:.1f}, {metric['ci_high']:.1f}]")
+            if self._precise_enough(summaries):
+                print(f"[Repeat] 置信区间已足够窄，共运行{run_index + 1}次，提前停止")
+                break
+
+        self._save_summary(summaries)
+
+    def teardown(self):
+        """确保最后应用被完全退出"""
+        self._step('强制退出腾讯视频应用')
+        self._force_stop_app()
@@ -11,8 +11,6 @@
 #!!================================================================
 """
 
-import time
-import subprocess
 from devicetest.core.test_case import Step
 from hypium import *
 from TencentVideoBase import TencentVideoBase
@@ -25,6 +23,8 @@ class TencentVideoShort(TencentVideoBase):
         self.swipe_count = 30
         # pmap采样间隔时间（秒），默认1秒
         self.hidumper_interval = 1
+        # 滑动过程中采集帧时间数据，统计FPS和卡顿
+        self.enable_frame_timing = True
 
     def setup(self):
         """调用父类的setup方法"""
@@ -34,35 +34,8 @@ class TencentVideoShort(TencentVideoBase):
         # 调用公共方法：强制退出app、启动pmap监控、启动应用、跳过广告
         self._start_app_with_monitor_and_skip_ad()
 
-        Step('4.切换到短视频界面')
-        # 点击坐标(482, 2525)切换到短视频界面
-        self.driver.touch((482, 2525))
-        time.sleep(1)  # 等待界面切换
-
-        Step('5.短视频上划，每秒上划一次')
-        window_size = self.driver.get_window_size()
-        width = window_size[0]  # tuple的第一个元素是width
-        height = window_size[1]  # tuple的第二个元素是height
-        start_x = int(width * 0.5)
-        start_y = int(height * 0.7)
-        end_x = int(width * 0.5)
-        end_y = int(height * 0.2)
-        
-        # 上划指定次数，每次间隔1秒，使用slide方法进行精准滑动
-        for i in range(self.swipe_count):
-            remaining = self.swipe_count - i - 1  # 剩余次数
-            
-            # 当开关开启且剩余5次时，触发gc dump
-            if self.enable_memdump and remaining == 5:
-                Step('6.执行hdc shell命令触发gc dump')
-                # 执行hdc shell命令写入control.log
-                command1 = 'hdc shell \'echo "1" > /data/app/el2/100/base/com.tencent.videohm/files/control.log\''
-                subprocess.run(command1, shell=True)
-                time.sleep(1)
-            
-            # 执行滑动
-            self.driver.slide((start_x, start_y), (end_x, end_y), slide_time=0.3)
-            time.sleep(1)
+        # 按TencentVideoShort.scenario.json执行：切换到短视频界面并上划
+        self._run_scenario(swipe_count=self.swipe_count)
 
     def teardown(self):
         """调用父类的teardown方法"""
@@ -0,0 +1,7 @@
+# coding: utf-8
+"""单元测试公共配置：把仓库根目录加入模块搜索路径，与用例运行时一样按aw.X导入"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
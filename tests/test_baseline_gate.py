@@ -0,0 +1,48 @@
+# coding: utf-8
+"""aw/BaselineGate.py 按版本和冷/热启动分开的基线门禁"""
+
+from aw.BaselineGate import BaselineGate
+from aw.ResultsStore import ResultsStore
+
+CASE = "TencentVideoShort"
+
+
+def _save(store, index, version_code, start_type, peak_kb):
+    store.save_run({"run_id": f"r{version_code}_{start_type}_{index}", "testcase": CASE, "version_code": version_code,
+                    "start_type": start_type, "started_at": version_code * 1000 + index},
+                   metrics={"pmap_peak_physical_kb": peak_kb})
+
+
+def _baseline_store(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    gate = BaselineGate(store)
+    # 上一版本：冷启动峰值约200MB，热启动约150MB
+    for i in range(6):
+        _save(store, i, 100, "cold", 200000 + 100 * (i % 3))
+        _save(store, i, 100, "warm", 150000 + 100 * (i % 3))
+    gate.update_baselines(CASE, 100, "cold")
+    gate.update_baselines(CASE, 100, "warm")
+    return store, gate
+
+
+def test_gate_compares_against_same_start_type(tmp_path):
+    store, gate = _baseline_store(tmp_path)
+    with store:
+        cold = gate.evaluate(CASE, 101, {"pmap_peak_physical_kb": 200100}, "cold")
+        assert cold["passed"]
+        assert cold["metrics"]["pmap_peak_physical_kb"]["baseline_mean"] == 200100
+        warm = gate.evaluate(CASE, 101, {"pmap_peak_physical_kb": 160000}, "warm")
+        assert not warm["passed"]
+        assert warm["start_type"] == "warm"
+        assert warm["metrics"]["pmap_peak_physical_kb"]["baseline_mean"] == 150100
+
+
+def test_no_baseline_for_other_start_type(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    with store:
+        gate = BaselineGate(store)
+        for i in range(6):
+            _save(store, i, 100, "cold", 200000)
+        gate.update_baselines(CASE, 100, "cold")
+        assert gate.evaluate(CASE, 101, {"pmap_peak_physical_kb": 150000}, "warm")["metrics"] == {}
+
@@ -0,0 +1,71 @@
+# coding: utf-8
+"""aw/ClockSync.py 探测解析、偏差/漂移估计和设备时间到主机时间的换算"""
+
+import pytest
+
+import aw.ClockSync as clock_sync_module
+from aw.ClockSync import ClockSync, parse_probe_output
+
+OFFSET_US = 1834250.0
+DRIFT = 40e-6
+BOOT_REALTIME_US = 1760000000000000.0
+T0_US = 1760000100000000.0
+
+
+class FakeDevice:
+    """模拟主机时钟和带偏差、漂移的设备时钟，每次探测往返rtt_us，设备在往返中点读取时间"""
+
+    def __init__(self, monkeypatch, rtt_us=2000.0):
+        self.host_us = T0_US
+        self.rtt_us = rtt_us
+        monkeypatch.setattr(clock_sync_module.time, "time_ns", lambda: int(self.host_us * 1000))
+
+    def realtime_at(self, host_us):
+        return host_us + OFFSET_US + DRIFT * (host_us - T0_US)
+
+    def run(self, command):
+        self.host_us += self.rtt_us / 2
+        realtime_us = self.realtime_at(self.host_us)
+        self.host_us += self.rtt_us / 2
+        uptime_s = int((realtime_us - BOOT_REALTIME_US) / 10000) / 100
+        return f"{int(realtime_us * 1000)}\n{uptime_s:.2f} 12345.67\n"
+
+
+def test_parse_probe_output():
+    assert parse_probe_output("1760000000123456789\n3600.25 7000.00\n") == (1760000000123456.789, 3600250000.0)
+    assert parse_probe_output("") is None
+    assert parse_probe_output("date: not found\n") is None
+
+
+def test_offset_drift_and_inversion(monkeypatch):
+    device = FakeDevice(monkeypatch)
+    clock = ClockSync(command_runner=device.run, probes=4)
+    start = clock.measure("start")
+    assert start["offset_us"] == pytest.approx(OFFSET_US, abs=1.0)
+    assert start["rtt_us"] == pytest.approx(2000.0, abs=1.0)
+    assert clock.drift is None
+
+    device.host_us += 3600 * 1000000
+    clock.measure("end")
+    assert clock.drift == pytest.approx(DRIFT, rel=1e-3)
+
+    host_us = T0_US + 1800 * 1000000
+    assert clock.device_to_host_us(device.realtime_at(host_us)) == pytest.approx(host_us, abs=1.0)
+
+
+def test_boottime_to_host(monkeypatch):
+    device = FakeDevice(monkeypatch)
+    clock = ClockSync(command_runner=device.run, probes=8)
+    clock.measure("start")
+    host_us = T0_US + 10 * 1000000
+    boottime_us = device.realtime_at(host_us) - BOOT_REALTIME_US
+    assert clock.boottime_to_host_us(boottime_us) == pytest.approx(host_us, abs=clock.alignment_error_us(True))
+
+
+def test_alignment_error_bound(monkeypatch):
+    device = FakeDevice(monkeypatch, rtt_us=3000.0)
+    clock = ClockSync(command_runner=device.run, probes=2)
+    assert clock.alignment_error_us() is None
+    clock.measure("start")
+    assert clock.alignment_error_us() == pytest.approx(1500.0, abs=1.0)
+    assert clock.alignment_error_us(boottime=True) == pytest.approx(1500.0 + 5000.0, abs=1.0)
@@ -0,0 +1,64 @@
+# coding: utf-8
+"""aw/CpuSampler.py stat解析与CPU占用差值计算"""
+
+from aw.CpuSampler import CpuSampler, parse_stat_line, parse_cpu_output
+
+
+def _stat(tid, name, ticks, starttime=100):
+    return f"{tid} ({name}) S 1 0 0 0 -1 0 0 0 0 0 {ticks} 0 0 0 20 0 3 0 {starttime}"
+
+
+def _output(uptime, process_ticks, threads, pid=100, starttime=100):
+    lines = [f"{uptime:.2f} {uptime * 4:.2f}", _stat(pid, "com.tencent.videohm", process_ticks, starttime)]
+    lines += [_stat(tid, name, ticks, starttime) for tid, (name, ticks) in threads.items()]
+    return "\n".join(lines) + "\n"
+
+
+def test_parse_stat_line_with_spaces_in_name():
+    assert parse_stat_line("123 (Thread (1) x) S 1 0 0 0 -1 0 0 0 0 0 30 12 0 0") == (123, "Thread (1) x", 42)
+    assert parse_stat_line("garbage") is None
+
+
+def test_parse_cpu_output():
+    uptime, process_ticks, threads, process_key = parse_cpu_output(_output(10.5, 80, {101: ("RS", 20)}, starttime=777))
+    assert uptime == 10.5
+    assert process_ticks == 80
+    assert threads == {101: ("RS", 20)}
+    assert process_key == (100, 777)
+    assert parse_cpu_output("") is None
+
+
+class _Replay:
+    def __init__(self, outputs):
+        self.outputs = list(outputs)
+
+    def __call__(self, command):
+        return self.outputs.pop(0)
+
+
+def test_thread_percentages_and_new_thread_baseline():
+    sampler = CpuSampler("com.tencent.videohm", command_runner=_Replay([
+        _output(10.0, 100, {101: ("main", 60)}),
+        _output(11.0, 150, {101: ("main", 90), 102: ("worker", 5000)}),
+        _output(12.0, 200, {101: ("main", 100), 102: ("worker", 5020)}),
+    ]))
+    for _ in range(3):
+        sampler.sample_once()
+    buffer = sampler.buffer
+    assert list(buffer.process_pct) == [50, 50]
+    rows = list(zip(buffer.thread_tick, buffer.thread_tid, buffer.thread_pct))
+    # 新线程第一次出现时只建立基准，不把累计的5000 ticks计入一个采样间隔
+    assert rows == [(0, 101, 30), (1, 101, 10), (1, 102, 20)]
+
+
+def test_process_restart_resets_baseline():
+    sampler = CpuSampler("com.tencent.videohm", command_runner=_Replay([
+        _output(10.0, 100, {101: ("main", 60)}),
+        # 新进程的ticks比旧进程大，只能通过pid/启动时间识别重启
+        _output(11.0, 500, {101: ("main", 400)}, pid=200, starttime=1050),
+        _output(12.0, 520, {101: ("main", 410)}, pid=200, starttime=1050),
+    ]))
+    for _ in range(3):
+        sampler.sample_once()
+    assert list(sampler.buffer.process_pct) == [20]
+    assert list(sampler.buffer.thread_pct) == [10]
@@ -0,0 +1,73 @@
+# coding: utf-8
+"""aw/FrameTimingCollector.py 帧时间统计：通过bench/fake_hdc.py回放帧时间戳，验证空闲时间不计入整体统计"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from aw.FrameTimingCollector import FrameTimingCollector, parse_fps_output, compute_frame_stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench"))
+from fake_hdc import HdcReplay
+
+# 模拟设备单调时钟的起点（秒），是各回放周期的整数倍；主机时间 = 单调时钟 + HOST_OFFSET
+DEVICE_START = 999.0
+HOST_OFFSET = 1700000000.0
+SWIPES = 8
+
+
+def _replay_summary(tmp_path, monkeypatch, idle_s, with_swipes=True):
+    """按回放规则轮询帧时间戳，每个周期开始时滑动一次：前1秒绘制，之后静止idle_s秒"""
+    rule = {"match": "hidumper -s 10 -a", "generator": "fps", "refresh_rate": 120, "jank_every": 97,
+            "active_s": 1, "idle_s": idle_s}
+    path = tmp_path / f"recordings_idle_{idle_s}.json"
+    path.write_text(json.dumps({"rules": [rule]}), encoding="utf-8")
+    replay = HdcReplay(str(path))
+    now = [DEVICE_START]
+    monkeypatch.setattr(time, "monotonic_ns", lambda: int(now[0] * 1000000000))
+    monkeypatch.setattr(time, "time", lambda: now[0] + HOST_OFFSET)
+    collector = FrameTimingCollector("composer", command_runner=lambda command: replay.respond(command)[0])
+    cycle = 1 + idle_s
+    events = []
+    if with_swipes:
+        events = [(int((DEVICE_START + k * cycle + HOST_OFFSET) * 1000000), "swipe", str(k)) for k in range(SWIPES)]
+    while now[0] < DEVICE_START + SWIPES * cycle:
+        now[0] += 0.25
+        collector.poll_once()
+    return collector.summarize(events)
+
+
+def test_idle_pauses_do_not_change_fps(tmp_path, monkeypatch):
+    busy = _replay_summary(tmp_path, monkeypatch, idle_s=0)
+    paused = _replay_summary(tmp_path, monkeypatch, idle_s=2)
+    # 每97帧丢1帧
+    expected_fps = 120 * 96 / 97
+    assert busy["overall"]["fps"] == pytest.approx(expected_fps, rel=0.01)
+    assert paused["overall"]["fps"] == pytest.approx(busy["overall"]["fps"], rel=0.01)
+    assert paused["overall"]["frame_p99_ms"] == pytest.approx(busy["overall"]["frame_p99_ms"])
+    assert paused["overall"]["frame_max_ms"] < 20
+    assert min(w["fps"] for w in paused["windows"]) == pytest.approx(expected_fps, rel=0.02)
+
+
+def test_idle_gaps_split_without_swipes(tmp_path, monkeypatch):
+    paused = _replay_summary(tmp_path, monkeypatch, idle_s=2, with_swipes=False)
+    assert paused["overall"]["windows"] == 0
+    assert paused["overall"]["fps"] == pytest.approx(120 * 96 / 97, rel=0.01)
+
+
+def test_parse_fps_output():
+    refresh_rate, timestamps = parse_fps_output("120\n0\n3000000000\n2000000000\nfoo\n")
+    assert refresh_rate == 120
+    assert timestamps == [2000000000, 3000000000]
+
+
+def test_compute_frame_stats_jank():
+    timestamps = [i * 10000000 for i in range(10)] + [150000000]
+    stats = compute_frame_stats(timestamps, expected_interval_ms=10)
+    assert stats["frames"] == 11
+    assert stats["jank"] == 1
+    assert stats["frame_max_ms"] == pytest.approx(60)
+    assert stats["fps"] == pytest.approx(10 / 0.15)
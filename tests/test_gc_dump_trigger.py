@@ -0,0 +1,46 @@
+# coding: utf-8
+"""aw/GcDumpTrigger.py 触发条件、防抖与时间点"""
+
+import time
+
+from aw.GcDumpTrigger import GcDumpTrigger
+
+
+def _run(monkeypatch, trigger, samples):
+    """samples: [(距start的秒数, 物理内存kB), ...]"""
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    trigger.start()
+    reasons = []
+    for elapsed, physical_kb in samples:
+        now[0] = 100.0 + elapsed
+        reason = trigger.on_sample(int(elapsed * 1000000), physical_kb)
+        if reason:
+            reasons.append((elapsed, reason))
+    return reasons
+
+
+def test_thresholds_fire_once_and_debounce(monkeypatch):
+    fired = []
+    trigger = GcDumpTrigger(lambda reason, kb: fired.append(reason), thresholds_kb=[1000, 2000, 3000],
+                            debounce_seconds=10, warmup_seconds=0)
+    reasons = _run(monkeypatch, trigger, [(1, 500), (2, 2100), (3, 3100), (13, 3100), (14, 3200)])
+    assert reasons == [(2, "threshold 2000kB"), (13, "threshold 3000kB")]
+    assert fired == ["threshold 2000kB", "threshold 3000kB"]
+    assert trigger.suppressed == 1
+
+
+def test_time_point_not_starved_by_growing_memory(monkeypatch):
+    # 内存持续增长，每个样本都满足新高条件；时间点到期后仍然要触发
+    trigger = GcDumpTrigger(lambda reason, kb: None, new_high_margin_kb=100, at_seconds=[23],
+                            debounce_seconds=5, max_dumps=10, warmup_seconds=0)
+    reasons = _run(monkeypatch, trigger, [(t, 10000 + 200 * t) for t in range(40)])
+    # 23秒时处于上一次新高dump的防抖期内，防抖结束后的第一个样本触发
+    assert [t for t, r in reasons if r == "time 23s"] == [26]
+    assert sum(1 for _, r in reasons if r.startswith("new_high")) >= 5
+
+
+def test_max_dumps(monkeypatch):
+    trigger = GcDumpTrigger(lambda reason, kb: None, at_seconds=[1, 2, 3], debounce_seconds=0, max_dumps=2)
+    reasons = _run(monkeypatch, trigger, [(t, 1000) for t in range(5)])
+    assert [r for _, r in reasons] == ["time 1s", "time 2s"]
@@ -0,0 +1,50 @@
+# coding: utf-8
+"""analyze_hidumper.py hidumper --mem 输出的增量解析"""
+
+import gzip
+import json
+import os
+
+from analyze_hidumper import HidumperStreamParser, parse_hidumper_lines, parse_hidumper_file
+
+RECORDINGS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "recordings.json")
+
+
+def _sample_output():
+    with open(RECORDINGS, "r", encoding="utf-8") as f:
+        return json.load(f)["hidumper_mem"]
+
+
+def test_parse_recorded_output():
+    pss_data, total_pss = parse_hidumper_lines(_sample_output().splitlines())
+    assert total_pss == 362725
+    # 内存类型可以包含空格，Total行和表头不是数据行
+    assert pss_data["Ark ts heap"] == 61234
+    assert pss_data["native heap"] == 98012
+    assert pss_data["guard"] == 0
+    assert "Total" not in pss_data
+    assert len(pss_data) == 12
+
+
+def test_stream_parser_matches_line_by_line_feed():
+    parser = HidumperStreamParser()
+    for line in _sample_output().splitlines(keepends=True):
+        parser.feed(line)
+    assert (parser.pss_data, parser.total_pss) == parse_hidumper_lines(_sample_output().splitlines())
+
+
+def test_rows_after_second_separator_are_ignored():
+    separator = "-" * 120
+    lines = ["header", separator, "   GL   100   0", separator, "   stale   999   0", "   Total   100   0"]
+    assert parse_hidumper_lines(lines) == ({"GL": 100}, 100)
+
+
+def test_empty_output():
+    assert parse_hidumper_lines([]) == ({}, 0)
+
+
+def test_parse_gzip_artifact(tmp_path):
+    path = tmp_path / "hidumper.txt.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(_sample_output())
+    assert parse_hidumper_file(str(path))[1] == 362725
@@ -0,0 +1,56 @@
+# coding: utf-8
+"""aw/LeakDetector.py 在线泄漏检测的回归斜率与判定"""
+
+import pytest
+
+from aw.LeakDetector import OnlineLeakDetector
+
+
+def _feed(detector, values, interval=1.0):
+    verdict = None
+    for i, value in enumerate(values):
+        verdict = detector.add(int(i * interval * 1000000), value)
+    return verdict
+
+
+def test_linear_growth_slope():
+    # 每秒增长50kB，即3000kB/分钟
+    detector = OnlineLeakDetector()
+    verdict = _feed(detector, [100000 + 50 * i + (7 if i % 2 else -7) for i in range(90)])
+    assert verdict is not None
+    assert verdict["slope_kb_per_min"] == pytest.approx(3000, rel=0.02)
+    assert verdict["samples"] == 90
+
+
+def test_flat_memory_no_verdict():
+    detector = OnlineLeakDetector()
+    assert _feed(detector, [100000 + (300 if i % 3 == 0 else -150) for i in range(120)]) is None
+    assert abs(detector.estimate()["slope_kb_per_min"]) < 100
+
+
+def test_spike_does_not_trigger():
+    # 平稳内存中的单次尖峰被截断，不会判定为泄漏
+    values = [100000 + (20 if i % 2 else -20) for i in range(120)]
+    values[80] = 400000
+    detector = OnlineLeakDetector()
+    assert _feed(detector, values) is None
+
+
+def test_zero_samples_ignored():
+    detector = OnlineLeakDetector()
+    assert detector.add(0, 0) is None
+    assert detector.estimate() is None
+
+
+def test_window_drops_old_samples():
+    detector = OnlineLeakDetector(window_seconds=30)
+    _feed(detector, [100000 + 10 * i for i in range(100)])
+    assert detector.estimate()["samples"] == 31
+
+
+def test_reset_clears_window():
+    detector = OnlineLeakDetector()
+    _feed(detector, [100000 + 50 * i for i in range(90)])
+    detector.reset()
+    assert detector.estimate() is None
+    assert detector.verdict() is None
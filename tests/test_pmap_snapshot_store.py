@@ -0,0 +1,94 @@
+# coding: utf-8
+"""aw/PmapSnapshotStore.py pmap解析与关键帧/增量编码的往返一致性"""
+
+import pytest
+
+from aw.PmapSnapshotStore import (PmapSnapshotCollector, PmapSnapshotWriter, PmapSnapshotReader, parse_pmap_snapshot,
+                                  _put_varint, _get_varint, _zigzag, _unzigzag)
+
+PMAP_TEXT = """12345:   com.tencent.videohm
+Address           Kbytes     PSS   Dirty    Swap  Mode  Mapping
+0000005500000000      64      12       0       0  r-xp  /system/bin/appspawn
+0000007f00000000    2048    1024    1024       0  rw-p  [anon:Kotlin]
+0000007f10000000     512     128       4       0  rw-p
+----------------  ------  ------  ------  ------
+total kB            2624    1164    1028       0
+"""
+
+
+def test_parse_pmap_snapshot():
+    snapshot = parse_pmap_snapshot(PMAP_TEXT)
+    assert snapshot == {
+        (0x5500000000, "/system/bin/appspawn"): (64, 12, 0),
+        (0x7f00000000, "[anon:Kotlin]"): (2048, 1024, 1024),
+        (0x7f10000000, "[anon]"): (512, 128, 4),
+    }
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2 ** 40])
+def test_varint_round_trip(value):
+    buf = bytearray()
+    _put_varint(buf, value)
+    assert _get_varint(bytes(buf), 0) == (value, len(buf))
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 2, -2, 123456, -123456])
+def test_zigzag_round_trip(value):
+    assert _zigzag(value) >= 0
+    assert _unzigzag(_zigzag(value)) == value
+
+
+def _snapshots():
+    """映射逐步增长，中途新增、删除映射"""
+    base = {(0x1000, "libc.so"): (100, 50, 0), (0x2000, "[anon:Kotlin]"): (2048, 1000, 1000)}
+    for n in range(12):
+        snapshot = dict(base)
+        snapshot[(0x2000, "[anon:Kotlin]")] = (2048 + 64 * n, 1000 + 100 * n, 1000 + 90 * n)
+        if n >= 3:
+            snapshot[(0x3000, "[anon:ArkTS Heap]")] = (512, 200 + n, 10)
+        if n >= 7:
+            del snapshot[(0x1000, "libc.so")]
+        yield n * 1000000, snapshot
+
+
+def test_delta_encoding_round_trip(tmp_path):
+    expected = list(_snapshots())
+    writer = PmapSnapshotWriter(str(tmp_path), keyframe_interval=5)
+    for timestamp, snapshot in expected:
+        writer.add(timestamp, snapshot)
+    writer.close()
+    reader = PmapSnapshotReader(str(tmp_path))
+    assert len(reader) == len(expected)
+    assert reader.keyframes == [0, 5, 10]
+    for n, (_, snapshot) in enumerate(expected):
+        assert reader.snapshot(n) == snapshot
+    assert reader.snapshot_at(4500000) == expected[4][1]
+
+
+def test_history_and_growth(tmp_path):
+    writer = PmapSnapshotWriter(str(tmp_path), keyframe_interval=5)
+    for timestamp, snapshot in _snapshots():
+        writer.add(timestamp, snapshot)
+    writer.close()
+    reader = PmapSnapshotReader(str(tmp_path))
+    [libc] = reader.find_mappings("libc")
+    assert reader.mapping_history(libc) == [(0, (100, 50, 0)), (7000000, None)]
+    growth = reader.growth()
+    assert growth[0] == ("[anon:Kotlin]", 0x2000, 1100)
+    assert ("libc.so", 0x1000, -50) in growth
+
+
+def test_collector_aligns_index_to_device_time(tmp_path):
+    outputs = iter([f"{1760000000 + n}000000000\n" + PMAP_TEXT for n in range(3)])
+    collector = PmapSnapshotCollector("com.tencent.videohm", str(tmp_path),
+                                      command_runner=lambda command, timeout: next(outputs))
+    collector.writer = PmapSnapshotWriter(str(tmp_path))
+    for _ in range(3):
+        collector.capture_once()
+    collector.writer.close()
+    assert collector.device_times.tolist() == [1760000000000000 + n * 1000000 for n in range(3)]
+    # 设备时钟比主机快1秒
+    assert collector.align_timestamps(lambda device_us: device_us - 1000000) == 3
+    reader = PmapSnapshotReader(str(tmp_path))
+    assert reader.timestamps == [1759999999000000 + n * 1000000 for n in range(3)]
+    assert reader.snapshot(2) == parse_pmap_snapshot(PMAP_TEXT)
@@ -0,0 +1,75 @@
+# coding: utf-8
+"""aw/ProcessTracker.py stat解析与进程生命周期事件"""
+
+import shutil
+import subprocess
+
+import pytest
+
+from aw.CpuSampler import CpuSampler
+from aw.HidumperCollector import HidumperMemCollector
+from aw.PmapSnapshotStore import PmapSnapshotCollector
+from aw.ProcessTracker import ProcessTracker, parse_proc_stat
+
+PACKAGE = "com.tencent.videohm"
+
+
+def _stat(pid, starttime, name="com.tencent.vid"):
+    return f"{pid} ({name}) S 1 " + " ".join(["0"] * 17) + f" {starttime} 0 0"
+
+
+def test_parse_proc_stat():
+    assert parse_proc_stat(_stat(123, 4567)) == (123, "com.tencent.vid", 4567)
+    # 进程名中的空格和括号
+    assert parse_proc_stat(_stat(5, 9, name="a (b) c")) == (5, "a (b) c", 9)
+    assert parse_proc_stat("") is None
+    assert parse_proc_stat("123 (short) S 1") is None
+
+
+def test_start_exit_restart():
+    tracker = ProcessTracker(PACKAGE)
+    assert tracker.observe(0, None) == (False, None)
+    assert tracker.observe(1, _stat(100, 10)) == (True, ("process_start", "pid=100"))
+    assert tracker.observe(2, _stat(100, 10)) == (True, None)
+    assert tracker.observe(3, "") == (False, ("process_exit", "pid=100"))
+    assert tracker.observe(4, _stat(200, 50)) == (True, ("process_restart", "pid=100->200"))
+    assert tracker.instance == 2
+    assert tracker.restarts == 1
+    assert [kind for _, kind, _ in tracker.events] == ["process_start", "process_exit", "process_restart"]
+
+
+def test_pid_reuse_emits_exit_then_restart():
+    tracker = ProcessTracker(PACKAGE)
+    tracker.observe(1, _stat(100, 10))
+    # 同一PID、不同启动时间：原实例已退出，本次采样不可用
+    assert tracker.observe(2, _stat(100, 99)) == (False, ("process_exit", "pid=100 reused"))
+    assert tracker.pid is None
+    assert tracker.observe(3, _stat(300, 120)) == (True, ("process_restart", "pid=100->300"))
+    assert [kind for _, kind, _ in tracker.events] == ["process_start", "process_exit", "process_restart"]
+    assert tracker.restarts == 1
+
+
+def test_pid_script_uses_cache():
+    tracker = ProcessTracker(PACKAGE)
+    assert tracker.pid_script().startswith(f"pid=$(pidof {PACKAGE})")
+    tracker.observe(1, _stat(100, 10))
+    assert tracker.pid_script().startswith("pid=100; if [ ! -r /proc/$pid/stat ]")
+
+
+@pytest.mark.skipif(shutil.which("sh") is None, reason="需要POSIX sh")
+@pytest.mark.parametrize("pidof_output, expected", [("100 200", "100"), ("100", "100"), ("", "")])
+def test_pid_script_takes_first_pid(pidof_output, expected):
+    # 应用有子进程时pidof输出多个PID，各采集命令只能使用第一个
+    script = f'pidof() {{ echo "{pidof_output}"; }}; {ProcessTracker(PACKAGE).pid_script()}; echo "[$pid]"'
+    result = subprocess.run(["sh", "-c", script], capture_output=True, text=True)
+    assert result.stdout.strip() == f"[{expected}]"
+
+
+def test_collectors_use_shared_pid_lookup():
+    lookup = ProcessTracker(PACKAGE).pid_script()
+    commands = [CpuSampler(PACKAGE)._command()]
+    PmapSnapshotCollector(PACKAGE, "unused",
+                          command_runner=lambda command, timeout: commands.append(command) or "").capture_once()
+    HidumperMemCollector(PACKAGE, line_source=lambda command, timeout: commands.append(command) or []).capture_once()
+    assert len(commands) == 3
+    assert all(lookup in command for command in commands)
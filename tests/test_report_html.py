@@ -0,0 +1,32 @@
+# coding: utf-8
+"""report_html.py min/max分桶降采样与报告标题转义"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from report_html import minmax_indices, render_html
+
+
+def test_minmax_indices_keeps_spikes_and_endpoints():
+    values = np.zeros(1000)
+    values[123] = 50.0
+    values[777] = -20.0
+    index = minmax_indices(values, 10)
+    assert 0 in index and 999 in index
+    assert 123 in index and 777 in index
+    assert np.all(np.diff(index) > 0)
+    assert index.size <= 2 * 10 + 2
+
+
+def test_minmax_indices_short_series_returns_all():
+    values = np.arange(15, dtype=float)
+    assert minmax_indices(values, 10).tolist() == list(range(15))
+
+
+def test_render_html_escapes_title():
+    data = {"run": {"testcase": "<script>x</script>", "run_id": "r1"}, "panels": [], "events": [],
+            "step_events": []}
+    page = render_html(data)
+    assert "<script>x</script>" not in page
+    assert "&lt;script&gt;" in page
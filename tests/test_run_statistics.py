@@ -0,0 +1,56 @@
+# coding: utf-8
+"""aw/RunStatistics.py 多次运行统计与bootstrap置信区间"""
+
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from aw.RunStatistics import bootstrap_summary, summarize_runs, is_precise_enough
+
+
+def test_summary_basic_statistics():
+    summary = bootstrap_summary([10, 12, 11, 13, 9])
+    assert summary["n"] == 5
+    assert summary["mean"] == pytest.approx(11)
+    assert summary["median"] == pytest.approx(11)
+    assert summary["std"] == pytest.approx(math.sqrt(2.5))
+
+
+def test_ci_contains_mean_and_narrows_with_more_runs():
+    few = bootstrap_summary([100, 104, 98, 102, 96])
+    many = bootstrap_summary([100, 104, 98, 102, 96] * 8)
+    assert few["ci_low"] <= few["mean"] <= few["ci_high"]
+    assert many["ci_high"] - many["ci_low"] < few["ci_high"] - few["ci_low"]
+    assert many["rel_half_width"] < few["rel_half_width"]
+
+
+def test_ci_is_deterministic_for_seed():
+    assert bootstrap_summary([1, 5, 2, 8, 3]) == bootstrap_summary([1, 5, 2, 8, 3])
+
+
+def test_constant_values_have_zero_width():
+    summary = bootstrap_summary([7, 7, 7])
+    assert summary["ci_low"] == summary["ci_high"] == 7
+    assert summary["rel_half_width"] == 0
+
+
+def test_non_finite_and_single_value():
+    summary = bootstrap_summary([float("nan"), 5])
+    assert summary["n"] == 1
+    assert summary["mean"] == 5
+    assert math.isnan(summary["ci_low"])
+    assert summary["rel_half_width"] == math.inf
+
+
+def test_summarize_runs_skips_missing_metrics():
+    result = summarize_runs([{"a": 1, "b": 2}, {"a": 3}, {"a": 5, "b": None}])
+    assert result["a"]["n"] == 3
+    assert result["b"]["n"] == 1
+
+
+def test_is_precise_enough():
+    summary = bootstrap_summary([100, 101, 99, 100, 100, 101, 99])
+    assert is_precise_enough(summary, 0.05, 5)
+    assert not is_precise_enough(summary, 0.05, 10)
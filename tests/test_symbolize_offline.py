@@ -0,0 +1,110 @@
+# coding: utf-8
+"""symbolize_offline.py ELF解析、区间表查找和符号缓存的往返一致性"""
+
+import struct
+
+from symbolize_offline import OfflineSymbolizer, RangeTable, SymbolCache, parse_elf, parse_frame_line
+
+BUILD_ID = bytes(range(1, 21))
+LOAD_VADDR = 0x10000
+# (名称, 起始虚拟地址, 大小)
+FUNCTIONS = [("func_a", 0x10100, 0x40), ("func_b", 0x10200, 0x80), ("func_b_alias", 0x10200, 0x10)]
+
+
+def _build_elf():
+    """构造最小的64位小端ELF：一个PT_LOAD段、.symtab/.strtab和GNU build ID"""
+    strtab = b"\0" + b"".join(name.encode() + b"\0" for name, _, _ in FUNCTIONS)
+    symtab = bytes(24)
+    name_offset = 1
+    for name, vaddr, size in FUNCTIONS:
+        # STB_GLOBAL | STT_FUNC，所在节号非0
+        symtab += struct.pack("<IBBHQQ", name_offset, 0x12, 0, 1, vaddr, size)
+        name_offset += len(name) + 1
+    note = struct.pack("<III", 4, len(BUILD_ID), 3) + b"GNU\0" + BUILD_ID
+    shstrtab = b"\0.shstrtab\0.symtab\0.strtab\0.note.gnu.build-id\0"
+
+    body = bytearray(64 + 56)
+    offsets = {}
+    for key, blob in (("shstrtab", shstrtab), ("strtab", strtab), ("symtab", symtab), ("note", note)):
+        while len(body) % 8:
+            body.append(0)
+        offsets[key] = len(body)
+        body += blob
+    while len(body) % 8:
+        body.append(0)
+    shoff = len(body)
+    sections = [
+        (0, 0, 0, 0, 0, 0),
+        (shstrtab.index(b".shstrtab"), 3, offsets["shstrtab"], len(shstrtab), 0, 0),
+        (shstrtab.index(b".symtab"), 2, offsets["symtab"], len(symtab), 3, 24),
+        (shstrtab.index(b".strtab"), 3, offsets["strtab"], len(strtab), 0, 0),
+        (shstrtab.index(b".note.gnu.build-id"), 7, offsets["note"], len(note), 0, 0),
+    ]
+    for name, sh_type, offset, size, link, entsize in sections:
+        body += struct.pack("<IIQQQQIIQQ", name, sh_type, 0, 0, offset, size, link, 0, 8, entsize)
+    body[0:16] = b"\x7fELF" + bytes([2, 1, 1]) + bytes(9)
+    body[16:64] = struct.pack("<HHIQQQIHHHHHH", 3, 183, 1, 0, 64, shoff, 0, 64, 56, 1, 64, len(sections), 1)
+    body[64:120] = struct.pack("<IIQQQQQQ", 1, 5, 0, LOAD_VADDR, 0, 0x1000, 0x1000, 0x1000)
+    return bytes(body)
+
+
+def _write_library(tmp_path):
+    lib_dir = tmp_path / "libs"
+    lib_dir.mkdir()
+    (lib_dir / "libdemo.so").write_bytes(_build_elf())
+    return lib_dir
+
+
+def test_parse_elf(tmp_path):
+    info = parse_elf(str(_write_library(tmp_path) / "libdemo.so"))
+    assert info.build_id == BUILD_ID.hex()
+    assert sorted(info.symbols) == sorted((vaddr, size, name) for name, vaddr, size in FUNCTIONS)
+    assert info.segments == [(0, LOAD_VADDR, 0x1000)]
+
+
+def test_range_table_lookup():
+    table = RangeTable([(vaddr, size, name) for name, vaddr, size in FUNCTIONS], [(0, LOAD_VADDR, 0x1000)])
+    # 同一起始地址的别名只保留最大的符号
+    assert len(table) == 2
+    assert table.lookup(0x110) == "func_a+0x10"
+    assert table.lookup(0x27f) == "func_b+0x7f"
+    assert table.lookup(0x150) is None
+    assert table.lookup(0x50) is None
+
+
+def test_parse_frame_line():
+    assert parse_frame_line("/system/lib64/libdemo.so 0x110") == ("/system/lib64/libdemo.so", 0x110)
+    assert parse_frame_line("/system/lib64/libdemo.so+0x110") == ("/system/lib64/libdemo.so", 0x110)
+    assert parse_frame_line("# comment") is None
+
+
+def test_cache_round_trip_and_table_rebuild(tmp_path):
+    lib_dir = _write_library(tmp_path)
+    db_path = tmp_path / "symbol_cache.db"
+    with SymbolCache(db_path) as cache:
+        symbolizer = OfflineSymbolizer(str(lib_dir), cache)
+        assert symbolizer.symbolize("/data/app/libdemo.so", 0x110) == "func_a+0x10"
+        assert symbolizer.symbolize("/data/app/libmissing.so", 0x110) is None
+        assert symbolizer.stats["elf_parsed"] == 1
+        assert symbolizer.stats["missing_library"] == 1
+
+    # 第二次运行：build ID、区间表和已解析结果都来自缓存，不再读取ELF
+    with SymbolCache(db_path) as cache:
+        table = cache.load_table(BUILD_ID.hex())
+        assert list(table.names) == ["func_a", "func_b"]
+        symbolizer = OfflineSymbolizer(str(lib_dir), cache)
+        assert symbolizer.symbolize("/data/app/libdemo.so", 0x110) == "func_a+0x10"
+        assert symbolizer.symbolize("/data/app/libdemo.so", 0x200) == "func_b+0x0"
+        assert symbolizer.stats["elf_parsed"] == 0
+        assert symbolizer.stats["cache_hits"] == 1
+
+    # 区间表丢失但files缓存仍有build ID时，重新解析ELF建立区间表
+    with SymbolCache(db_path) as cache:
+        cache._conn.execute("DELETE FROM ranges")
+        cache._conn.execute("DELETE FROM segments")
+        cache._conn.execute("DELETE FROM resolved")
+        cache._conn.commit()
+        symbolizer = OfflineSymbolizer(str(lib_dir), cache)
+        assert symbolizer.symbolize("/data/app/libdemo.so", 0x210) == "func_b+0x10"
+        assert symbolizer.stats["elf_parsed"] == 1
+        assert cache.load_table(BUILD_ID.hex()) is not None